@@ -1,98 +1,344 @@
+from pages.locators import log_locator_report
+from utils.api_client import ApiCapture, ApiClient
+from utils.artifacts import ArtifactStore
+from utils.browser_pool import BrowserPool
 from utils.driver_factory import get_driver
-from utils.logger import setup_logging
+from utils.config import (
+    APP_URL,
+    BROWSER_POOL_SIZE,
+    BROWSER_PROFILE,
+    DISCOVER_API_KEY,
+    DISCOVER_API_URL,
+    EXECUTION_MODE,
+    LOCATOR_SLOW_SECONDS,
+    LOG_JSON,
+    LOG_LEVEL,
+    NETWORK_CAPTURE,
+    RETRY_EXCLUDE_TAGS,
+    SCENARIO_RETRIES,
+    SCREENCAST,
+    STANDIN_MODE,
+    get_bool_setting,
+    get_int_setting,
+    get_setting,
+)
+from utils.flaky import enable_retries, failing_step, failure_message, is_final_attempt, outcome
+from utils.logger import set_log_context, setup_logging
+from utils.metrics import MetricsRecorder, set_recorder
+from utils.network_capture import NetworkCapture
+from utils.report import ResultsLog, generate_html_report, read_log
+from utils.run_history import RunHistory, scenario_key
+from utils.screencast import ScreencastRecorder, clip_key, encode_gif
+from utils.standin import StandinServer
+from utils.wait_policy import WaitPolicy
+import allure
 import os
 import logging
+import time
 import pytest
+from datetime import datetime
+from functools import partial
 
 # Use named logger for better log categorization
 logger = logging.getLogger("test.lifecycle")
 
-# Store test results for HTML report
-test_results = []
+# Scenario tag prefix that selects a browser launch profile, e.g. @profile.fast
+PROFILE_TAG_PREFIX = "profile."
+
+# Scenarios that need a real browser, skipped in API mode
+UI_TAG = "ui"
+
+
+def scenario_profile(context, scenario):
+    """Browser profile for a scenario: a @profile.<name> tag wins over the run-wide profile"""
+    for tag in scenario.effective_tags:
+        if tag.startswith(PROFILE_TAG_PREFIX):
+            return tag[len(PROFILE_TAG_PREFIX):]
+    return context.browser_profile
 
 
 def before_all(context):
     """Setup logging at the start of test execution"""
-    setup_logging()
+    # Set by utils.parallel_runner when this process runs one shard of the suite
+    context.worker_id = context.config.userdata.get("worker_id")
+
+    # Each worker logs to its own files, see utils/logger.py
+    setup_logging(
+        context.worker_id,
+        json_logs=get_bool_setting("LOG_JSON", LOG_JSON, context.config.userdata),
+        level=get_setting("LOG_LEVEL", LOG_LEVEL, context.config.userdata),
+    )
     logger.info("Test execution start - Scenario heading")
+    if context.worker_id is not None:
+        logger.info(f"Running as parallel worker {context.worker_id}")
+
+    # Checked before anything is started, so a missing key stops the run at once
+    standin_mode = get_setting("STANDIN_MODE", STANDIN_MODE, context.config.userdata)
+    context.execution_mode = get_setting("EXECUTION_MODE", EXECUTION_MODE, context.config.userdata)
+    api_key = get_setting("DISCOVER_API_KEY", DISCOVER_API_KEY, context.config.userdata)
+    # Only a replay stand-in answers without a key, anything else would fail every request with a 401
+    if context.execution_mode == "api" and not api_key and standin_mode != "replay":
+        raise ValueError("API execution mode needs DISCOVER_API_KEY (or -D discover_api_key=...)")
+
+    # Scenario results are logged as they finish, the HTML report is rendered once in after_all
+    context.results_log = ResultsLog("run" if context.worker_id is None else f"worker-{context.worker_id}")
+
+    # Extra attempts for failed scenarios, see utils/flaky.py
+    context.scenario_retries = get_int_setting("SCENARIO_RETRIES", SCENARIO_RETRIES, context.config.userdata)
+
+    # Failure screenshots, DOM and console logs are written in the background
+    context.artifacts = ArtifactStore()
+
+    # Per-phase timings, written to reports/metrics as JSONL and Prometheus text
+    context.metrics = MetricsRecorder(context.config.userdata.get("run_id"), context.worker_id)
+    set_recorder(context.metrics)
+
+    # Outcomes and durations across runs, used by the parallel runner for ordering and estimates
+    context.history = RunHistory()
+    context.history.start_run(context.metrics.run_id)
+
+    # Serve the app from a local record/replay stand-in instead of the live site
+    context.standin = None
+    context.base_url = APP_URL
+    if standin_mode != "off":
+        context.standin = StandinServer(standin_mode).start()
+        context.base_url = context.standin.url
+
+    # Browserless API mode: steps get an ApiDiscoverPage talking to the API over pooled connections
+    context.api_client = None
+    if context.execution_mode == "api":
+        api_url = context.standin.upstream_url(DISCOVER_API_URL) if context.standin else DISCOVER_API_URL
+        context.api_client = ApiClient(api_url, api_key)
+        logger.info(f"API execution mode against {api_url}, scenarios tagged @{UI_TAG} are skipped")
+
+    # Warm browser sessions once, scenarios check them out instead of launching Chrome
+    pool_size = get_int_setting("BROWSER_POOL_SIZE", BROWSER_POOL_SIZE, context.config.userdata)
+    context.browser_profile = get_setting("BROWSER_PROFILE", BROWSER_PROFILE, context.config.userdata)
+    # Resolved once, the launched sessions only log network events when capture is on
+    context.network_capture = get_bool_setting("NETWORK_CAPTURE", NETWORK_CAPTURE, context.config.userdata)
+    context.browser_pool = BrowserPool(pool_size, partial(get_driver, network_capture=context.network_capture))
+    if context.execution_mode != "api":
+        context.browser_pool.warm(context.browser_profile)
+
+
+def before_feature(context, feature):
+    """Let failed scenarios retry in the same session (-D scenario_retries=N), skip @ui scenarios in API mode"""
+    if context.execution_mode == "api":
+        for scenario in feature.walk_scenarios():
+            if UI_TAG in scenario.effective_tags:
+                scenario.skip("Needs a browser, skipped in API mode")
+    if context.scenario_retries:
+        enable_retries(feature, context.scenario_retries, RETRY_EXCLUDE_TAGS)
 
 
 def before_scenario(context, scenario):
     """Setup before each scenario"""
+    set_log_context(scenario=scenario.name, scenario_id=f"{scenario.filename}:{scenario.line}", step=None, step_id=None)
     logger.info(f"=== SCENARIO: {scenario.name} ===")
-    logger.info("Browser launch")
-    context.driver = get_driver()
-    logger.info("Browser launched successfully")
+    if getattr(scenario, 'attempt', 1) == 1:
+        scenario.first_started = time.perf_counter()
+    context.metrics.scenario = scenario.name
+    context.scenario_started = time.perf_counter()
+    context.driver = None
+    launch_seconds = 0
+    if context.execution_mode == "api":
+        profile_name = "api"
+    else:
+        profile_name = scenario_profile(context, scenario)
+        logger.info(f"Browser launch (profile: {profile_name})")
+        launch_start = time.perf_counter()
+        context.driver = context.browser_pool.checkout(profile_name)
+        launch_seconds = time.perf_counter() - launch_start
+        logger.info(f"Browser launched successfully in {launch_seconds:.2f}s (profile: {profile_name})")
+        context.metrics.record("browser_launch", profile_name, launch_seconds)
+
+    # Wait budgets for this scenario, see WAIT_BUDGETS in utils/config.py
+    context.wait_policy = WaitPolicy(scenario.effective_tags)
+
+    # Record the app's API calls so steps can assert on the backend responses
+    context.network = None
+    if context.execution_mode == "api":
+        context.network = ApiCapture()
+    elif context.network_capture:
+        context.network = NetworkCapture(context.driver, policy=context.wait_policy)
+        context.network.clear()
+
+    # Keep the last seconds of the tab in memory, written to disk only if the scenario fails
+    context.screencast = None
+    if context.driver and get_bool_setting("SCREENCAST", SCREENCAST, context.config.userdata):
+        context.screencast = ScreencastRecorder(context.driver).start()
 
     # Initialize test result
     context.test_result = {
         'name': scenario.name,
         'feature': scenario.feature.name,
-        'start_time': None,
+        'start_time': datetime.now().isoformat(timespec='seconds'),
         'end_time': None,
         'status': 'unknown',
         'error': None,
-        'screenshot': None
+        'screenshot': None,
+        'profile': profile_name,
+        'launch_seconds': round(launch_seconds, 3)
     }
 
 
+def before_step(context, step):
+    """Let the wait policy pick the budget for this step"""
+    set_log_context(step=f"{step.keyword} {step.name}", step_id=f"{step.filename}:{step.line}")
+    context.wait_policy.enter_step(step.step_type, step.name)
+    context.step_started = time.perf_counter()
+
+
+def after_step(context, step):
+    """Record how long the step took"""
+    context.metrics.record(
+        "step", f"{step.step_type} {step.name}", time.perf_counter() - context.step_started,
+        status=step.status.name
+    )
+
+
 def after_scenario(context, scenario):
     """Cleanup after each scenario"""
-    if scenario.status == "failed":
+    waits = context.wait_policy.summary()
+    context.test_result['waits'] = waits
+    logger.info(
+        f"Wait time - blocked: {waits['blocked_seconds']}s, working: {waits['work_seconds']}s, "
+        f"slowest waits: {waits['slowest_waits']}"
+    )
+
+    context.test_result['end_time'] = datetime.now().isoformat(timespec='seconds')
+    # Front-end timings collected by DiscoverPage, see features/steps/performance_steps.py
+    page = getattr(context, 'page', None)
+    context.test_result['performance'] = page.performance if page else []
+    attempt = getattr(scenario, 'attempt', 1)
+    context.test_result['attempts'] = attempt
+    context.metrics.record(
+        "scenario", scenario.name, time.perf_counter() - context.scenario_started,
+        status=scenario.status.name, attempt=attempt
+    )
+
+    if context.screencast:
+        context.screencast.stop()
+
+    # Every failed or errored attempt leaves artifacts, for a flaky scenario the retried attempt is the one to look at
+    artifacts = capture_failure_artifacts(context, scenario) if scenario.status.has_failed() else None
+
+    if not is_final_attempt(scenario):
+        # Only the attempt that decides the outcome is reported, remember why this one failed
+        logger.warning(f"Attempt {attempt} failed, scenario will be retried: {scenario.name}")
+        scenario.retry_errors.append(failure_message(scenario))
+        scenario.retry_artifacts = artifacts
+        teardown_scenario(context)
+        return
+
+    # History keeps the final outcome and the time of all attempts together
+    status = outcome(scenario)
+    step = failing_step(scenario) if status == "failed" else None
+    context.history.record(
+        context.metrics.run_id, scenario_key(scenario.filename, scenario.name), scenario.name,
+        status, time.perf_counter() - scenario.first_started, f"{step.keyword} {step.name}" if step else None
+    )
+
+    if status == "failed":
         logger.error("Test failure / exception occurred")
         logger.error(f"Scenario failed: {scenario.name}")
 
-        # Take screenshot
-        os.makedirs("reports", exist_ok=True)
-        screenshot_path = f"reports/{scenario.name}.png"
-        context.driver.save_screenshot(screenshot_path)
-
         # Update test result
         context.test_result['status'] = 'failed'
-        context.test_result['screenshot'] = screenshot_path
-
-        # Capture the actual assertion error message
-        error_msg = "Test assertion failed"
-        if hasattr(scenario, 'exception') and scenario.exception:
-            error_msg = str(scenario.exception)
-        elif hasattr(scenario, 'error_message'):
-            error_msg = scenario.error_message
-        else:
-            # Try to get the last step's error
-            for step in scenario.steps:
-                if step.status == 'failed' and hasattr(step, 'exception'):
-                    error_msg = str(step.exception)
-                    break
-
-        context.test_result['error'] = error_msg
-
-        # Add to results list
-        test_results.append(context.test_result)
+        context.test_result['screenshot'] = artifacts['screenshot']
+        context.test_result['artifacts'] = artifacts
+
+        # Capture the actual assertion error (or the exception of an errored step)
+        context.test_result['error'] = failure_message(scenario)
+
+        # Add to results log
+        context.results_log.append(context.test_result)
         logger.info(f"Added failed test result to report: {context.test_result['name']}")
 
-        # Generate HTML report immediately for failed tests
-        generate_html_report(test_results)
+    elif status == "flaky":
+        logger.warning(f"Scenario passed on attempt {attempt} (flaky): {scenario.name}")
+        context.test_result['status'] = 'flaky'
+        context.test_result['error'] = f"Passed on attempt {attempt}, earlier failures: {'; '.join(getattr(scenario, 'retry_errors', []))}"
+        # Artifacts of the last failed attempt
+        retry_artifacts = getattr(scenario, 'retry_artifacts', None) or {'screenshot': None}
+        context.test_result['screenshot'] = retry_artifacts['screenshot']
+        context.test_result['artifacts'] = retry_artifacts
+        # Shown as a tag in Allure, next to the failed attempts it reports as retries
+        allure.dynamic.tag("flaky")
+        context.results_log.append(context.test_result)
+        logger.info(f"Added flaky test result to report: {context.test_result['name']}")
 
     else:
         logger.info(f"Scenario passed: {scenario.name}")
         context.test_result['status'] = 'passed'
-        test_results.append(context.test_result)
+        context.results_log.append(context.test_result)
         logger.info(f"Added passed test result to report: {context.test_result['name']}")
 
-    logger.info("Browser teardown")
-    context.driver.quit()
-    logger.info("Browser closed")
+    teardown_scenario(context)
+
+
+def capture_failure_artifacts(context, scenario):
+    """Grab screenshot, DOM, console log and screencast clip; encoding and writing happen off this thread"""
+    with context.metrics.timer("screenshot", scenario.name):
+        # Nothing to capture without a browser in API mode
+        artifacts = {'screenshot': None}
+        if context.driver:
+            artifacts = context.artifacts.capture(context.driver, scenario.name)
+        frames = context.screencast.clip() if context.screencast else []
+        if frames:
+            artifacts['clip'] = context.artifacts.store(clip_key(frames), ".gif", encode_gif, frames)
+    return artifacts
+
+
+def teardown_scenario(context):
+    """Return the browser to the pool, a retry of the scenario checks it out again after the reset"""
+    if context.driver:
+        logger.info("Browser teardown")
+        with context.metrics.timer("teardown", "browser_checkin"):
+            context.browser_pool.checkin(context.driver)
+        logger.info("Browser returned to pool")
+    set_log_context(scenario=None, scenario_id=None, step=None, step_id=None)
 
 
 def after_all(context):
     """Generate HTML report after all tests"""
+    if not hasattr(context, "results_log"):
+        # before_all stopped on a configuration error before starting anything
+        return
     logger.info("All scenarios completed - Test execution finished")
-    logger.info(f"Total test results collected: {len(test_results)}")
+    logger.info(f"Total test results collected: {context.results_log.count}")
+    context.results_log.close()
+    # The report links to the artifacts, so every queued write has to finish first
+    context.artifacts.shutdown()
+
+    context.browser_pool.shutdown()
+    if context.api_client:
+        api_stats = context.api_client.stats()
+        logger.info(f"API client stats - requests: {api_stats['requests']}, avg: {api_stats['avg_ms']} ms")
+        context.api_client.close()
+    if context.standin:
+        context.standin.stop()
+    log_locator_report(LOCATOR_SLOW_SECONDS)
+    set_recorder(None)
+    context.metrics.close()
+    for key, (flaky, total) in context.history.flake_rates().items():
+        logger.warning(f"Flaky scenario {key}: flaky in {flaky} of the last {total} runs")
+    context.history.close()
+    stats = context.browser_pool.stats()
+    logger.info(
+        f"Browser pool stats - size: {stats['size']}, hits: {stats['hits']}, misses: {stats['misses']}, "
+        f"recycled: {stats['recycled']}, avg launch: {stats['avg_launch_seconds']}s, "
+        f"launch time saved: {stats['saved_seconds']}s"
+    )
+
+    # Parallel workers only log their results, the runner renders one merged report
+    if context.worker_id is not None:
+        return
 
-    # Generate simple HTML report
-    if test_results:
-        generate_html_report(test_results)
-        logger.info(f"Generated HTML report with {len(test_results)} test results")
+    # Generate simple HTML report, streamed from this run's results log
+    if context.results_log.count:
+        generate_html_report(read_log(context.results_log.path))
+        logger.info(f"Generated HTML report with {context.results_log.count} test results")
     else:
         logger.warning("No test results to generate HTML report")
         # Generate a basic report anyway for debugging
@@ -103,66 +349,3 @@ def after_all(context):
             'error': 'No test results were collected',
             'screenshot': None
         }])
-
-
-def generate_html_report(results):
-    """Generate a simple HTML report with test results and screenshots"""
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <title>QA Automation Test Report</title>
-        <style>
-            body {{ font-family: Arial, sans-serif; margin: 20px; }}
-            .passed {{ color: green; }}
-            .failed {{ color: red; }}
-            .unknown {{ color: orange; }}
-            table {{ border-collapse: collapse; width: 100%; }}
-            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-            th {{ background-color: #f2f2f2; }}
-            img {{ max-width: 300px; max-height: 200px; }}
-        </style>
-    </head>
-    <body>
-        <h1>QA Automation Test Report</h1>
-        <p><strong>Feature:</strong> Filter functionality</p>
-        <p><strong>Total Tests:</strong> {len(results)}</p>
-        <p><strong>Passed:</strong> <span class="passed">{len([r for r in results if r['status'] == 'passed'])}</span></p>
-        <p><strong>Failed:</strong> <span class="failed">{len([r for r in results if r['status'] == 'failed'])}</span></p>
-
-        <h2>Test Results</h2>
-        <table>
-            <tr>
-                <th>Test Name</th>
-                <th>Status</th>
-                <th>Error Message</th>
-                <th>Screenshot</th>
-            </tr>
-    """
-
-    for result in results:
-        status_class = result['status']
-        error_msg = result['error'] or 'N/A'
-        screenshot_html = f'<img src="{os.path.basename(result["screenshot"])}" alt="Screenshot">' if result['screenshot'] else 'N/A'
-
-        html_content += f"""
-            <tr>
-                <td>{result['name']}</td>
-                <td class="{status_class}">{result['status'].upper()}</td>
-                <td>{error_msg}</td>
-                <td>{screenshot_html}</td>
-            </tr>
-        """
-
-    html_content += """
-        </table>
-    </body>
-    </html>
-    """
-
-    # Save HTML report
-    os.makedirs("reports", exist_ok=True)
-    with open("reports/test_report.html", "w") as f:
-        f.write(html_content)
-
-    logger.info("HTML test report generated: reports/test_report.html")
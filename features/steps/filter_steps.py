@@ -1,35 +1,65 @@
 from behave import given, when, then
+from pages.discover_api import ApiDiscoverPage
 from pages.discover_page import DiscoverPage
 import logging
 
 logger = logging.getLogger("step.verification")
 
 
+# Setup steps of scenarios with this tag set filters through app state, not the UI
+INJECT_FILTERS_TAG = "inject_filters"
+
+
+def inject_filters(context):
+    """True if the scenario only needs the filter state, not the filter UI (see DiscoverPage.apply_filters)"""
+    return INJECT_FILTERS_TAG in context.scenario.effective_tags
+
+
+def new_discover_page(context):
+    """DiscoverPage for the scenario, or its API counterpart in API mode (-D execution_mode=api)"""
+    if context.execution_mode == "api":
+        return ApiDiscoverPage(context.api_client, context.network, context.wait_policy)
+    return DiscoverPage(context.driver, context.base_url, context.wait_policy)
+
+
 @given("user is on discover page")
 def step_open_discover(context):
-    context.page = DiscoverPage(context.driver)
+    context.page = new_discover_page(context)
     context.page.open()
 
 
 @when('user selects "{category}" category')
 def step_select_category(context, category):
-    context.page.select_category(category)
+    if inject_filters(context):
+        context.page.apply_filters(category=category)
+    else:
+        context.page.select_category(category)
 
 
 @when('user selects "{type_value}" type')
 def step_select_type(context, type_value):
-    context.page.select_type(type_value)
+    if inject_filters(context):
+        context.page.apply_filters(type=type_value)
+    else:
+        context.page.select_type(type_value)
 
 
 @given('user accesses discover page with "{slug}" slug')
 def step_open_with_slug(context, slug):
-    context.driver.get(f"https://tmdb-discover.surge.sh/{slug}")
-    context.page = DiscoverPage(context.driver)
+    if context.execution_mode == "api":
+        # A slug exercises the app's routing, which has no API counterpart
+        context.scenario.skip(f"Opening the '{slug}' slug needs a browser, tag the scenario @ui")
+        return
+    context.page = new_discover_page(context)
+    context.page.open_slug(slug)
 
 
 @when('user sets year range from "{start_year}" to "{end_year}"')
 def step_set_year_range(context, start_year, end_year):
-    context.page.set_year_range(start_year, end_year)
+    if inject_filters(context):
+        context.page.apply_filters(start_year=start_year, end_year=end_year)
+    else:
+        context.page.set_year_range(start_year, end_year)
     # Store expected values for verification
     context.year_range_start = start_year
     context.year_range_end = end_year
@@ -0,0 +1,43 @@
+from behave import then
+import logging
+
+logger = logging.getLogger("step.verification")
+
+# API Step Definitions - assert on the discover API responses captured through DevTools
+
+
+def _latest_response(context, predicate=lambda response: True, description="an API response"):
+    """Wait for a captured API response matching predicate and fail the step if none arrives"""
+    assert context.network is not None, "Network capture is disabled (NETWORK_CAPTURE=false)"
+    response = context.network.wait_for_response(predicate)
+    assert response is not None, f"Expected {description} but none was captured"
+    return response
+
+
+@then('the API response should contain results')
+def step_verify_api_results(context):
+    """Verify the latest API response returned at least one result"""
+    response = _latest_response(context, lambda r: 'results' in r['body'], "an API response with results")
+    count = len(response['body']['results'])
+    logger.info(f"API response {response['path']} returned {count} results")
+    assert count > 0, f"Expected API results but {response['path']} returned none"
+
+
+@then('the API response should be for page "{page_number}"')
+def step_verify_api_page(context, page_number):
+    """Verify an API response was received for the expected page"""
+    response = _latest_response(
+        context, lambda r: str(r['body'].get('page')) == page_number, f"an API response for page {page_number}"
+    )
+    assert response['status'] == 200, f"API response for page {page_number} had status {response['status']}"
+    assert len(response['body'].get('results', [])) > 0, f"API response for page {page_number} has no results"
+    logger.info(f"✅ API returned page {page_number} of {response['body'].get('total_pages')}")
+
+
+@then('the API request should have "{param}" set to "{value}"')
+def step_verify_api_param(context, param, value):
+    """Verify the app sent a request with the expected query parameter, e.g. a genre or year bound"""
+    response = _latest_response(
+        context, lambda r: r['params'].get(param) == value, f"an API request with {param}={value}"
+    )
+    logger.info(f"✅ API request {response['path']} has {param}={value}")
@@ -35,9 +35,8 @@ def step_click_page_number(context, page_number):
 @when('user clicks on last page number')
 def step_click_last_page(context):
     """Click the last page number"""
-    # Add a brief wait to ensure pagination is loaded after category selection
-    import time
-    time.sleep(2)
+    # Ensure pagination is loaded after category selection
+    context.page.wait_until_ready("pagination after category selection")
     context.page.click_last_page()
 
 
@@ -51,7 +50,7 @@ def step_verify_current_page(context, expected_page):
 @then('URL should contain "{url_fragment}"')
 def step_verify_url_contains(context, url_fragment):
     """Verify the URL contains the specified fragment (optional for client-side routing)"""
-    current_url = context.driver.current_url
+    current_url = context.page.current_url
     # TMDB uses client-side routing, so URL may not change
     # We'll log this but not fail the test
     if url_fragment in current_url:
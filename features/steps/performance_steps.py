@@ -0,0 +1,57 @@
+from behave import then
+import json
+import logging
+import allure
+
+logger = logging.getLogger("step.verification")
+
+# Performance Budget Step Definitions - assert on the Performance API timings DiscoverPage
+# collects after open(), filter changes and page changes (see utils/performance.py)
+
+
+def _latest_timings(context, kind=None):
+    """Timings of the most recent measured page action, optionally only of the given kind"""
+    measurements = [m for m in context.page.performance if kind is None or m['kind'] == kind]
+    assert measurements, f"No {kind or 'page'} timings were recorded - did the scenario open the page?"
+    timings = measurements[-1]
+    allure.attach(
+        json.dumps(timings, indent=2), name=f"Performance: {timings['action']}",
+        attachment_type=allure.attachment_type.JSON
+    )
+    return timings
+
+
+@then('the page should become interactive within {budget_ms:d} ms')
+def step_verify_interactive_budget(context, budget_ms):
+    """Verify the last page load was interactive (rendered, idle, no long task running) within budget"""
+    timings = _latest_timings(context, 'navigation')
+    logger.info(
+        f"Page interactive after {timings['interactive_ms']} ms (budget {budget_ms} ms), "
+        f"first contentful paint {timings['first_contentful_paint_ms']} ms"
+    )
+    assert timings['interactive_ms'] <= budget_ms, \
+        f"Page became interactive after {timings['interactive_ms']} ms, budget is {budget_ms} ms"
+
+
+@then('page navigation should complete within {budget_ms:d} ms')
+def step_verify_navigation_budget(context, budget_ms):
+    """Verify the last page load, filter change or page change finished rendering within budget"""
+    timings = _latest_timings(context)
+    logger.info(f"{timings['action']} completed in {timings['duration_ms']} ms (budget {budget_ms} ms)")
+    assert timings['duration_ms'] <= budget_ms, \
+        f"{timings['action']} took {timings['duration_ms']} ms, budget is {budget_ms} ms"
+
+
+@then('the main thread should not be blocked for more than {budget_ms:d} ms')
+def step_verify_blocking_budget(context, budget_ms):
+    """Verify long tasks during the last page action did not block input for longer than budget"""
+    timings = _latest_timings(context)
+    if not timings['long_tasks_supported']:
+        logger.warning("Long task timing is not supported by this browser, blocking time not checked")
+        return
+    logger.info(
+        f"{timings['action']} blocked the main thread for {timings['blocking_ms']} ms "
+        f"in {timings['long_tasks']} long tasks (budget {budget_ms} ms)"
+    )
+    assert timings['blocking_ms'] <= budget_ms, \
+        f"{timings['action']} blocked the main thread for {timings['blocking_ms']} ms, budget is {budget_ms} ms"
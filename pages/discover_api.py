@@ -0,0 +1,222 @@
+from utils.config import API_CATEGORY_ENDPOINTS, API_CATEGORY_SORT
+from utils.metrics import timed_methods
+from utils.wait_policy import WaitPolicy
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@timed_methods("discover_api")
+class ApiDiscoverPage:
+    """
+    DiscoverPage for the browserless API mode (-D execution_mode=api)
+    Holds the filter state the app would hold and fetches the results from the API behind
+    it; getters and verifiers answer from the latest API response instead of the DOM.
+    Only the data side of the page is available - UI-only behaviour (routing, dropdown
+    rendering, front-end timings) needs DiscoverPage and scenarios tagged @ui.
+    """
+
+    # What the app shows before any filter is touched
+    DEFAULT_STATE = {'type': "Movie", 'category': "Popular", 'genre': None, 'start_year': None, 'end_year': None}
+    # TMDB serves at most this many pages of any list
+    MAX_PAGE = 500
+
+    def __init__(self, client, capture=None, policy=None):
+        self.client = client
+        # API responses of the scenario, queried by the API assertion steps
+        self.capture = capture
+        self.policy = policy or WaitPolicy()
+        self.state = dict(self.DEFAULT_STATE)
+        self.page_number = 1
+        self.response = None
+        # No front-end timings without a browser, kept for the report
+        self.performance = []
+
+    @property
+    def current_url(self):
+        """URL of the latest API request, the counterpart of the browser location"""
+        return self.response['url'] if self.response else ""
+
+    def _media(self):
+        return "tv" if self.state['type'] == "TV Shows" else "movie"
+
+    def _genre_id(self, media, genre):
+        """TMDB genre id for a genre name, the genre list is fetched once per run and type"""
+        key = f"genres/{media}"
+        if key not in self.client.cache:
+            body = self.client.get(f"genre/{media}/list")['body'] or {}
+            self.client.cache[key] = {g['name']: g['id'] for g in body.get('genres', [])}
+        genres = self.client.cache[key]
+        if genre not in genres:
+            raise ValueError(f"Unknown {media} genre '{genre}', expected one of {sorted(genres)}")
+        return genres[genre]
+
+    def _fetch(self):
+        """Request the results for the current filter state and page"""
+        media = self._media()
+        category = self.state['category']
+        params = {'page': self.page_number}
+        if self.state['genre'] or self.state['start_year'] or self.state['end_year']:
+            # Filters only exist on the discover endpoint, the category becomes its sort order
+            path = f"discover/{media}"
+            params['sort_by'] = API_CATEGORY_SORT[category][media]
+            if self.state['genre']:
+                params['with_genres'] = self._genre_id(media, self.state['genre'])
+            date_field = "first_air_date" if media == "tv" else "primary_release_date"
+            if self.state['start_year']:
+                params[f"{date_field}.gte"] = f"{self.state['start_year']}-01-01"
+            if self.state['end_year']:
+                params[f"{date_field}.lte"] = f"{self.state['end_year']}-12-31"
+        else:
+            path = API_CATEGORY_ENDPOINTS[category][media]
+
+        self.response = self.client.get(path, params, self.capture)
+
+    def _body(self):
+        return (self.response or {}).get('body') or {}
+
+    def _total_pages(self):
+        return min(self._body().get('total_pages') or 0, self.MAX_PAGE)
+
+    def snapshot(self):
+        """Same shape as DiscoverPage.snapshot, built from the latest API response"""
+        cards = []
+        for result in self._body().get('results', []):
+            date = result.get('release_date') or result.get('first_air_date') or ""
+            cards.append({
+                'title': result.get('title') or result.get('name') or "",
+                'year': date[:4] or None,
+                'rating': result.get('vote_average'),
+                'poster': result.get('poster_path'),
+            })
+        page = self._body().get('page')
+        return {
+            'url': self.current_url,
+            'cards': cards,
+            'pagination': {
+                'pages': list(range(max(1, page - 2), min(self._total_pages(), page + 2) + 1)) if page else [],
+                'has_previous': bool(page and page > 1),
+                'has_next': bool(page and page < self._total_pages()),
+            },
+            'active_page': str(page) if page else None,
+            'filters': {
+                'dropdowns': [self.state['type'], self.state['genre'] or "", self.state['start_year'] or "",
+                              self.state['end_year'] or ""],
+                'start_year': self.state['start_year'],
+                'end_year': self.state['end_year'],
+            },
+        }
+
+    def wait_until_ready(self, label):
+        """Requests are synchronous, the results are ready when the action returns"""
+        return True
+
+    def open(self):
+        logger.info("API mode - loading default results")
+        self.state = dict(self.DEFAULT_STATE)
+        self.page_number = 1
+        self._fetch()
+
+    def select_category(self, category):
+        if category not in API_CATEGORY_ENDPOINTS:
+            raise ValueError(f"Unknown category '{category}', expected one of {sorted(API_CATEGORY_ENDPOINTS)}")
+        self.state['category'] = category
+        self.page_number = 1
+        self._fetch()
+
+    def select_type(self, value):
+        self.state['type'] = "TV Shows" if value == "TV Shows" else "Movie"
+        self.page_number = 1
+        self._fetch()
+
+    def select_genre(self, genre):
+        self.state['genre'] = genre
+        self.page_number = 1
+        self._fetch()
+
+    def set_year_range(self, start_year, end_year):
+        self.state['start_year'] = start_year
+        self.state['end_year'] = end_year
+        self.page_number = 1
+        self._fetch()
+
+    def apply_filters(self, **filters):
+        """Set several filters with a single request, see DiscoverPage.apply_filters"""
+        filters = {name: value for name, value in filters.items() if value is not None}
+        if 'category' in filters and filters['category'] not in API_CATEGORY_ENDPOINTS:
+            raise ValueError(f"Unknown category '{filters['category']}', expected one of {sorted(API_CATEGORY_ENDPOINTS)}")
+        if 'type' in filters:
+            filters['type'] = "TV Shows" if filters['type'] == "TV Shows" else "Movie"
+        self.state.update(filters)
+        self.page_number = 1
+        self._fetch()
+
+    def get_titles(self):
+        """Card dicts of the latest response, see snapshot()"""
+        return self.snapshot()['cards']
+
+    def verify_year_filter_applied(self, expected_start, expected_end):
+        """
+        The filter is applied if it is part of the request and every dated result lies in the range
+        (the API mode counterpart of the year dropdowns showing the selected values)
+        """
+        if (self.state['start_year'], self.state['end_year']) != (expected_start, expected_end):
+            logger.error(f"Year filter is {self.state['start_year']}-{self.state['end_year']}, "
+                         f"expected {expected_start}-{expected_end}")
+            return False
+        outside = [card for card in self.get_titles()
+                   if card['year'] and not expected_start <= card['year'] <= expected_end]
+        for card in outside:
+            logger.error(f"'{card['title']}' ({card['year']}) is outside {expected_start}-{expected_end}")
+        return not outside
+
+    def verify_year_filtering(self, start_year, end_year):
+        return self.verify_year_filter_applied(start_year, end_year)
+
+    def debug_year_values(self):
+        logger.info(f"DEBUG - Start year: '{self.state['start_year']}', End year: '{self.state['end_year']}'")
+
+    # Pagination Methods
+    def click_next_page(self):
+        if not self.is_next_button_enabled():
+            raise AssertionError(f"No page after {self.page_number}")
+        self.page_number += 1
+        self._fetch()
+
+    def click_previous_page(self):
+        if not self.is_previous_button_enabled():
+            raise AssertionError(f"No page before {self.page_number}")
+        self.page_number -= 1
+        self._fetch()
+
+    def click_page_number(self, page_number):
+        self.page_number = int(page_number)
+        self._fetch()
+
+    def click_last_page(self):
+        last_page = self._total_pages()
+        if not last_page:
+            logger.warning("No pages in the latest response")
+            return
+        logger.info(f"Loading last page: {last_page}")
+        self.click_page_number(last_page)
+
+    def get_current_page_from_url(self):
+        return str(self.page_number)
+
+    def get_current_page_indicator(self):
+        """Page number the API says it served"""
+        return self.snapshot()['active_page'] or self.get_current_page_from_url()
+
+    def is_previous_button_enabled(self):
+        return self.snapshot()['pagination']['has_previous']
+
+    def is_next_button_enabled(self):
+        return self.snapshot()['pagination']['has_next']
+
+    def get_current_movie_titles(self):
+        return [card['title'] for card in self.get_titles() if card['title']]
+
+    def verify_content_changed(self, previous_titles):
+        current_titles = self.get_current_movie_titles()
+        return current_titles != previous_titles and len(current_titles) > 0
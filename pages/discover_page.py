@@ -1,43 +1,218 @@
-from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
-import time
+from contextlib import contextmanager
+from pages.locators import LocatorRegistry
+from utils.config import APP_URL, READINESS_RERENDER_TIMEOUT, READINESS_TIMEOUT
+from utils.metrics import timed_methods
+from utils.performance import measure, performance_now
+from utils.readiness import mark_rendered, wait_until_settled
+from utils.wait_policy import WaitPolicy
 import logging
 
 logger = logging.getLogger(__name__)
+
+# Reads everything the getters and verifiers need in one script execution (see DiscoverPage.snapshot)
+SNAPSHOT_JS = """
+var cardSelector = arguments[0], titleSelector = arguments[1];
+var dropdownSelector = arguments[2], valueSelector = arguments[3];
+function text(element) { return element ? (element.innerText || element.textContent || '').trim() : ''; }
+
+var cards = Array.prototype.map.call(document.querySelectorAll(cardSelector), function (card) {
+    var title = text(card.querySelector(titleSelector));
+    var year = null, rating = null;
+    Array.prototype.forEach.call(card.querySelectorAll('p, span'), function (element) {
+        var value = text(element);
+        if (value === title) { return; }
+        var match = !year && value.match(/\\b(18|19|20)\\d{2}\\b/);
+        if (match) { year = match[0]; }
+        // A bare score such as 8.7 is the rating
+        if (rating === null && /^(10|\\d)(\\.\\d+)?$/.test(value)) { rating = parseFloat(value); }
+    });
+    var image = card.querySelector('img');
+    return {title: title, year: year, rating: rating, poster: image ? image.getAttribute('src') : null};
+});
+
+var pages = [], previous = null, next = null, active = null;
+Array.prototype.forEach.call(document.querySelectorAll('a'), function (link) {
+    var label = text(link), href = link.getAttribute('href');
+    var enabled = href !== null && href !== '';
+    if (/^\\d+$/.test(label)) {
+        pages.push(parseInt(label, 10));
+        var item = link.closest('li');
+        var classes = ((link.getAttribute('class') || '') + ' ' + (item ? item.getAttribute('class') || '' : '')).toLowerCase();
+        if (!active && (link.hasAttribute('aria-current') || classes.indexOf('active') !== -1 || classes.indexOf('current') !== -1)) {
+            active = label;
+        }
+    } else if (label.indexOf('Previous') !== -1 && previous === null) {
+        previous = enabled;
+    } else if (label.indexOf('Next') !== -1 && next === null) {
+        next = enabled;
+    }
+});
+
+var dropdowns = Array.prototype.map.call(document.querySelectorAll(dropdownSelector), function (dropdown) {
+    return text(dropdown.querySelector(valueSelector));
+});
+
+return {
+    url: window.location.href,
+    cards: cards,
+    pagination: {pages: pages, has_previous: !!previous, has_next: !!next},
+    active_page: active,
+    filters: {
+        dropdowns: dropdowns,
+        start_year: dropdowns.length >= 4 ? dropdowns[2] : null,
+        end_year: dropdowns.length >= 4 ? dropdowns[3] : null
+    }
+};
+"""
+
+# Sets filters through the app's own handlers in one script execution (see DiscoverPage.apply_filters):
+# a category link is clicked, each React-Select gets the option via the onChange prop of its component
+INJECT_FILTERS_JS = """
+var filters = arguments[0], dropdownSelector = arguments[1];
+// Position of each filter among the React-Selects in the sidebar, as in SNAPSHOT_JS
+var DROPDOWNS = {type: 0, genre: 1, start_year: 2, end_year: 3};
+var missing = [];
+
+function selectProps(element) {
+    var key = Object.keys(element).filter(function (name) {
+        return name.indexOf('__reactFiber$') === 0 || name.indexOf('__reactInternalInstance$') === 0;
+    })[0];
+    for (var fiber = key ? element[key] : null; fiber; fiber = fiber.return) {
+        var props = fiber.memoizedProps;
+        if (props && typeof props.onChange === 'function' && Array.isArray(props.options)) { return props; }
+    }
+    return null;
+}
+
+function flatten(options) {
+    return options.reduce(function (all, option) { return all.concat(option.options || [option]); }, []);
+}
+
+if (filters.category) {
+    var link = Array.prototype.filter.call(document.querySelectorAll('a'), function (a) {
+        return (a.innerText || a.textContent || '').trim() === filters.category;
+    })[0];
+    if (link) { link.click(); } else { missing.push('category link ' + filters.category); }
+}
+
+var dropdowns = document.querySelectorAll(dropdownSelector);
+Object.keys(DROPDOWNS).forEach(function (name) {
+    if (!(name in filters)) { return; }
+    var element = dropdowns[DROPDOWNS[name]];
+    var props = element && selectProps(element);
+    if (!props) { missing.push(name + ' dropdown'); return; }
+    var option = flatten(props.options).filter(function (o) { return String(o.label) === String(filters[name]); })[0];
+    if (!option) { missing.push(name + ' option ' + filters[name]); return; }
+    props.onChange(option, {action: 'select-option', option: option, name: props.name});
+});
+return missing;
+"""
+
+
+class FilterInjectionError(Exception):
+    """The app did not take filters set through its state, see DiscoverPage.apply_filters"""
+
+
+@timed_methods("discover_page")
 class DiscoverPage:
 
-    URL = "https://tmdb-discover.surge.sh/"
+    URL = APP_URL
 
-    def __init__(self, driver):
+    def __init__(self, driver, base_url=None, policy=None):
         self.driver = driver
-        self.wait = WebDriverWait(driver, 15)
+        # base_url points the page at a local stand-in instead of the live site
+        self.url = base_url or self.URL
+        # Wait budgets depend on the scenario's tags and the current step
+        self.policy = policy or WaitPolicy()
+        # All selectors live in pages/locators.py
+        self.locators = LocatorRegistry(driver, policy=self.policy)
+        self.card_selector = self.locators.selector("result_card")
+        # Front-end timings of open() and every action that re-renders the results, newest last
+        self.performance = []
+
+    @property
+    def current_url(self):
+        return self.driver.current_url
+
+    def _wait_until(self, condition, label):
+        """Explicit wait bounded by the current wait budget"""
+        with self.policy.blocked(label):
+            return WebDriverWait(self.driver, self.policy.timeout).until(condition)
+
+    def snapshot(self):
+        """
+        Read the page state in a single WebDriver round trip
+        Returns a dict with:
+            url         - current location
+            cards       - [{'title', 'year', 'rating', 'poster'}] for every result card (year/rating may be None)
+            pagination  - {'pages': [numbers shown], 'has_previous', 'has_next'} (links with an href)
+            active_page - number of the highlighted page link as text, or None
+            filters     - {'dropdowns': [value shown in each React-Select], 'start_year', 'end_year'}
+                          (year dropdowns are at indices 2 and 3, None if they are not rendered)
+        """
+        return self.driver.execute_script(
+            SNAPSHOT_JS,
+            self.card_selector,
+            self.locators.selector("card_title"),
+            self.locators.selector("dropdown_value_container"),
+            self.locators.selector("dropdown_single_value"),
+        )
+
+    def wait_until_ready(self, label):
+        """Wait until no requests are in flight and the DOM has stopped changing"""
+        with self.policy.blocked(label):
+            return wait_until_settled(self.driver, label, timeout=min(READINESS_TIMEOUT, self.policy.timeout))
+
+    @contextmanager
+    def _results_rerender(self, label):
+        """Wait for the result cards to be replaced by the wrapped action and the page to settle"""
+        since = performance_now(self.driver)
+        token = mark_rendered(self.driver, self.card_selector)
+        yield
+        with self.policy.blocked(label):
+            wait_until_settled(
+                self.driver, label, self.card_selector, token,
+                timeout=min(READINESS_RERENDER_TIMEOUT, self.policy.timeout)
+            )
+        if since is not None:
+            self._measure(label, since)
+
+    def _measure(self, action, since=None):
+        """Append the Performance API timings of the last action, see utils/performance.py"""
+        timings = measure(self.driver, action, since)
+        if timings:
+            self.performance.append(timings)
+
     def open(self):
         logger.info("Page navigation")
-        self.driver.get(self.URL)
-        logger.info(f"Navigated to: {self.URL}")
+        self.driver.get(self.url)
+        self.locators.invalidate()
+        logger.info(f"Navigated to: {self.url}")
         # Wait until the main content renders
-        self.wait.until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "div[class*='css-']"))
-        )
+        self.locators.find("app_content")
         # Wait for key interactive elements to be ready (page fully settled)
-        self.wait.until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "div[class*='css-2b097c-container']"))
-        )
-        # Additional brief wait for React to complete all updates
-        import time
-        time.sleep(0.5)
+        self.locators.find("type_dropdown", 'clickable')
+        # Wait for React to complete all updates
+        self.wait_until_ready("open")
+        self._measure("open")
         logger.info("Page fully loaded and ready")
 
+    def open_slug(self, slug):
+        """Open the app directly at a path such as a category slug"""
+        self.driver.get(self.url + slug)
+        self.locators.invalidate()
+        logger.info(f"Navigated to: {self.url + slug}")
+
     def select_category(self, category):
         """
         Click a category filter (e.g., Top rated) using LINK_TEXT
         """
-        element = self.wait.until(
-            EC.element_to_be_clickable((By.LINK_TEXT, category))
-        )
-        element.click()
+        element = self.locators.find("category_link", 'clickable', category=category)
+        with self._results_rerender(f"select_category {category}"):
+            element.click()
 
     def select_type(self, value):
         """
@@ -45,68 +220,94 @@ class DiscoverPage:
         Based on DOM inspection, uses React Select container class
         """
         # Click the React Select container (the dropdown itself)
-        dropdown = self.wait.until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, "div[class*='css-2b097c-container']"))
-        )
-        dropdown.click()
+        self.locators.click("type_dropdown")
 
         # Wait for dropdown options to appear and click the appropriate option
-        if value == "TV Shows":
-            option = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'css-') and text()='TV Shows']"))
-            )
-        else:  # Movie
-            option = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//div[contains(@class, 'css-') and text()='Movie']"))
-            )
+        option_text = "TV Shows" if value == "TV Shows" else "Movie"
+        option = self.locators.find("type_option", 'clickable', value=option_text)
 
-        option.click()
+        with self._results_rerender(f"select_type {value}"):
+            option.click()
 
-        # Wait for React to update the DOM after type change
-        self.wait.until(
-            EC.staleness_of(option)
-        )
+            # Wait for React to update the DOM after type change
+            self._wait_until(EC.staleness_of(option), f"select_type {value} staleness")
+
+    def select_genre(self, genre):
+        """Select a genre in the genre dropdown (second React Select in the sidebar)"""
+        self.locators.click("genre_dropdown")
+        option = self.locators.find("genre_option", 'clickable', value=genre)
+        with self._results_rerender(f"select_genre {genre}"):
+            option.click()
+
+    def apply_filters(self, **filters):
+        """
+        Set filters without clicking through the UI, e.g. apply_filters(type="TV Shows", start_year="2000", end_year="2010")
+        Accepts category, type, genre, start_year and end_year. All of them are applied in one
+        script call through the app's own handlers and the results re-render once. Filters the
+        page does not end up showing are set through the UI instead.
+        Meant for setup steps; scenarios that test the filter UI use select_* and set_year_range.
+        """
+        filters = {name: value for name, value in filters.items() if value is not None}
+        try:
+            with self._results_rerender(f"apply_filters {filters}"):
+                missing = self.driver.execute_script(
+                    INJECT_FILTERS_JS, filters, self.locators.selector("dropdown_value_container")
+                )
+                if missing:
+                    raise FilterInjectionError(", ".join(missing))
+        except FilterInjectionError as e:
+            logger.warning(f"Could not inject filters ({e}), using the UI")
+            self._apply_through_ui(filters)
+            return
+
+        shown = self.snapshot()['filters']
+        values = dict(zip(("type", "genre", "start_year", "end_year"), shown['dropdowns']))
+        wrong = {name: value for name, value in filters.items() if name in values and values[name] != value}
+        if wrong:
+            logger.warning(f"Page shows {values} after injecting {filters}, setting {sorted(wrong)} through the UI")
+            self._apply_through_ui(wrong)
+        else:
+            logger.info(f"Filters injected: {filters}")
+
+    def _apply_through_ui(self, filters):
+        if 'category' in filters:
+            self.select_category(filters['category'])
+        if 'type' in filters:
+            self.select_type(filters['type'])
+        if 'genre' in filters:
+            self.select_genre(filters['genre'])
+        if 'start_year' in filters or 'end_year' in filters:
+            shown = self.snapshot()['filters']
+            self.set_year_range(filters.get('start_year', shown['start_year']), filters.get('end_year', shown['end_year']))
 
     def get_titles(self):
         """
         Wait for movie/TV cards to load after type/category change
         Handles React rendering delay by waiting for new content
         Cards use 'flex flex-col items-center' classes, not MuiCard
+        Returns the card dicts from snapshot()
         """
-        # First wait for any existing cards to be removed (staleness check)
-        try:
-            existing_cards = self.driver.find_elements(By.CSS_SELECTOR, "div.flex.flex-col.items-center")
-            if existing_cards:
-                # Wait for existing cards to become stale (removed from DOM)
-                WebDriverWait(self.driver, 5).until(
-                    EC.staleness_of(existing_cards[0])
-                )
-        except:
-            pass  # No existing cards found, continue
+        # First wait for pending requests and re-renders to finish
+        # (actions that replace the cards already waited for the re-render itself)
+        self.wait_until_ready("get_titles")
 
-        # Now wait for new cards to appear (with shorter timeout for known defect scenarios)
+        # Now wait for cards to appear, each poll is a single snapshot call
         try:
-            self.wait.until(
-                EC.presence_of_all_elements_located(
-                    (By.CSS_SELECTOR, "div.flex.flex-col.items-center")
-                )
-            )
+            return self._wait_until(lambda driver: self.snapshot()['cards'] or False, "get_titles cards")
         except:
             # For known defect scenarios, return empty list if no cards found
             return []
 
-        return self.driver.find_elements(By.CSS_SELECTOR, "div.flex.flex-col.items-center")
-
     def verify_year_filter_applied(self, expected_start, expected_end):
         """
         Verify that year filtering was actually applied correctly
         Returns True if the dropdowns show the expected values
         """
         try:
-            all_dropdowns = self.driver.find_elements(By.CSS_SELECTOR, "div[class*='css-1hwfws3']")
-            if len(all_dropdowns) >= 4:
-                actual_start = all_dropdowns[2].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
-                actual_end = all_dropdowns[3].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
+            filters = self.snapshot()['filters']
+            if filters['start_year'] is not None:
+                actual_start = filters['start_year']
+                actual_end = filters['end_year']
 
                 logger.info(f"Year filter verification - Expected: {expected_start}-{expected_end}, Actual: {actual_start}-{actual_end}")
 
@@ -130,10 +331,10 @@ class DiscoverPage:
     def debug_year_values(self):
         """Debug method to check current year dropdown values"""
         try:
-            all_dropdowns = self.driver.find_elements(By.CSS_SELECTOR, "div[class*='css-1hwfws3']")
-            if len(all_dropdowns) >= 4:
-                start_display = all_dropdowns[2].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
-                end_display = all_dropdowns[3].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
+            filters = self.snapshot()['filters']
+            if filters['start_year'] is not None:
+                start_display = filters['start_year']
+                end_display = filters['end_year']
                 logger.info(f"DEBUG - Start year: '{start_display}', End year: '{end_display}'")
                 logger.info(f"DEBUG - Same year allowed: {start_display == end_display}")
             else:
@@ -147,23 +348,17 @@ class DiscoverPage:
         Year dropdowns are at indices 2 (start) and 3 (end)
         """
         try:
-            # Re-find dropdowns to ensure we have fresh references
-            all_dropdowns = self.wait.until(
-                lambda driver: driver.find_elements(By.CSS_SELECTOR, "div[class*='css-1hwfws3']")
-            )
-
-            if len(all_dropdowns) >= 4:  # Need year dropdowns at indices 2 and 3
-                # Get the displayed values from the year dropdowns (indices 2 and 3)
-                start_display = all_dropdowns[2].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
-                end_display = all_dropdowns[3].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
+            # Wait until the dropdowns are rendered
+            filters = self._wait_until(lambda driver: self.snapshot()['filters'], "verify_year_filtering")
 
+            if filters['start_year'] is not None:  # Need year dropdowns at indices 2 and 3
                 # Verify the values match what we selected
-                return start_display == start_year and end_display == end_year
+                return filters['start_year'] == start_year and filters['end_year'] == end_year
             else:
-                print(f"Verification - Expected at least 4 dropdowns, found {len(all_dropdowns)}")
+                logger.warning(f"Verification - Expected at least 4 dropdowns, found {len(filters['dropdowns'])}")
                 return False
         except Exception as e:
-            print(f"Verification - Error checking year values: {e}")
+            logger.error(f"Verification - Error checking year values: {e}")
             # If we can't verify, assume filtering didn't work
             return False
 
@@ -171,10 +366,9 @@ class DiscoverPage:
     def click_next_page(self):
         """Click the Next page button"""
         try:
-            next_link = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Next')]"))
-            )
-            next_link.click()
+            next_link = self.locators.find("next_link", 'clickable')
+            with self._results_rerender("click_next_page"):
+                next_link.click()
             logger.info("Clicked Next page button")
         except Exception as e:
             logger.error(f"Could not click Next page button: {e}")
@@ -183,10 +377,9 @@ class DiscoverPage:
     def click_previous_page(self):
         """Click the Previous page button"""
         try:
-            prev_link = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//a[contains(text(), 'Previous')]"))
-            )
-            prev_link.click()
+            prev_link = self.locators.find("previous_link", 'clickable')
+            with self._results_rerender("click_previous_page"):
+                prev_link.click()
             logger.info("Clicked Previous page button")
         except Exception as e:
             logger.error(f"Could not click Previous page button: {e}")
@@ -195,10 +388,9 @@ class DiscoverPage:
     def click_page_number(self, page_number):
         """Click a specific page number link"""
         try:
-            page_link = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, f"//a[text()='{page_number}']"))
-            )
-            page_link.click()
+            page_link = self.locators.find("page_link", 'clickable', page=page_number)
+            with self._results_rerender(f"click_page_number {page_number}"):
+                page_link.click()
             logger.info(f"Clicked page number {page_number}")
         except Exception as e:
             logger.error(f"Could not click page number {page_number}: {e}")
@@ -207,26 +399,11 @@ class DiscoverPage:
     def click_last_page(self):
         """Click the last page number link"""
         try:
-            # Wait a bit more for pagination to load
-            import time
-            time.sleep(1)
-
-            # Find all page number links and click the highest number
-            page_links = self.driver.find_elements(By.XPATH, "//a[string-length(text()) > 0]")
-
-            logger.info(f"Found {len(page_links)} total links, looking for page numbers")
-
-            # Filter for numeric page links and find the maximum
-            numeric_pages = []
-            for link in page_links:
-                text = link.text.strip()
-                if text.isdigit():
-                    try:
-                        page_num = int(text)
-                        numeric_pages.append(page_num)
-                        logger.debug(f"Found page number: {page_num}")
-                    except ValueError:
-                        continue
+            # Wait for pagination to finish loading
+            self.wait_until_ready("click_last_page")
+
+            # Read all page number links and click the highest number
+            numeric_pages = self.snapshot()['pagination']['pages']
 
             logger.info(f"Found {len(numeric_pages)} numeric page links: {numeric_pages}")
 
@@ -262,21 +439,11 @@ class DiscoverPage:
     def get_current_page_indicator(self):
         """Get current page from UI indicators or URL"""
         # Try to find active page indicator in pagination controls first
+        # (a page link with active/current styling or aria-current, see snapshot)
         try:
-            # Look for active/styled page links
-            active_page_elements = self.driver.find_elements(By.CSS_SELECTOR, "a[class*='active'], a[aria-current], li.active a")
-            if active_page_elements:
-                active_text = active_page_elements[0].text.strip()
-                if active_text.isdigit():
-                    return active_text
-
-            # Look for page links that might have different styling
-            page_links = self.driver.find_elements(By.XPATH, "//a[contains(text(), '1') or contains(text(), '2') or contains(text(), '3')]")
-            for link in page_links:
-                # Check if this link has active styling (this is site-specific)
-                classes = link.get_attribute('class') or ''
-                if 'active' in classes.lower() or 'current' in classes.lower():
-                    return link.text.strip()
+            active_page = self.snapshot()['active_page']
+            if active_page:
+                return active_page
         except:
             pass
 
@@ -286,10 +453,8 @@ class DiscoverPage:
     def is_previous_button_enabled(self):
         """Check if Previous button is clickable/enabled"""
         try:
-            prev_link = self.driver.find_element(By.XPATH, "//a[contains(text(), 'Previous')]")
-            # Check if link has href or is clickable
-            href = prev_link.get_attribute('href')
-            return href is not None and href != ''
+            # Enabled means the link exists and has an href
+            return self.snapshot()['pagination']['has_previous']
         except:
             # If Previous link doesn't exist or isn't found, consider it disabled
             return False
@@ -297,10 +462,8 @@ class DiscoverPage:
     def is_next_button_enabled(self):
         """Check if Next button is clickable/enabled"""
         try:
-            next_link = self.driver.find_element(By.XPATH, "//a[contains(text(), 'Next')]")
-            # Check if link has href or is clickable
-            href = next_link.get_attribute('href')
-            return href is not None and href != ''
+            # Enabled means the link exists and has an href
+            return self.snapshot()['pagination']['has_next']
         except:
             # If Next link doesn't exist or isn't found, consider it disabled
             return False
@@ -308,9 +471,7 @@ class DiscoverPage:
     def get_current_movie_titles(self):
         """Get list of current movie titles for content verification"""
         try:
-            title_elements = self.driver.find_elements(By.CSS_SELECTOR, "div.flex.flex-col.items-center p.text-blue-500")
-            titles = [elem.text.strip() for elem in title_elements if elem.text.strip()]
-            return titles
+            return [card['title'] for card in self.snapshot()['cards'] if card['title']]
         except:
             return []
 
@@ -330,57 +491,48 @@ class DiscoverPage:
             logger.info(f"Setting start year to {start_year}")
 
             # Click start year dropdown (based on Katalon XPath)
-            start_dropdown = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//div[@id='root']/div/aside/div/div[3]/div/div/div/div"))
-            )
-            start_dropdown.click()
+            self.locators.click("start_year_dropdown")
 
             # Find and use the input field
-            start_input = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "react-select-4-input"))
-            )
+            start_input = self.locators.find("start_year_input", 'clickable')
             start_input.clear()
             start_input.send_keys(start_year)
             start_input.send_keys(Keys.ENTER)
 
             logger.info(f"Start year {start_year} set successfully")
-            time.sleep(1.0)  # Brief wait for UI to settle
+            self.wait_until_ready(f"set start year {start_year}")
 
         except Exception as e:
-            logger.warning(f"Could not set start year {start_year}: {e}")
-            return
+            logger.error(f"Could not set start year {start_year}: {e}")
+            raise
 
         # Attempt to set end year using input field approach
         try:
             logger.info(f"Attempting to set end year to {end_year}")
 
             # Click end year dropdown (based on Katalon XPath)
-            end_dropdown = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, "//div[@id='root']/div/aside/div/div[3]/div[2]/div/div/div"))
-            )
-            end_dropdown.click()
+            self.locators.click("end_year_dropdown")
 
             # Find and use the input field
-            end_input = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "react-select-5-input"))
-            )
+            end_input = self.locators.find("end_year_input", 'clickable')
             end_input.clear()
             end_input.send_keys(end_year)
             end_input.send_keys(Keys.ENTER)
 
             logger.info(f"End year {end_year} set successfully")
-            time.sleep(1.0)  # Brief wait for UI to settle
+            self.wait_until_ready(f"set end year {end_year}")
 
         except Exception as e:
-            logger.warning(f"Could not set end year {end_year}: {e}")
-            # This is expected if validation prevents same year selection
+            # Validation that rejects the same start and end year ends up here too
+            logger.error(f"Could not set end year {end_year}: {e}")
+            raise
 
         # Final debug check
         try:
-            final_dropdowns = self.driver.find_elements(By.CSS_SELECTOR, "div[class*='css-1hwfws3']")
-            if len(final_dropdowns) >= 4:
-                final_start = final_dropdowns[2].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
-                final_end = final_dropdowns[3].find_element(By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']").text.strip()
+            filters = self.snapshot()['filters']
+            if filters['start_year'] is not None:
+                final_start = filters['start_year']
+                final_end = filters['end_year']
                 logger.info(f"FINAL RESULT - Start: '{final_start}', End: '{final_end}', Same: {final_start == final_end}")
         except Exception as e:
             logger.error(f"Error in final check: {e}")
@@ -0,0 +1,231 @@
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+import logging
+import threading
+import time
+
+logger = logging.getLogger("page.locators")
+
+
+class Locator:
+    """
+    Named element locator with fallbacks
+    Each strategy is (By, value) or (By, value, parent_name) to search inside another
+    registered element instead of the whole document. Values may contain {placeholders}.
+    cache=True keeps the element until the page state changes (see LocatorRegistry.invalidate)
+    """
+
+    def __init__(self, name, *strategies, cache=False):
+        self.name = name
+        self.strategies = strategies
+        self.cache = cache
+
+
+# All DiscoverPage selectors, primary strategy first
+DISCOVER_LOCATORS = {locator.name: locator for locator in [
+    Locator("app_content", (By.CSS_SELECTOR, "div[class*='css-']")),
+    Locator("category_link",
+            (By.LINK_TEXT, "{category}"),
+            (By.XPATH, "//a[normalize-space()='{category}']")),
+    # Filter sidebar - stable while the page is open, so cached
+    Locator("type_dropdown",
+            (By.CSS_SELECTOR, "aside div[class*='css-2b097c-container']"),
+            (By.CSS_SELECTOR, "div[class*='css-2b097c-container']"),
+            cache=True),
+    Locator("type_option",
+            (By.XPATH, ".//div[contains(@class, 'css-') and text()='{value}']", "type_dropdown"),
+            (By.XPATH, "//div[contains(@class, 'css-') and text()='{value}']")),
+    Locator("genre_dropdown",
+            (By.XPATH, "(//aside//div[contains(@class, 'css-2b097c-container')])[2]"),
+            cache=True),
+    Locator("genre_option",
+            (By.XPATH, ".//div[contains(@class, 'css-') and text()='{value}']", "genre_dropdown"),
+            (By.XPATH, "//div[contains(@class, 'css-') and text()='{value}']")),
+    # The absolute XPaths break on any layout change, kept only as the last resort
+    Locator("start_year_dropdown",
+            (By.XPATH, "(//aside//div[contains(@class, 'css-2b097c-container')])[3]"),
+            (By.XPATH, "//div[@id='root']/div/aside/div/div[3]/div/div/div/div"),
+            cache=True),
+    Locator("start_year_input",
+            (By.CSS_SELECTOR, "input", "start_year_dropdown"),
+            (By.ID, "react-select-4-input")),
+    Locator("end_year_dropdown",
+            (By.XPATH, "(//aside//div[contains(@class, 'css-2b097c-container')])[4]"),
+            (By.XPATH, "//div[@id='root']/div/aside/div/div[3]/div[2]/div/div/div"),
+            cache=True),
+    Locator("end_year_input",
+            (By.CSS_SELECTOR, "input", "end_year_dropdown"),
+            (By.ID, "react-select-5-input")),
+    # Results and pagination
+    Locator("result_card", (By.CSS_SELECTOR, "div.flex.flex-col.items-center")),
+    Locator("card_title", (By.CSS_SELECTOR, "p.text-blue-500")),
+    Locator("dropdown_value_container", (By.CSS_SELECTOR, "div[class*='css-1hwfws3']")),
+    Locator("dropdown_single_value", (By.CSS_SELECTOR, "div[class*='css-1uccc91-singleValue']")),
+    Locator("next_link", (By.XPATH, "//a[contains(text(), 'Next')]")),
+    Locator("previous_link", (By.XPATH, "//a[contains(text(), 'Previous')]")),
+    Locator("page_link",
+            (By.XPATH, "//a[text()='{page}']"),
+            (By.XPATH, "//a[normalize-space()='{page}']")),
+]}
+
+# Lookup timings for the whole run, shared by every registry in this process
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(name, seconds, strategy_index, polls, cache_hit=False, failed=False):
+    with _stats_lock:
+        entry = _stats.setdefault(name, {
+            'lookups': 0, 'total_seconds': 0.0, 'max_seconds': 0.0,
+            'fallbacks': 0, 'retries': 0, 'cache_hits': 0, 'failures': 0,
+        })
+        entry['lookups'] += 1
+        entry['total_seconds'] += seconds
+        entry['max_seconds'] = max(entry['max_seconds'], seconds)
+        entry['fallbacks'] += 1 if strategy_index else 0
+        entry['retries'] += max(0, polls - 1)
+        entry['cache_hits'] += 1 if cache_hit else 0
+        entry['failures'] += 1 if failed else 0
+
+
+def locator_stats():
+    """Copy of the per-locator timing statistics collected so far"""
+    with _stats_lock:
+        return {name: dict(entry) for name, entry in _stats.items()}
+
+
+def log_locator_report(slow_seconds=1.0):
+    """Log locators that were slow, needed a fallback or more than one attempt"""
+    flagged = []
+    for name, entry in sorted(locator_stats().items()):
+        average = entry['total_seconds'] / entry['lookups']
+        if entry['max_seconds'] >= slow_seconds or entry['fallbacks'] or entry['retries'] or entry['failures']:
+            flagged.append(name)
+            logger.warning(
+                f"Locator '{name}' - lookups: {entry['lookups']}, avg: {average:.3f}s, max: {entry['max_seconds']:.3f}s, "
+                f"fallbacks: {entry['fallbacks']}, retries: {entry['retries']}, failures: {entry['failures']}, "
+                f"cache hits: {entry['cache_hits']}"
+            )
+    if not flagged:
+        logger.info("Locator audit - no slow or multi-attempt locators")
+    return flagged
+
+
+class LocatorRegistry:
+    """
+    Resolves named locators for one page object
+    Every lookup is timed; cached elements are dropped by invalidate() on navigation
+    """
+
+    CONDITIONS = {
+        'present': lambda element: True,
+        'visible': lambda element: element.is_displayed(),
+        'clickable': lambda element: element.is_displayed() and element.is_enabled(),
+    }
+
+    def __init__(self, driver, locators=DISCOVER_LOCATORS, policy=None):
+        self.driver = driver
+        self.locators = locators
+        # utils.wait_policy.WaitPolicy supplying the wait budget; None means a fixed 15s
+        self.policy = policy
+        self._cache = {}
+
+    @property
+    def timeout(self):
+        return self.policy.timeout if self.policy else 15
+
+    def invalidate(self):
+        """Forget cached elements, call whenever the page state changes (navigation, re-render)"""
+        self._cache.clear()
+
+    def selector(self, name):
+        """Primary CSS selector of a locator, for use inside scripts"""
+        by, value = self.locators[name].strategies[0][:2]
+        if by != By.CSS_SELECTOR:
+            raise ValueError(f"Locator '{name}' has no CSS primary strategy")
+        return value
+
+    def _cached(self, name, check):
+        """
+        Cached element of a locator if it still meets check, else None
+        A reference that went stale (the app re-rendered it) is evicted
+        """
+        element = self._cache.get(name)
+        if element is None:
+            return None
+        try:
+            # tag_name is a round trip, so even 'present' notices a detached element
+            return element if element.tag_name and check(element) else None
+        except StaleElementReferenceException:
+            logger.debug(f"Cached element for locator '{name}' went stale")
+            del self._cache[name]
+            return None
+
+    def find(self, name, condition='present', timeout=None, **params):
+        """Wait for the first strategy of a locator that yields an element meeting condition"""
+        return self._lookup(name, condition, timeout, params, record=True)
+
+    def _lookup(self, name, condition, timeout, params, record):
+        locator = self.locators[name]
+        check = self.CONDITIONS[condition]
+        start = time.perf_counter()
+
+        element = self._cached(name, check) if locator.cache else None
+        if element is not None:
+            if record:
+                _record(name, time.perf_counter() - start, 0, 1, cache_hit=True)
+            return element
+
+        polls = 0
+        found = {}
+
+        def attempt(driver):
+            nonlocal polls
+            polls += 1
+            for index, strategy in enumerate(locator.strategies):
+                by, value = strategy[0], strategy[1].format(**params)
+                try:
+                    # Parent lookups are not recorded on their own, they are part of this lookup
+                    root = self._lookup(strategy[2], 'present', 0, params, record=False) if len(strategy) > 2 else driver
+                    for element in root.find_elements(by, value):
+                        if check(element):
+                            found['index'] = index
+                            return element
+                except (TimeoutException, WebDriverException):
+                    continue
+            return False
+
+        try:
+            if timeout == 0:
+                element = attempt(self.driver)
+                if not element:
+                    raise TimeoutException(f"Locator '{name}' not found")
+            else:
+                wait = WebDriverWait(self.driver, self.timeout if timeout is None else timeout)
+                if self.policy:
+                    with self.policy.blocked(f"locator {name}"):
+                        element = wait.until(attempt)
+                else:
+                    element = wait.until(attempt)
+        except TimeoutException:
+            if record:
+                _record(name, time.perf_counter() - start, 0, polls, failed=True)
+            raise
+
+        elapsed = time.perf_counter() - start
+        if record:
+            _record(name, elapsed, found['index'], polls)
+        if record and found['index']:
+            logger.warning(f"Locator '{name}' resolved by fallback #{found['index']} in {elapsed:.3f}s")
+        if locator.cache:
+            self._cache[name] = element
+        return element
+
+    def click(self, name, **params):
+        """Click a clickable element, looking it up again once if a cached reference went stale"""
+        try:
+            self.find(name, 'clickable', **params).click()
+        except StaleElementReferenceException:
+            self.invalidate()
+            self.find(name, 'clickable', **params).click()
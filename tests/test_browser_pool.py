@@ -0,0 +1,112 @@
+from selenium.common.exceptions import WebDriverException
+
+from utils.browser_pool import BrowserPool, reset_session
+
+
+class FakeDriver:
+    """Just enough of a WebDriver session for the pool: tabs, a URL and a liveness switch"""
+
+    def __init__(self, profile_name="fast"):
+        self.profile_name = profile_name
+        self.window_handles = ["main"]
+        self.current_url = "https://app/discover?page=3"
+        self.alive = True
+        self.quit_called = False
+        self.scripts = []
+        self.switch_to = self
+
+    def window(self, handle):
+        self.current_window = handle
+
+    def close(self):
+        self.window_handles.remove(self.current_window)
+
+    @property
+    def current_window_handle(self):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        return self.window_handles[0]
+
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise WebDriverException("session deleted")
+        self.scripts.append(script)
+
+    def execute_cdp_cmd(self, cmd, args):
+        self.scripts.append(cmd)
+
+    def get(self, url):
+        self.current_url = url
+
+    def get_log(self, log_type):
+        return []
+
+    def quit(self):
+        self.quit_called = True
+
+
+def pool(size):
+    launched = []
+
+    def factory(profile_name):
+        driver = FakeDriver(profile_name)
+        launched.append(driver)
+        return driver
+
+    return BrowserPool(size, factory), launched
+
+
+def test_warm_sessions_are_reused_after_checkin():
+    browser_pool, launched = pool(2)
+    browser_pool.warm("fast")
+    first = browser_pool.checkout("fast")
+    browser_pool.checkin(first)
+    assert browser_pool.checkout("fast") in launched
+    assert len(launched) == 2
+    stats = browser_pool.stats()
+    assert (stats['hits'], stats['misses'], stats['launches']) == (2, 0, 2)
+
+
+def test_checkin_resets_the_session():
+    driver = FakeDriver()
+    driver.window_handles.append("popup")
+    reset_session(driver)
+    assert driver.window_handles == ["main"]
+    assert driver.current_url == "about:blank"
+    assert "Network.clearBrowserCookies" in driver.scripts
+
+
+def test_profiles_have_their_own_sessions():
+    browser_pool, launched = pool(1)
+    browser_pool.warm("fast")
+    assert browser_pool.checkout("debug").profile_name == "debug"
+    assert browser_pool.stats()['misses'] == 1
+
+
+def test_dead_sessions_are_discarded_on_checkout():
+    browser_pool, launched = pool(1)
+    browser_pool.warm("fast")
+    launched[0].alive = False
+    driver = browser_pool.checkout("fast")
+    assert driver is launched[1]
+    assert launched[0].quit_called
+    assert browser_pool.stats()['recycled'] == 1
+
+
+def test_sessions_failing_the_reset_are_recycled():
+    browser_pool, launched = pool(1)
+    driver = browser_pool.checkout("fast")
+    driver.alive = False
+    browser_pool.checkin(driver)
+    assert driver.quit_called
+    assert browser_pool.stats()['recycled'] == 1
+
+
+def test_sessions_beyond_the_pool_size_are_quit():
+    browser_pool, launched = pool(1)
+    first, second = browser_pool.checkout("fast"), browser_pool.checkout("fast")
+    browser_pool.checkin(first)
+    browser_pool.checkin(second)
+    assert not first.quit_called and second.quit_called
+    browser_pool.shutdown()
+    assert first.quit_called
@@ -0,0 +1,119 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pages.discover_api import ApiDiscoverPage
+from utils.api_client import ApiCapture, ApiClient, ApiError
+
+
+class FakeClient:
+    """Answers like ApiClient.get from canned results and records the requests"""
+
+    def __init__(self, total_pages=3):
+        self.total_pages = total_pages
+        self.cache = {}
+        self.requests = []
+
+    def get(self, path, params=None, capture=None):
+        params = dict(params or {})
+        self.requests.append((path, params))
+        if path.startswith("genre/"):
+            body = {'genres': [{'id': 18, 'name': "Drama"}]}
+        else:
+            page = params.get('page', 1)
+            body = {'page': page, 'total_pages': self.total_pages,
+                    'results': [{'title': f"Film {page}", 'release_date': "2001-05-01", 'vote_average': 7.5}]}
+        response = {'url': f"http://api/{path}", 'path': path, 'params': params, 'status': 200, 'body': body}
+        if capture is not None:
+            capture.add(response)
+        return response
+
+
+@pytest.fixture
+def page():
+    return ApiDiscoverPage(FakeClient(), ApiCapture())
+
+
+def test_categories_use_their_endpoint_until_a_filter_is_set(page):
+    page.open()
+    page.select_category("Top rated")
+    assert page.client.requests[-1] == ("movie/top_rated", {'page': 1})
+
+    page.select_genre("Drama")
+    path, params = page.client.requests[-1]
+    assert path == "discover/movie"
+    assert params == {'page': 1, 'sort_by': "vote_average.desc", 'with_genres': 18}
+
+
+def test_year_range_and_type_build_the_discover_query(page):
+    page.open()
+    page.select_type("TV Shows")
+    page.set_year_range("2000", "2005")
+    path, params = page.client.requests[-1]
+    assert path == "discover/tv"
+    assert params['first_air_date.gte'] == "2000-01-01" and params['first_air_date.lte'] == "2005-12-31"
+    assert page.verify_year_filter_applied("2000", "2005")
+    assert not page.verify_year_filter_applied("2002", "2005")
+
+
+def test_genre_list_is_fetched_once_per_type(page):
+    page.open()
+    page.select_genre("Drama")
+    page.select_category("Newest")
+    assert [path for path, _ in page.client.requests].count("genre/movie/list") == 1
+    with pytest.raises(ValueError):
+        page.select_genre("Western")
+
+
+def test_pagination_follows_the_total_pages(page):
+    page.open()
+    assert not page.is_previous_button_enabled()
+    page.click_next_page()
+    page.click_last_page()
+    assert page.get_current_page_indicator() == "3"
+    assert not page.is_next_button_enabled()
+    with pytest.raises(AssertionError):
+        page.click_next_page()
+    # Every response is captured for the API assertion steps
+    assert page.capture.wait_for_response(lambda r: r['body']['page'] == 2) is not None
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = 200 if self.path.startswith("/3/movie/popular") else 401
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/3"
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_sends_the_key_and_fails_on_other_statuses(api_url):
+    client = ApiClient(api_url, "secret", retries=0)
+    capture = ApiCapture()
+    response = client.get("movie/popular", {'page': 2, 'with_genres': None}, capture)
+    assert response['status'] == 200
+    assert response['params'] == {'page': "2", 'api_key': "secret"}
+    assert "api_key=secret" in response['body']['path']
+
+    with pytest.raises(ApiError, match="401"):
+        client.get("discover/movie", {'page': 1}, capture)
+    # The failed response is still captured for the report
+    assert [r['status'] for r in capture.responses] == [200, 401]
+    assert client.stats()['requests'] == 2
+    client.close()
@@ -0,0 +1,83 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.driver_factory import SharedServiceChrome, build_options
+
+PROFILE = {'headless': True, 'window_size': None, 'arguments': [], 'prefs': {}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Minimal chromedriver: creates session 'abc' and echoes every other command"""
+
+    def _send(self, value):
+        body = json.dumps({'value': value}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/session":
+            self._send({'sessionId': "abc", 'capabilities': {'browserName': "chrome"}})
+        else:
+            self._send({'path': self.path})
+
+    def do_DELETE(self):
+        self.server.deleted.append(self.path)
+        self._send(None)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeService:
+    def __init__(self, url):
+        self.service_url = url
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def service():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.deleted = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    service = FakeService(f"http://127.0.0.1:{server.server_port}")
+    service.server = server
+    yield service
+    server.shutdown()
+    server.server_close()
+
+
+def test_session_is_local_and_uses_chrome_commands(service):
+    driver = SharedServiceChrome(service, build_options(PROFILE, network_capture=False))
+    assert driver.session_id == "abc"
+    assert driver._is_remote is False
+    assert driver.execute_cdp_cmd("Page.enable", {}) == {'path': "/session/abc/goog/cdp/execute"}
+
+
+def test_quit_keeps_the_shared_service_running(service):
+    driver = SharedServiceChrome(service, build_options(PROFILE, network_capture=False))
+    driver.quit()
+    assert service.server.deleted == ["/session/abc"]
+    assert not service.stopped
+
+
+def test_ignoring_the_local_proxy_is_honoured(service, monkeypatch):
+    for name in ("NO_PROXY", "no_proxy"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("HTTP_PROXY", "http://127.0.0.1:9")
+    monkeypatch.setenv("http_proxy", "http://127.0.0.1:9")
+    options = build_options(PROFILE, network_capture=False)
+    with pytest.warns(DeprecationWarning):
+        options.ignore_local_proxy_environment_variables()
+    # Would go through the unreachable proxy otherwise
+    driver = SharedServiceChrome(service, options)
+    assert driver.session_id == "abc"
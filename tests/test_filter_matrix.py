@@ -0,0 +1,111 @@
+import itertools
+
+from utils.filter_matrix import (
+    FILTER_DIMENSIONS,
+    MatrixRunner,
+    all_combinations,
+    change_cost,
+    check_combination,
+    order_for_reuse,
+    reduce_combinations,
+)
+
+
+def covered(combinations, strength):
+    return {
+        interaction for combination in combinations
+        for interaction in itertools.combinations(sorted(combination.items()), strength)
+    }
+
+
+def test_pairwise_covers_every_pair():
+    reduced = reduce_combinations(FILTER_DIMENSIONS, strength=2)
+    assert covered(reduced, 2) == covered(all_combinations(FILTER_DIMENSIONS), 2)
+    assert len(reduced) < len(all_combinations(FILTER_DIMENSIONS)) == 72
+    # The largest dimension times the second largest is the lower bound for pairwise
+    assert 12 <= len(reduced) <= 16
+
+
+def test_three_way_covers_every_triple():
+    reduced = reduce_combinations(FILTER_DIMENSIONS, strength=3)
+    assert covered(reduced, 3) == covered(all_combinations(FILTER_DIMENSIONS), 3)
+
+
+def test_full_product_for_strength_zero_or_all_dimensions():
+    full = all_combinations(FILTER_DIMENSIONS)
+    assert reduce_combinations(FILTER_DIMENSIONS, strength=0) == full
+    assert reduce_combinations(FILTER_DIMENSIONS, strength=len(FILTER_DIMENSIONS)) == full
+
+
+def test_order_for_reuse_keeps_every_combination():
+    reduced = reduce_combinations(FILTER_DIMENSIONS)
+    ordered = order_for_reuse(reduced)
+    assert sorted(map(str, ordered)) == sorted(map(str, reduced))
+
+
+def test_change_cost_weights_the_year_range():
+    state = {'type': "Movie", 'year': "1990-1999"}
+    assert change_cost(state, {'type': "TV Shows", 'year': "1990-1999"}) == 1
+    assert change_cost(state, {'type': "Movie", 'year': "2000-2009"}) == 2
+
+
+def snapshot(dropdowns, years=()):
+    return {
+        'cards': [{'title': f"Film {year}", 'year': year} for year in years],
+        'filters': {'dropdowns': dropdowns, 'start_year': dropdowns[2], 'end_year': dropdowns[3]},
+    }
+
+
+COMBINATION = {'type': "TV Shows", 'genre': "Drama", 'year': "2000-2009", 'category': "Top rated"}
+RESPONSE = {'path': "/3/discover/tv", 'params': {'sort_by': "vote_average.desc"}}
+
+
+def test_matching_page_has_no_findings():
+    page = snapshot(["TV Shows", "Drama", "2000", "2009"], ["2001", "2009"])
+    assert check_combination(COMBINATION, page, RESPONSE) == []
+
+
+def test_every_filter_is_checked():
+    page = snapshot(["Movie", "Comedy", "2000", "2010"], ["1999"])
+    findings = check_combination(COMBINATION, page, {'path': "/3/discover/tv", 'params': {'sort_by': "popularity.desc"}})
+    assert findings == [
+        "type dropdown shows 'Movie'",
+        "genre dropdown shows 'Comedy'",
+        "API request /3/discover/tv popularity.desc is not for category 'Top rated'",
+        "year dropdowns show 2000-2010",
+        "'Film 1999' (1999) outside 2000-2009",
+    ]
+
+
+def test_category_without_filters_is_checked_by_endpoint():
+    page = snapshot(["Movie", "", "", ""])
+    assert check_combination({'category': "Trend"}, page, {'path': "/3/trending/movie/week", 'params': {}}) == []
+    assert check_combination({'category': "Trend"}, page, None) == ["no API response captured to check category 'Trend'"]
+
+
+class FailingYearPage:
+    """Stands in for DiscoverPage, setting the year range fails"""
+
+    def __init__(self):
+        self.opened = 0
+        self.calls = []
+
+    def open(self):
+        self.opened += 1
+
+    def select_type(self, value):
+        self.calls.append(("type", value))
+
+    def set_year_range(self, start, end):
+        raise RuntimeError("end year input not found")
+
+
+def test_failed_filter_reopens_the_page():
+    runner = MatrixRunner(driver=None)
+    runner.page = FailingYearPage()
+    runner.open()
+    cards, findings = runner.run_one({'type': "TV Shows", 'year': "2000-2009"})
+    assert (cards, findings) == (0, ["could not apply filters: end year input not found"])
+    assert runner.reopens == 1 and runner.page.opened == 2
+    # Nothing is assumed about the reopened page, the next combination sets every filter again
+    assert runner.state == {}
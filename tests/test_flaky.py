@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FEATURE = """Feature: Retries
+  Scenario: Errors once
+    Given a step that raises on attempt 1
+
+  Scenario: Errors always
+    Given a step that raises on attempt 9
+
+  Scenario: Fails always
+    Given a step that fails
+
+  @known_defect
+  Scenario: Not retried
+    Given a step that raises on attempt 1
+"""
+
+STEPS = """
+from behave import given
+
+@given("a step that raises on attempt {attempt:d}")
+def step_raises(context, attempt):
+    current = getattr(context.scenario, 'attempt', 1)
+    if current <= attempt:
+        raise ConnectionError(f"refused on attempt {current}")
+
+@given("a step that fails")
+def step_fails(context):
+    assert False, "wrong results"
+"""
+
+ENVIRONMENT = """
+import json
+from utils.flaky import enable_retries, failure_message, is_final_attempt, outcome
+
+def before_feature(context, feature):
+    enable_retries(feature, 1, {"known_defect"})
+
+def after_scenario(context, scenario):
+    if not is_final_attempt(scenario):
+        scenario.retry_errors.append(failure_message(scenario))
+        return
+    with open("outcomes.jsonl", "a") as f:
+        f.write(json.dumps({
+            'name': scenario.name,
+            'attempt': getattr(scenario, 'attempt', 1),
+            'outcome': outcome(scenario),
+            'error': failure_message(scenario) if outcome(scenario) == "failed" else None,
+            'retry_errors': getattr(scenario, 'retry_errors', []),
+        }) + "\\n")
+"""
+
+
+def run_behave(tmp_path):
+    steps_dir = tmp_path / "features" / "steps"
+    steps_dir.mkdir(parents=True)
+    (tmp_path / "features" / "retries.feature").write_text(FEATURE)
+    (tmp_path / "features" / "environment.py").write_text(ENVIRONMENT)
+    (steps_dir / "steps.py").write_text(STEPS)
+    env = dict(os.environ, PYTHONPATH=REPO)
+    subprocess.run([sys.executable, "-m", "behave", "--format=null", "features"], cwd=tmp_path, env=env,
+                   capture_output=True, text=True)
+    with open(tmp_path / "outcomes.jsonl") as f:
+        return {entry['name']: entry for entry in map(json.loads, f)}
+
+
+def test_errored_attempts_are_retried_and_reported_once(tmp_path):
+    outcomes = run_behave(tmp_path)
+    # One report per scenario, for its final attempt only
+    assert sorted(outcomes) == ["Errors always", "Errors once", "Fails always", "Not retried"]
+
+    assert outcomes["Errors once"]['outcome'] == "flaky"
+    assert outcomes["Errors once"]['attempt'] == 2
+    assert outcomes["Errors once"]['retry_errors'] == ["refused on attempt 1"]
+
+    assert outcomes["Errors always"]['outcome'] == "failed"
+    assert outcomes["Errors always"]['attempt'] == 2
+    assert outcomes["Errors always"]['error'] == "refused on attempt 2"
+
+
+def test_assertion_failures_and_excluded_tags(tmp_path):
+    outcomes = run_behave(tmp_path)
+    assert outcomes["Fails always"]['outcome'] == "failed"
+    assert outcomes["Fails always"]['error'] == "wrong results"
+    assert outcomes["Not retried"]['outcome'] == "failed"
+    assert outcomes["Not retried"]['attempt'] == 1
+    assert outcomes["Not retried"]['error'] == "refused on attempt 1"
+    assert outcomes["Not retried"]['retry_errors'] == []
@@ -0,0 +1,77 @@
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.common.by import By
+
+from pages.locators import DISCOVER_LOCATORS, Locator, LocatorRegistry
+
+
+class FakeElement:
+    def __init__(self, displayed=True):
+        self.displayed = displayed
+        self.stale = False
+
+    @property
+    def tag_name(self):
+        if self.stale:
+            raise StaleElementReferenceException("detached")
+        return "div"
+
+    def is_displayed(self):
+        return self.displayed
+
+    def is_enabled(self):
+        return True
+
+
+class FakeDriver:
+    """Answers find_elements from a {(by, value): [elements]} map and counts the calls"""
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.finds = 0
+
+    def find_elements(self, by, value):
+        self.finds += 1
+        return list(self.elements.get((by, value), []))
+
+
+LOCATORS = {'sidebar': Locator("sidebar", (By.CSS_SELECTOR, "aside"), cache=True)}
+
+
+def test_cache_hits_skip_the_lookup():
+    element = FakeElement()
+    driver = FakeDriver({(By.CSS_SELECTOR, "aside"): [element]})
+    registry = LocatorRegistry(driver, LOCATORS)
+    assert registry.find("sidebar", timeout=0) is element
+    assert registry.find("sidebar", timeout=0) is element
+    assert driver.finds == 1
+
+
+def test_cache_hits_must_meet_the_condition():
+    hidden = FakeElement(displayed=False)
+    driver = FakeDriver({(By.CSS_SELECTOR, "aside"): [hidden]})
+    registry = LocatorRegistry(driver, LOCATORS)
+    registry.find("sidebar", timeout=0)
+    with pytest.raises(TimeoutException):
+        registry.find("sidebar", 'visible', timeout=0)
+    hidden.displayed = True
+    assert registry.find("sidebar", 'visible', timeout=0) is hidden
+
+
+def test_stale_cache_entries_are_evicted():
+    old, new = FakeElement(), FakeElement()
+    driver = FakeDriver({(By.CSS_SELECTOR, "aside"): [old]})
+    registry = LocatorRegistry(driver, LOCATORS)
+    registry.find("sidebar", timeout=0)
+    old.stale = True
+    driver.elements[(By.CSS_SELECTOR, "aside")] = [new]
+    assert registry.find("sidebar", timeout=0) is new
+    assert registry.find("sidebar", timeout=0) is new
+    assert driver.finds == 2
+
+
+def test_year_dropdowns_try_the_absolute_xpath_last():
+    for name in ("start_year_dropdown", "end_year_dropdown"):
+        strategies = DISCOVER_LOCATORS[name].strategies
+        assert "@id='root'" not in strategies[0][1]
+        assert "@id='root'" in strategies[-1][1]
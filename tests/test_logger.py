@@ -0,0 +1,54 @@
+import json
+import logging
+
+import pytest
+
+from utils.logger import set_log_context, setup_logging, shutdown_logging
+
+
+@pytest.fixture
+def logs(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root_level = logging.getLogger().level
+    yield tmp_path / "logs"
+    shutdown_logging()
+    set_log_context(scenario=None, scenario_id=None, step=None, step_id=None, worker=None)
+    logging.getLogger().setLevel(root_level)
+
+
+def read_jsonl(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+def test_records_carry_the_scenario_context(logs):
+    setup_logging(worker_id=3, json_logs=True, level="debug")
+    set_log_context(scenario="Next page", scenario_id="pagination.feature:7", step="When I click next")
+    logging.getLogger("test.sample").debug("clicked")
+    shutdown_logging()
+
+    [entry] = [e for e in read_jsonl(logs / "automation-worker-3.jsonl") if e['logger'] == "test.sample"]
+    assert entry['message'] == "clicked"
+    assert entry['level'] == "DEBUG"
+    assert (entry['worker'], entry['scenario_id'], entry['step']) == (3, "pagination.feature:7", "When I click next")
+    assert "clicked" in (logs / "automation-worker-3.log").read_text()
+
+
+def test_setup_is_a_no_op_the_second_time(logs):
+    root = setup_logging(level="INFO")
+    handlers = list(root.handlers)
+    assert setup_logging(level="DEBUG") is root
+    assert root.handlers == handlers
+    assert root.level == logging.INFO
+
+
+@pytest.mark.parametrize("level, expected", [("warning", logging.WARNING), ("10", logging.DEBUG), (30, 30)])
+def test_level_names_and_numbers(logs, level, expected):
+    assert setup_logging(level=level).level == expected
+
+
+def test_unknown_level_falls_back_to_info_with_a_warning(logs):
+    assert setup_logging(json_logs=True, level="verbose").level == logging.INFO
+    shutdown_logging()
+    messages = [entry['message'] for entry in read_jsonl(logs / "automation.jsonl")]
+    assert "Unknown log level 'verbose', logging at INFO" in messages
@@ -0,0 +1,65 @@
+import json
+import threading
+
+import pytest
+
+from utils.metrics import MetricsRecorder, set_recorder, timed_methods
+
+
+@timed_methods("page")
+class Page:
+    def open(self):
+        self.wait()
+
+    def wait(self):
+        return "ready"
+
+    def _private(self):
+        return "untimed"
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    recorder = MetricsRecorder("run", metrics_dir=str(tmp_path))
+    set_recorder(recorder)
+    yield recorder
+    set_recorder(None)
+
+
+def recorded(recorder):
+    """Names recorded so far, closing the recorder to flush them"""
+    recorder.close()
+    with open(recorder.jsonl_path) as f:
+        return [json.loads(line)['name'] for line in f]
+
+
+def test_nested_timed_calls_are_recorded_once(recorder):
+    page = Page()
+    page.open()
+    assert page.wait() == "ready"
+    page._private()
+    assert recorded(recorder) == ["open", "wait"]
+
+
+def test_calls_on_other_threads_are_timed_on_their_own(recorder):
+    page = Page()
+    started, release = threading.Event(), threading.Event()
+
+    class Blocking(Page):
+        def wait(self):
+            started.set()
+            release.wait(5)
+
+    blocking = timed_methods("page")(Blocking)()
+    thread = threading.Thread(target=blocking.wait)
+    thread.start()
+    started.wait(5)
+    # Another thread is inside a timed call, this one still records its own
+    page.wait()
+    release.set()
+    thread.join()
+    assert sorted(recorded(recorder)) == ["wait", "wait"]
+
+
+def test_nothing_is_recorded_without_a_recorder():
+    assert Page().open() is None
@@ -0,0 +1,55 @@
+import json
+import time
+
+from utils.driver_factory import build_options
+from utils.network_capture import NetworkCapture
+from utils.wait_policy import WaitPolicy
+
+PROFILE = {'headless': True, 'window_size': None, 'arguments': [], 'prefs': {}}
+
+
+def event(method, **params):
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+class LogDriver:
+    """Serves queued performance log batches, one batch per get_log call"""
+
+    def __init__(self, batches=()):
+        self.batches = list(batches)
+
+    def get_log(self, kind):
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_cdp_cmd(self, command, params):
+        return {'body': json.dumps({'page': 2, 'results': [1]}), 'base64Encoded': False}
+
+
+def test_responses_are_matched_as_they_finish():
+    url = "https://api.themoviedb.org/3/movie/popular?page=2"
+    driver = LogDriver([[], [
+        event("Network.requestWillBeSent", requestId="1", request={'method': "GET", 'url': url}),
+        event("Network.responseReceived", requestId="1", response={'status': 200}),
+        event("Network.loadingFinished", requestId="1"),
+    ]])
+    capture = NetworkCapture(driver, policy=WaitPolicy(budgets={'default': 2, 'tags': {}, 'steps': {}}))
+    response = capture.wait_for_response(lambda r: r['body']['page'] == 2)
+    assert response['status'] == 200 and response['params'] == {'page': "2"}
+
+
+def test_waits_are_bounded_by_the_wait_budget():
+    policy = WaitPolicy({"negative"}, {'default': 10, 'tags': {'negative': 0.2}, 'steps': {}})
+    policy.enter_step("then", "the API response should contain results")
+    capture = NetworkCapture(LogDriver(), policy=policy)
+    start = time.perf_counter()
+    assert capture.wait_for_response() is None
+    assert time.perf_counter() - start < 1
+    assert policy.summary()['slowest_waits'][0][0] == "api response"
+
+
+def test_performance_log_follows_the_network_capture_setting():
+    on = build_options(PROFILE, network_capture=True).to_capabilities()
+    off = build_options(PROFILE, network_capture=False).to_capabilities()
+    assert on['goog:loggingPrefs'] == {'browser': "ALL", 'performance': "ALL"}
+    assert off['goog:loggingPrefs'] == {'browser': "ALL"}
+    assert "perfLoggingPrefs" not in off['goog:chromeOptions']
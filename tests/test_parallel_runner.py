@@ -0,0 +1,89 @@
+import glob
+import re
+import subprocess
+import sys
+
+from utils.parallel_runner import build_shards, collect_scenarios, tagged_scenarios
+from utils.run_history import scenario_key
+
+FEATURE_PATHS = sorted(glob.glob("features/*.feature"))
+
+
+def feature(path, *names):
+    return (path, [(line_no, 1, name, "hash") for line_no, name in enumerate(names, start=1)])
+
+
+def test_collect_scenarios_counts_outline_rows(tmp_path):
+    path = tmp_path / "outline.feature"
+    path.write_text(
+        "Feature: Outline\n"
+        "  Scenario: Plain\n"
+        "    Given a step\n"
+        "  Scenario Outline: Rows\n"
+        "    Given <value>\n"
+        "    Examples:\n"
+        "      | value |\n"
+        "      | one   |\n"
+        "      | two   |\n",
+        encoding="utf-8",
+    )
+    [(_, scenarios)] = collect_scenarios([str(path)])
+    assert [(line_no, weight, name) for line_no, weight, name, _ in scenarios] == [(2, 1, "Plain"), (4, 2, "Rows")]
+
+
+def test_tagged_scenarios_include_feature_tags(tmp_path):
+    path = tmp_path / "tagged.feature"
+    path.write_text(
+        "@slow\n"
+        "Feature: Tagged\n"
+        "  @known_defect\n"
+        "  Scenario: Broken\n"
+        "    Given a step\n"
+        "  Scenario: Fine\n"
+        "    Given a step\n",
+        encoding="utf-8",
+    )
+    assert tagged_scenarios([str(path)], {"known_defect"}) == {scenario_key(str(path), "Broken")}
+    assert len(tagged_scenarios([str(path)], {"slow"})) == 2
+
+
+def test_every_scenario_is_assigned_once():
+    features = [feature("a.feature", "a1", "a2", "a3"), feature("b.feature", "b1", "b2")]
+    shards = build_shards(features, 2)
+    locations = [location for shard in shards for location in shard['locations']]
+    assert sorted(locations) == ["a.feature:1", "a.feature:2", "a.feature:3", "b.feature:1", "b.feature:2"]
+    assert sum(shard['weight'] for shard in shards) == 5
+
+
+def test_shards_balance_by_estimates():
+    features = [feature("a.feature", "slow", "fast1", "fast2", "fast3")]
+    estimates = {scenario_key("a.feature", "slow"): 30.0}
+    for name in ("fast1", "fast2", "fast3"):
+        estimates[scenario_key("a.feature", name)] = 10.0
+    shards = build_shards(features, 2, estimates)
+    assert sorted(shard['seconds'] for shard in shards) == [30.0, 30.0]
+
+
+def test_first_scenarios_lead_their_shard():
+    features = [feature("a.feature", "a1", "a2", "a3", "a4")]
+    shards = build_shards(features, 1, first={scenario_key("a.feature", "a3")})
+    assert shards[0]['locations'][0] == "a.feature:3"
+
+
+def test_no_more_shards_than_scenarios():
+    assert len(build_shards([feature("a.feature", "a1")], 4)) == 1
+    assert build_shards([], 4) == []
+
+
+def test_shard_locations_are_accepted_by_behave():
+    features = collect_scenarios(FEATURE_PATHS)
+    scenario_count = sum(len(scenarios) for _, scenarios in features)
+    for shard in build_shards(features, 2):
+        result = subprocess.run(
+            [sys.executable, "-m", "behave", "--dry-run", "--format=progress", *shard['locations']],
+            capture_output=True, text=True,
+        )
+        assert result.returncode == 0, result.stdout + result.stderr
+        # A dry run leaves the selected scenarios untested and skips the rest
+        untested = re.search(r"^\d+ scenarios passed, \d+ failed, \d+ skipped, (\d+) untested", result.stdout, re.M)
+        assert untested and int(untested.group(1)) == len(shard['locations']) <= scenario_count
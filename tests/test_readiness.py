@@ -0,0 +1,59 @@
+from selenium.common.exceptions import WebDriverException
+
+from utils.readiness import install, mark_rendered, wait_until_settled
+
+
+class ScriptDriver:
+    """Answers execute_async_script from a list of results; exceptions in the list are raised"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = []
+
+    def execute_async_script(self, script, *args):
+        self.calls.append(args)
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def execute_script(self, script, *args):
+        return self.execute_async_script(script, *args)
+
+
+SETTLED = {'settled': True, 'rerendered': True, 'inflight': 0}
+BUSY = {'settled': False, 'rerendered': False, 'inflight': 2}
+
+
+def test_settled_page():
+    driver = ScriptDriver(SETTLED)
+    assert wait_until_settled(driver, "open", quiet_ms=100, timeout=5) is True
+    quiet_ms, timeout_ms, selector, token = driver.calls[0]
+    assert (quiet_ms, timeout_ms) == (100, 5000)
+
+
+def test_timeout_is_reported_not_raised():
+    assert wait_until_settled(ScriptDriver(BUSY), "open", timeout=1) is False
+
+
+def test_navigation_during_the_check_retries_on_the_new_document():
+    driver = ScriptDriver(WebDriverException("javascript error: document unloaded"), SETTLED)
+    assert wait_until_settled(driver, "next page", selector=".cards", token="abc", timeout=5) is True
+    # The retry only gets what is left of the budget, for the same selector and token
+    assert driver.calls[1][1] <= 5000
+    assert driver.calls[1][2:] == (".cards", "abc")
+
+
+def test_failed_retry_degrades_to_a_timeout():
+    driver = ScriptDriver(WebDriverException("unloaded"), WebDriverException("unloaded again"))
+    assert wait_until_settled(driver, "next page", timeout=1) is False
+
+
+def test_mark_rendered_returns_a_token_only_for_rendered_elements():
+    assert mark_rendered(ScriptDriver(True), ".cards")
+    assert mark_rendered(ScriptDriver(False), ".cards") is None
+    assert mark_rendered(ScriptDriver(WebDriverException("no page")), ".cards") is None
+
+
+def test_install_without_cdp_is_not_fatal():
+    install(object())
@@ -0,0 +1,59 @@
+import os
+
+from utils.report import ResultsLog, generate_html_report, read_log, read_results
+
+
+def result(name, status, **extra):
+    return dict({'name': name, 'status': status, 'error': None, 'screenshot': None, 'performance': []}, **extra)
+
+
+def test_results_are_readable_while_the_log_is_open(tmp_path):
+    log = ResultsLog("worker-0", str(tmp_path))
+    log.append(result("first", "passed"))
+    # Flushed per scenario, a crash after this point keeps the first result
+    assert [r['name'] for r in read_log(log.path)] == ["first"]
+    log.append(result("second", "failed"))
+    log.close()
+    assert log.count == 2
+    assert [r['name'] for r in read_log(log.path)] == ["first", "second"]
+
+
+def test_truncated_last_line_is_skipped(tmp_path):
+    log = ResultsLog("run", str(tmp_path))
+    log.append(result("complete", "passed"))
+    log.close()
+    with open(log.path, "a") as f:
+        f.write('{"name": "half writ')
+    assert [r['name'] for r in read_log(log.path)] == ["complete"]
+
+
+def test_results_of_all_workers_are_merged(tmp_path):
+    for worker in range(3):
+        log = ResultsLog(f"worker-{worker}", str(tmp_path))
+        log.append(result(f"scenario {worker}", "passed"))
+        log.close()
+    assert sorted(r['name'] for r in read_results(str(tmp_path))) == ["scenario 0", "scenario 1", "scenario 2"]
+
+
+def test_report_counts_and_escapes_streamed_results(tmp_path):
+    report_path = str(tmp_path / "report.html")
+    results = iter([
+        result("passes", "passed"),
+        result("fails", "failed", error="expected <b>2010</b>"),
+        result("flakes", "flaky"),
+    ])
+    counts = generate_html_report(results, report_path)
+    assert counts == {'total': 3, 'passed': 1, 'failed': 1, 'flaky': 1}
+    with open(report_path) as f:
+        report = f.read()
+    assert "expected &lt;b&gt;2010&lt;/b&gt;" in report
+    assert report.index("passes") < report.index("fails") < report.index("flakes")
+    assert not os.path.exists(report_path + ".part")
+
+
+def test_artifact_links_are_relative_to_the_report(tmp_path):
+    report_path = str(tmp_path / "reports" / "report.html")
+    screenshot = str(tmp_path / "reports" / "artifacts" / "abc.png")
+    generate_html_report([result("fails", "failed", screenshot=screenshot, artifacts={'dom': None})], report_path)
+    with open(report_path) as f:
+        assert 'href="artifacts/abc.png"' in f.read()
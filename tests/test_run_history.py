@@ -0,0 +1,58 @@
+import pytest
+
+from utils.run_history import RunHistory, scenario_key
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = RunHistory(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+
+def test_outline_rows_share_their_outline_key():
+    assert scenario_key("features/a.feature", "Rows -- @1.2 Examples") == scenario_key("features/./a.feature", "Rows")
+
+
+def test_estimates_average_per_run_totals(history):
+    history.start_run("r1", started=1)
+    history.start_run("r2", started=2)
+    history.record("r1", "a::s", "s -- @1.1", "passed", 2.0)
+    history.record("r1", "a::s", "s -- @1.2", "passed", 2.0)
+    history.record("r2", "a::s", "s -- @1.1", "passed", 6.0)
+    assert history.estimates() == {"a::s": 5.0}
+
+
+def test_estimates_only_use_recent_runs(history):
+    history.start_run("old", started=1)
+    history.start_run("new", started=2)
+    history.record("old", "a::s", "s", "passed", 100.0)
+    history.record("new", "a::s", "s", "passed", 1.0)
+    assert history.estimates(runs=1) == {"a::s": 1.0}
+
+
+def test_recent_failures_and_flake_rates(history):
+    history.start_run("r1", started=1)
+    history.start_run("r2", started=2)
+    history.record("r1", "a::s", "s", "failed", 1.0, "Then it fails")
+    history.record("r2", "a::s", "s", "flaky", 1.0)
+    history.record("r2", "a::t", "t", "passed", 1.0)
+    assert history.recent_failures() == {"a::s": (1, "Then it fails")}
+    assert history.flake_rates() == {"a::s": (1, 2)}
+
+
+def test_changed_scenarios(history):
+    for number in range(1, 5):
+        history.start_run(f"r{number}", started=number)
+    history.register_versions("r1", {"a::old": "h1"})
+    history.register_versions("r4", {"a::new": "h2"})
+    assert history.changed({"a::old": "h1", "a::new": "h2", "a::edited": "h3"}, runs=3) == {"a::new", "a::edited"}
+
+
+def test_prune_drops_old_runs(history):
+    history.start_run("old", started=1)
+    history.start_run("new")
+    history.record("old", "a::s", "s", "passed", 1.0)
+    history.record("new", "a::s", "s", "passed", 3.0)
+    assert history.prune(days=1) == 1
+    assert history.estimates() == {"a::s": 3.0}
@@ -0,0 +1,101 @@
+import gzip
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.standin import ResponseStore, StandinServer, inject_rewrite, request_key
+
+
+def test_request_key_ignores_query_order():
+    assert request_key("GET", "/3/discover/movie?page=2&sort_by=vote_average.desc") == \
+        request_key("GET", "/3/discover/movie?sort_by=vote_average.desc&page=2")
+    assert request_key("GET", "/popular") == "GET /popular"
+    assert request_key("GET", "/x?page=1") != request_key("POST", "/x?page=1")
+
+
+def test_request_key_ignores_the_api_key():
+    assert request_key("GET", "/3/movie/popular?api_key=secret&page=1") == request_key("GET", "/3/movie/popular?page=1")
+    assert request_key("GET", "/3/movie/popular?api_key=secret") == "GET /3/movie/popular"
+
+
+def test_rewrite_script_runs_before_the_app():
+    html = inject_rewrite(b"<html><head><script src='app.js'></script></head></html>")
+    assert html.index(b"__qaStandin") < html.index(b"app.js")
+    assert inject_rewrite(b"<p>no head</p>").endswith(b"<p>no head</p>")
+
+
+def test_saving_merges_with_other_processes(tmp_path):
+    path = str(tmp_path / "store.jsonl.gz")
+    first, second = ResponseStore(path), ResponseStore(path)
+    first.put("GET /a", 200, {'Content-Type': "application/json", 'Set-Cookie': "x"}, b"{}")
+    second.put("GET /b", 200, {}, b"{}")
+    first.save()
+    second.save()
+    store = ResponseStore(path).load()
+    assert len(store) == 2
+    # Only replayable headers are stored
+    assert store.get("GET /a")['headers'] == {'content-type': "application/json"}
+
+
+def test_resaving_replaces_only_keys_recorded_again(tmp_path):
+    path = str(tmp_path / "store.jsonl.gz")
+    old = ResponseStore(path)
+    old.put("GET /a", 200, {}, b"old")
+    old.put("GET /b", 200, {}, b"old")
+    old.save()
+    new = ResponseStore(path).load()
+    new.put("GET /a", 200, {}, b"new")
+    new.save()
+    with gzip.open(path, "rt") as f:
+        bodies = {entry['key']: entry['body'] for entry in map(json.loads, f)}
+    assert bodies == {"GET /a": "bmV3", "GET /b": "b2xk"}
+
+
+@pytest.fixture
+def replay(tmp_path):
+    path = str(tmp_path / "store.jsonl.gz")
+    store = ResponseStore(path)
+    store.put(request_key("GET", "/__upstream/api.themoviedb.org/3/movie/popular?page=1&language=en"), 200,
+              {'Content-Type': "application/json"}, b'{"page": 1}')
+    store.put("GET /", 200, {'Content-Type': "text/html"}, b"<html><head></head></html>")
+    store.save()
+    server = StandinServer("replay", path, port=0, latency_ms=0, error_rate=0).start()
+    yield server
+    server.stop()
+
+
+def get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as response:
+            return response.status, response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, e.read()
+
+
+def test_replay_answers_from_the_store(replay):
+    status, body = get(replay.upstream_url("https://api.themoviedb.org/3/movie/popular?language=en&page=1"))
+    assert (status, json.loads(body)) == (200, {'page': 1})
+    # Recorded without a key, replayed with one
+    status, _ = get(replay.upstream_url("https://api.themoviedb.org/3/movie/popular?page=1&language=en&api_key=k"))
+    assert status == 200
+    status, body = get(replay.url)
+    assert status == 200 and b"__qaStandin" in body
+
+
+def test_replay_misses_are_404(replay):
+    status, body = get(replay.upstream_url("https://api.themoviedb.org/3/movie/popular?page=2"))
+    assert status == 404
+    assert b"Not recorded" in body
+
+
+def test_unreachable_upstream_is_a_502_and_not_recorded(tmp_path):
+    path = str(tmp_path / "store.jsonl.gz")
+    server = StandinServer("record", path, port=0, app_url="http://127.0.0.1:9", latency_ms=0, error_rate=0).start()
+    try:
+        status, body = get(server.url + "discover")
+    finally:
+        server.stop()
+    assert status == 502 and b"Upstream unreachable" in body
+    assert len(ResponseStore(path).load()) == 0
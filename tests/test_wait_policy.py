@@ -0,0 +1,36 @@
+import time
+
+from utils.wait_policy import WaitPolicy
+
+BUDGETS = {'default': 10, 'tags': {'known_defect': 1, 'negative': 3}, 'steps': {'last page': 20}}
+
+
+def test_default_budget_outside_then_steps():
+    policy = WaitPolicy({"known_defect"}, BUDGETS)
+    assert policy.timeout == 10
+    policy.enter_step("given", "user is on discover page")
+    assert policy.timeout == 10
+
+
+def test_tag_budgets_apply_to_then_steps_and_the_tightest_wins():
+    policy = WaitPolicy({"known_defect", "negative"}, BUDGETS)
+    policy.enter_step("then", "results should show movies")
+    assert policy.timeout == 1
+
+
+def test_step_budget_wins_over_tags():
+    policy = WaitPolicy({"known_defect"}, BUDGETS)
+    policy.enter_step("then", "the last page should load")
+    assert policy.timeout == 20
+
+
+def test_blocked_time_is_attributed_to_labels():
+    policy = WaitPolicy(budgets=BUDGETS)
+    with policy.blocked("results"):
+        time.sleep(0.02)
+    with policy.blocked("results"):
+        pass
+    summary = policy.summary()
+    assert summary['blocked_seconds'] >= 0.02
+    assert summary['slowest_waits'][0][0] == "results"
+    assert summary['total_seconds'] >= summary['blocked_seconds']
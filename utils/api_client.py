@@ -0,0 +1,112 @@
+# Discover API client module
+"""
+Pooled keep-alive HTTP client for the TMDB API behind the Discover app
+
+Used by the browserless API execution mode (pages/discover_api.py). One ApiClient is
+shared by the whole run: urllib3 keeps up to API_POOL_SIZE connections per host open, so
+a scenario's requests reuse a warm TLS connection instead of opening a new one each time.
+
+Every response is recorded in an ApiCapture, which answers the same queries as
+utils/network_capture.NetworkCapture, so the API assertion steps work in both modes.
+"""
+import json
+import logging
+import time
+from urllib.parse import urlencode, urlsplit
+
+import urllib3
+
+from utils.config import API_POOL_SIZE, API_RETRIES, API_TIMEOUT, DISCOVER_API_KEY, DISCOVER_API_URL
+
+logger = logging.getLogger("api.client")
+
+
+class ApiError(Exception):
+    """The API answered with a status other than 200"""
+
+
+class ApiCapture:
+    """API responses of one scenario, in the format NetworkCapture uses"""
+
+    def __init__(self):
+        self.responses = []
+
+    def clear(self):
+        self.responses = []
+
+    def add(self, response):
+        self.responses.append(response)
+
+    def wait_for_response(self, predicate=lambda response: True):
+        """Latest response matching predicate - requests are synchronous, so there is nothing to wait for"""
+        for response in reversed(self.responses):
+            if response['body'] is not None and predicate(response):
+                return response
+        return None
+
+
+class ApiClient:
+    """GET requests against base_url over a shared connection pool"""
+
+    def __init__(self, base_url=DISCOVER_API_URL, api_key=DISCOVER_API_KEY, pool_size=API_POOL_SIZE,
+                 timeout=API_TIMEOUT, retries=API_RETRIES):
+        self.base_url = base_url.rstrip("/") + "/"
+        self.api_key = api_key
+        self.http = urllib3.PoolManager(
+            maxsize=pool_size,
+            block=True,
+            timeout=urllib3.Timeout(total=timeout),
+            retries=urllib3.Retry(total=retries, backoff_factor=0.2, status_forcelist=(429, 502, 503, 504)),
+            headers={'Accept': "application/json", 'Connection': "keep-alive"},
+        )
+        # Responses that do not change during a run, such as the genre lists
+        self.cache = {}
+        self.requests = 0
+        self.seconds = 0.0
+
+    def get(self, path, params=None, capture=None):
+        """
+        GET base_url + path with params, returns a dict with url, path, params, status and
+        body (parsed JSON, or None if the body was not JSON); recorded in capture if given
+        Raises ApiError if the status is not 200, so a bad key or endpoint fails the step at once
+        """
+        params = {k: v for k, v in (params or {}).items() if v is not None}
+        if self.api_key:
+            params['api_key'] = self.api_key
+        url = self.base_url + path.lstrip("/")
+        if params:
+            url += "?" + urlencode(params)
+
+        start = time.perf_counter()
+        raw = self.http.request("GET", url)
+        elapsed = time.perf_counter() - start
+        self.requests += 1
+        self.seconds += elapsed
+
+        try:
+            body = json.loads(raw.data)
+        except ValueError:
+            body = None
+        response = {
+            'url': url,
+            'path': urlsplit(url).path,
+            'params': {k: str(v) for k, v in params.items()},
+            'status': raw.status,
+            'body': body,
+        }
+        logged_params = {k: v for k, v in response['params'].items() if k != "api_key"}
+        logger.info(f"API {raw.status} {response['path']} {logged_params} in {elapsed * 1000:.0f} ms")
+        if capture is not None:
+            capture.add(response)
+        if raw.status != 200:
+            raise ApiError(f"API returned {raw.status} for {response['path']} {logged_params}")
+        return response
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'avg_ms': round(self.seconds / self.requests * 1000, 1) if self.requests else 0,
+        }
+
+    def close(self):
+        self.http.clear()
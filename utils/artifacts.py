@@ -0,0 +1,148 @@
+# Failure artifact module
+"""
+Capture failure artifacts without holding up browser teardown
+
+capture() only does the WebDriver round trips (screenshot, DOM, console log, URL) and
+returns right away with the paths the artifacts will have. Decoding, thumbnailing and
+disk writes run on a small thread pool, so the failing browser can go back to the pool
+(or be recycled) while its artifacts are still being written.
+
+Artifacts are content-addressed: files are named after a hash of their content, so a
+failure screen that repeats across scenarios is stored once.
+    reports/artifacts/<hash>.png        full screenshot
+    reports/artifacts/<hash>.thumb.png  thumbnail shown in the HTML report
+    reports/artifacts/<hash>.html       DOM snapshot
+    reports/artifacts/<hash>.log.json   browser console log
+    reports/artifacts/<hash>.gif        screencast clip (utils/screencast.py), if enabled
+"""
+import base64
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import ARTIFACT_WORKERS, ARTIFACTS_DIR, THUMBNAIL_SIZE
+
+logger = logging.getLogger("test.artifacts")
+
+
+def _content_key(data):
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class ArtifactStore:
+    """Content-addressed artifact folder with a background writer pool"""
+
+    def __init__(self, root=ARTIFACTS_DIR, workers=ARTIFACT_WORKERS, thumbnail_size=THUMBNAIL_SIZE):
+        self.root = root
+        self.thumbnail_size = thumbnail_size
+        os.makedirs(root, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="artifacts")
+        self._pending = []
+        self._count_lock = threading.Lock()
+        self.stored = 0
+        self.deduplicated = 0
+
+    def capture(self, driver, label):
+        """
+        Grab the raw artifacts of a failing page and queue them for writing
+        Returns {'screenshot', 'thumbnail', 'dom', 'console', 'clip', 'url'} (paths, None if not captured)
+        """
+        artifacts = {'screenshot': None, 'thumbnail': None, 'dom': None, 'console': None, 'clip': None, 'url': None}
+        try:
+            artifacts['url'] = driver.current_url
+            # Base64 as sent by chromedriver, decoded on the pool
+            screenshot = driver.get_screenshot_as_base64()
+            key = _content_key(screenshot)
+            artifacts['screenshot'] = self._path(key, ".png")
+            artifacts['thumbnail'] = self._path(key, ".thumb.png")
+            self._submit(self._write_screenshot, screenshot, artifacts['screenshot'], artifacts['thumbnail'])
+
+            dom = driver.page_source
+            artifacts['dom'] = self._path(_content_key(dom), ".html")
+            self._submit(self._write_text, dom, artifacts['dom'])
+        except WebDriverException as e:
+            logger.error(f"Could not capture failure artifacts ({label}): {e}")
+            return artifacts
+
+        try:
+            console = json.dumps(driver.get_log("browser"), indent=2)
+            artifacts['console'] = self._path(_content_key(console), ".log.json")
+            self._submit(self._write_text, console, artifacts['console'])
+        except (AttributeError, WebDriverException) as e:
+            logger.debug(f"No console log for {label}: {e}")
+
+        logger.info(f"Queued failure artifacts for {label}: {artifacts['screenshot']}")
+        return artifacts
+
+    def store(self, key, suffix, render, *args):
+        """Queue render(*args) -> bytes to be written on the pool as <key><suffix>, returns the path"""
+        path = self._path(key, suffix)
+        self._submit(self._write_rendered, path, render, *args)
+        return path
+
+    def _path(self, key, suffix):
+        return os.path.join(self.root, key + suffix)
+
+    def _submit(self, function, *args):
+        self._pending = [future for future in self._pending if not future.done()]
+        self._pending.append(self._executor.submit(function, *args))
+
+    def _exists(self, path):
+        if os.path.exists(path):
+            with self._count_lock:
+                self.deduplicated += 1
+            return True
+        return False
+
+    def _write_bytes(self, data, path):
+        # Written under a temporary name first, readers never see a partial file
+        fd, partial = tempfile.mkstemp(dir=self.root, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(partial, path)
+        with self._count_lock:
+            self.stored += 1
+
+    def _write_rendered(self, path, render, *args):
+        if not self._exists(path):
+            self._write_bytes(render(*args), path)
+
+    def _write_text(self, text, path):
+        if not self._exists(path):
+            self._write_bytes(text.encode("utf-8"), path)
+
+    def _write_screenshot(self, screenshot, path, thumbnail_path):
+        if self._exists(path):
+            return
+        png = base64.b64decode(screenshot)
+        image = Image.open(io.BytesIO(png))
+        image.thumbnail(self.thumbnail_size)
+        buffer = io.BytesIO()
+        image.save(buffer, format="PNG", optimize=True)
+        # Thumbnail first: once the full screenshot exists, both files are complete
+        self._write_bytes(buffer.getvalue(), thumbnail_path)
+        self._write_bytes(png, path)
+
+    def flush(self):
+        """Wait for every queued write, logging (not raising) failures"""
+        pending, self._pending = self._pending, []
+        for future in pending:
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Failed to write artifact: {e}")
+
+    def shutdown(self):
+        self.flush()
+        self._executor.shutdown(wait=True)
+        logger.info(f"Artifacts: {self.stored} files written, {self.deduplicated} duplicates skipped")
@@ -0,0 +1,201 @@
+# DiscoverPage benchmark module
+"""
+Micro-benchmarks for DiscoverPage operations against the local stand-in
+
+Usage:
+    python -m utils.benchmark                      # run, compare with the baseline
+    python -m utils.benchmark --save-baseline      # run and store the results as the new baseline
+    python -m utils.benchmark --iterations 50 --only select_type --only get_titles
+
+Each operation runs a few warm-up iterations and then --iterations measured ones in one
+browser, against a replay stand-in (utils/standin.py) so network time does not drown the
+framework's own cost. For every operation the run reports median, p95 and p99 latency
+and the median number of WebDriver commands it issued.
+
+Results are written to reports/benchmarks/<time>.json. Against a baseline
+(BENCHMARK_BASELINE) an operation regresses when its median latency grows by more than
+--threshold (default BENCHMARK_THRESHOLD) or it issues more WebDriver commands; any
+regression makes the run exit with code 1.
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import statistics
+import sys
+import time
+
+from pages.discover_page import DiscoverPage
+from utils.config import BENCHMARK_BASELINE, BENCHMARK_THRESHOLD, STANDIN_STORE
+from utils.driver_factory import get_driver
+from utils.logger import setup_logging
+from utils.standin import StandinServer
+
+logger = logging.getLogger("test.benchmark")
+
+WARMUP_ITERATIONS = 2
+
+
+class CommandCounter:
+    """Counts WebDriver commands sent by a driver (element commands go through driver.execute too)"""
+
+    def __init__(self, driver):
+        self.count = 0
+        execute = driver.execute
+
+        def counting_execute(*args, **kwargs):
+            self.count += 1
+            return execute(*args, **kwargs)
+
+        driver.execute = counting_execute
+
+
+def _alternate(*values):
+    return lambda page, i: values[i % len(values)]
+
+
+# name -> (prepare(page), run(page, iteration)); prepare brings the page into the state the operation needs
+BENCHMARKS = {
+    'open': (
+        lambda page: None,
+        lambda page, i: page.open(),
+    ),
+    'select_type': (
+        lambda page: page.open(),
+        lambda page, i: page.select_type(_alternate("TV Shows", "Movie")(page, i)),
+    ),
+    'select_category': (
+        lambda page: page.open(),
+        lambda page, i: page.select_category(_alternate("Top rated", "Popular")(page, i)),
+    ),
+    'set_year_range': (
+        lambda page: page.open(),
+        lambda page, i: page.set_year_range(*_alternate(("2000", "2010"), ("1990", "2020"))(page, i)),
+    ),
+    'get_titles': (
+        lambda page: page.open(),
+        lambda page, i: page.get_titles(),
+    ),
+    'click_next_page': (
+        lambda page: (page.open(), page.select_category("Popular")),
+        lambda page, i: page.click_next_page(),
+    ),
+    'get_current_page_indicator': (
+        lambda page: (page.open(), page.select_category("Popular")),
+        lambda page, i: page.get_current_page_indicator(),
+    ),
+}
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def run_benchmark(page, counter, name, iterations, warmup=WARMUP_ITERATIONS):
+    """Measure one operation, returns its statistics (latencies in ms)"""
+    prepare, operation = BENCHMARKS[name]
+    prepare(page)
+    for i in range(warmup):
+        operation(page, i)
+
+    latencies, commands = [], []
+    for i in range(warmup, warmup + iterations):
+        before = counter.count
+        start = time.perf_counter()
+        operation(page, i)
+        latencies.append((time.perf_counter() - start) * 1000)
+        commands.append(counter.count - before)
+
+    stats = {
+        'iterations': iterations,
+        'median_ms': round(statistics.median(latencies), 2),
+        'p95_ms': round(percentile(latencies, 95), 2),
+        'p99_ms': round(percentile(latencies, 99), 2),
+        'commands': statistics.median(commands),
+    }
+    logger.info(
+        f"{name}: median {stats['median_ms']} ms, p95 {stats['p95_ms']} ms, p99 {stats['p99_ms']} ms, "
+        f"{stats['commands']} WebDriver commands"
+    )
+    return stats
+
+
+def compare(results, baseline, threshold):
+    """Regression messages for operations that got slower than the baseline or send more commands"""
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        limit = base['median_ms'] * (1 + threshold)
+        if stats['median_ms'] > limit:
+            regressions.append(
+                f"{name}: median {stats['median_ms']} ms vs baseline {base['median_ms']} ms (limit {limit:.2f} ms)"
+            )
+        if stats['commands'] > base['commands']:
+            regressions.append(f"{name}: {stats['commands']} WebDriver commands vs baseline {base['commands']}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark DiscoverPage operations against the local stand-in")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="operation to run, repeatable")
+    parser.add_argument("--profile", default="fast", help="browser launch profile (default: fast)")
+    parser.add_argument("--store", default=STANDIN_STORE, help="recorded stand-in responses to replay")
+    parser.add_argument("--base-url", default=None, help="benchmark this URL instead of the stand-in")
+    parser.add_argument("--baseline", default=BENCHMARK_BASELINE)
+    parser.add_argument("--threshold", type=float, default=BENCHMARK_THRESHOLD, help="allowed median slowdown, 0.2 = 20%%")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    standin = None
+    base_url = args.base_url
+    if base_url is None:
+        if not os.path.exists(args.store):
+            parser.error(f"No recorded responses at {args.store}, record them with: python -m utils.standin --mode record")
+        # No injected latency or errors, the benchmark measures the framework
+        standin = StandinServer("replay", args.store, latency_ms=0, error_rate=0).start()
+        base_url = standin.url
+
+    driver = get_driver(args.profile)
+    counter = CommandCounter(driver)
+    page = DiscoverPage(driver, base_url)
+    results = {}
+    try:
+        for name in args.only or BENCHMARKS:
+            results[name] = run_benchmark(page, counter, name, args.iterations)
+    finally:
+        driver.quit()
+        if standin:
+            standin.stop()
+
+    os.makedirs("reports/benchmarks", exist_ok=True)
+    results_path = f"reports/benchmarks/{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(results_path, "w") as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, run with --save-baseline to create one")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    print(f"{len(results)} operations benchmarked, {len(regressions)} regressions, results in {results_path}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# Browser session pool module
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import BROWSER_PROFILE
+from utils.driver_factory import get_driver
+
+logger = logging.getLogger("browser.pool")
+
+
+def reset_session(driver):
+    """
+    Bring a used browser session back to a clean state:
+    extra tabs closed, cookies and storage cleared, console log drained, URL reset to about:blank
+    Raises WebDriverException if the session no longer responds
+    """
+    handles = driver.window_handles
+    for handle in handles[1:]:
+        driver.switch_to.window(handle)
+        driver.close()
+    driver.switch_to.window(handles[0])
+
+    # Storage is per origin, so clear it before leaving the app's page
+    driver.execute_script(
+        "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+    )
+    try:
+        # Clears cookies for every domain, not just the current one
+        driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+    except (AttributeError, WebDriverException):
+        driver.delete_all_cookies()
+
+    driver.get("about:blank")
+    # The next scenario's failure artifacts should only hold its own console messages
+    try:
+        driver.get_log("browser")
+    except (AttributeError, WebDriverException):
+        pass
+
+
+def is_alive(driver):
+    """Cheap health check - any WebDriver round trip fails on a dead session"""
+    try:
+        driver.current_window_handle
+        return True
+    except WebDriverException:
+        return False
+
+
+class BrowserPool:
+    """
+    Pool of pre-launched Chrome sessions shared by scenarios
+    Scenarios check a session out in before_scenario and return it in after_scenario
+    Sessions that cannot be reset are quit and replaced (recycled)
+    Idle sessions are kept per launch profile, up to size sessions for each profile
+    """
+
+    def __init__(self, size, factory=get_driver):
+        self.size = size
+        self._factory = factory
+        self._idle = defaultdict(deque)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.recycled = 0
+        self._launch_times = []
+
+    def _launch(self, profile_name):
+        start = time.perf_counter()
+        driver = self._factory(profile_name)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._launch_times.append(elapsed)
+        logger.info(f"Browser launched in {elapsed:.2f}s (profile: {profile_name})")
+        return driver
+
+    def warm(self, profile_name=BROWSER_PROFILE):
+        """Pre-launch the configured number of sessions for a profile in parallel"""
+        missing = self.size - len(self._idle[profile_name])
+        if missing <= 0:
+            return
+        logger.info(f"Warming browser pool with {missing} '{profile_name}' session(s)")
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            drivers = list(executor.map(lambda _: self._launch(profile_name), range(missing)))
+        with self._lock:
+            self._idle[profile_name].extend(drivers)
+
+    def checkout(self, profile_name=BROWSER_PROFILE):
+        """Get a clean session for a profile, launching a new one if none is idle"""
+        while True:
+            with self._lock:
+                idle = self._idle[profile_name]
+                driver = idle.popleft() if idle else None
+            if driver is None:
+                self.misses += 1
+                logger.info("Browser pool miss - launching new session")
+                return self._launch(profile_name)
+            if is_alive(driver):
+                self.hits += 1
+                logger.info("Browser pool hit - reusing warm session")
+                return driver
+            logger.warning("Discarding dead session found in browser pool")
+            self._discard(driver)
+
+    def checkin(self, driver, poisoned=False):
+        """
+        Return a session to the pool after resetting it
+        Poisoned sessions, or ones that fail the reset, are quit instead
+        """
+        if not poisoned:
+            try:
+                reset_session(driver)
+            except WebDriverException as e:
+                logger.warning(f"Browser session reset failed, recycling: {e}")
+                poisoned = True
+
+        with self._lock:
+            idle = self._idle[getattr(driver, 'profile_name', BROWSER_PROFILE)]
+            keep = not poisoned and len(idle) < self.size
+            if keep:
+                idle.append(driver)
+        if keep:
+            return
+        if poisoned:
+            self._discard(driver)
+        else:
+            self._quit(driver)
+
+    def _discard(self, driver):
+        self.recycled += 1
+        self._quit(driver)
+
+    @staticmethod
+    def _quit(driver):
+        try:
+            driver.quit()
+        except WebDriverException as e:
+            logger.warning(f"Error while quitting browser: {e}")
+
+    def shutdown(self):
+        """Quit every idle session"""
+        with self._lock:
+            drivers = [driver for idle in self._idle.values() for driver in idle]
+            self._idle.clear()
+        for driver in drivers:
+            self._quit(driver)
+
+    def stats(self):
+        """Hit/miss counters plus an estimate of launch time saved by reuse"""
+        avg_launch = sum(self._launch_times) / len(self._launch_times) if self._launch_times else 0.0
+        return {
+            'size': self.size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'recycled': self.recycled,
+            'launches': len(self._launch_times),
+            'avg_launch_seconds': round(avg_launch, 2),
+            'saved_seconds': round(self.hits * avg_launch, 2),
+        }
@@ -1 +1,206 @@
 # Configuration module
+import os
+
+from dotenv import load_dotenv
+
+# Allow settings to be kept in a local .env file as well as the environment
+load_dotenv()
+
+
+def get_setting(name, default=None, userdata=None):
+    """
+    Look up a setting, preferring behave -D userdata over environment variables
+    Userdata keys are lower case (browser_pool_size), environment variables upper case (BROWSER_POOL_SIZE)
+    """
+    if userdata is not None and name.lower() in userdata:
+        return userdata[name.lower()]
+    return os.getenv(name.upper(), default)
+
+
+def get_int_setting(name, default, userdata=None):
+    """Same as get_setting but always returns an int"""
+    return int(get_setting(name, default, userdata))
+
+
+def get_float_setting(name, default, userdata=None):
+    """Same as get_setting but always returns a float"""
+    return float(get_setting(name, default, userdata))
+
+
+def get_bool_setting(name, default, userdata=None):
+    """Same as get_setting but parses true/false, yes/no, on/off and 1/0"""
+    value = get_setting(name, default, userdata)
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "on")
+
+
+# Application under test
+APP_URL = get_setting("APP_URL", "https://tmdb-discover.surge.sh/")
+
+# Browser launch profiles (utils/driver_factory.py)
+# Implicit waits stay at 0: explicit waits are budgeted by utils/wait_policy.py and would stack on top
+# Selected per run with BROWSER_PROFILE / -D browser_profile=fast, or per scenario with a @profile.<name> tag
+BROWSER_PROFILES = {
+    # Close to a developer's desktop browser: visible, maximized
+    "debug": {
+        'headless': False,
+        'window_size': None,
+        'arguments': [
+            "--start-maximized",
+            "--disable-notifications",
+        ],
+        'prefs': {},
+        'implicit_wait': 0,
+    },
+    # Throughput oriented: headless, no images or web fonts, small fixed viewport, no throttling
+    "fast": {
+        'headless': True,
+        'window_size': (1280, 800),
+        'arguments': [
+            "--disable-notifications",
+            "--blink-settings=imagesEnabled=false",
+            "--disable-remote-fonts",
+            "--disable-background-timer-throttling",
+            "--disable-backgrounding-occluded-windows",
+            "--disable-renderer-backgrounding",
+            "--disable-extensions",
+            "--disable-component-extensions-with-background-pages",
+            "--disable-default-apps",
+            "--no-first-run",
+            "--disable-gpu",
+        ],
+        'prefs': {
+            "profile.managed_default_content_settings.images": 2,
+        },
+        'implicit_wait': 0,
+    },
+}
+BROWSER_PROFILE = get_setting("BROWSER_PROFILE", "debug")
+
+# Browser session pool
+# Number of Chrome sessions kept warm between scenarios (0 disables pooling)
+BROWSER_POOL_SIZE = get_int_setting("BROWSER_POOL_SIZE", 1)
+
+# Page readiness (utils/readiness.py)
+# How long the DOM and network must stay quiet before the page counts as settled
+READINESS_QUIET_MS = get_int_setting("READINESS_QUIET_MS", 50)
+# Upper bound in seconds for a settle wait
+READINESS_TIMEOUT = get_float_setting("READINESS_TIMEOUT", 10)
+# Upper bound in seconds for waiting on the result cards to be re-rendered after an action
+READINESS_RERENDER_TIMEOUT = get_float_setting("READINESS_RERENDER_TIMEOUT", 5)
+
+# Chromedriver resolution (utils/driver_factory.py)
+# Explicit chromedriver binary, skips detection and webdriver-manager entirely
+CHROMEDRIVER_PATH = get_setting("CHROMEDRIVER_PATH")
+# Per-machine cache of the Chrome version and the matching chromedriver path
+DRIVER_CACHE_PATH = get_setting(
+    "DRIVER_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "rr-qa-automation", "chromedriver.json")
+)
+
+# Local record/replay stand-in for the app (utils/standin.py)
+# off (use APP_URL directly), record (proxy and store responses) or replay (serve stored responses)
+STANDIN_MODE = get_setting("STANDIN_MODE", "off")
+STANDIN_STORE = get_setting("STANDIN_STORE", "standin/tmdb-discover.jsonl.gz")
+# 0 picks a free port
+STANDIN_PORT = get_int_setting("STANDIN_PORT", 0)
+# API hosts whose calls from the app are routed through the stand-in server
+STANDIN_API_HOSTS = get_setting("STANDIN_API_HOSTS", "api.themoviedb.org").split(",")
+# Image hosts (poster <img> sources) routed through the stand-in too, empty leaves images on the network
+STANDIN_IMAGE_HOSTS = [host for host in get_setting("STANDIN_IMAGE_HOSTS", "image.tmdb.org").split(",") if host]
+# Injected into API responses only, to simulate a slow or flaky backend
+STANDIN_LATENCY_MS = get_int_setting("STANDIN_LATENCY_MS", 0)
+STANDIN_ERROR_RATE = get_float_setting("STANDIN_ERROR_RATE", 0)
+
+# API traffic capture through DevTools (utils/network_capture.py)
+NETWORK_CAPTURE = get_bool_setting("NETWORK_CAPTURE", True)
+# Requests whose URL matches are captured (also matches calls routed through the stand-in)
+NETWORK_CAPTURE_PATTERN = get_setting("NETWORK_CAPTURE_PATTERN", r"api\.themoviedb\.org/3/")
+
+# Locator audit (pages/locators.py)
+# Lookups slower than this are reported at the end of the run
+LOCATOR_SLOW_SECONDS = get_float_setting("LOCATOR_SLOW_SECONDS", 1.0)
+
+# Wait budgets in seconds (utils/wait_policy.py)
+WAIT_BUDGETS = {
+    'default': get_float_setting("WAIT_BUDGET_DEFAULT", 15),
+    # Per scenario tag, applied to Then steps only
+    'tags': {
+        'known_defect': 1,
+        'negative': 1,
+        'smoke': 10,
+    },
+    # Per step text fragment, wins over tag budgets
+    'steps': {},
+}
+
+# Timing metrics (utils/metrics.py)
+# JSONL and Prometheus files are written here, one pair per run (and per parallel worker)
+METRICS_DIR = get_setting("METRICS_DIR", "reports/metrics")
+
+# Failure artifacts (utils/artifacts.py)
+ARTIFACTS_DIR = get_setting("ARTIFACTS_DIR", "reports/artifacts")
+# Threads that decode, thumbnail and write artifacts in the background
+ARTIFACT_WORKERS = get_int_setting("ARTIFACT_WORKERS", 2)
+# Bounding box of the screenshot thumbnails in the HTML report
+THUMBNAIL_SIZE = (320, 200)
+
+# Failure screencast (utils/screencast.py), off by default
+SCREENCAST = get_bool_setting("SCREENCAST", False)
+# Seconds of video kept in memory per browser, and a hard byte cap per browser
+SCREENCAST_SECONDS = get_float_setting("SCREENCAST_SECONDS", 10)
+SCREENCAST_MAX_BYTES = get_int_setting("SCREENCAST_MAX_BYTES", 8 * 1024 * 1024)
+# JPEG quality and bounding box of the frames Chrome sends
+SCREENCAST_QUALITY = get_int_setting("SCREENCAST_QUALITY", 50)
+SCREENCAST_SIZE = (800, 600)
+
+# Logging (utils/logger.py)
+# Level for the log files; the console never goes below INFO
+LOG_LEVEL = get_setting("LOG_LEVEL", "INFO")
+# Also write logs/automation.jsonl with scenario and step ids
+LOG_JSON = get_bool_setting("LOG_JSON", False)
+# Log files rotate at this size, keeping LOG_BACKUPS old files
+LOG_MAX_BYTES = get_int_setting("LOG_MAX_BYTES", 10 * 1024 * 1024)
+LOG_BACKUPS = get_int_setting("LOG_BACKUPS", 5)
+
+# Run history (utils/run_history.py)
+HISTORY_DB = get_setting("HISTORY_DB", "reports/history.sqlite")
+# Recent runs used for duration estimates and fail-first ordering
+HISTORY_RUNS = get_int_setting("HISTORY_RUNS", 20)
+# A scenario counts as changed while its current text was first seen within this many runs
+HISTORY_CHANGED_RUNS = get_int_setting("HISTORY_CHANGED_RUNS", 3)
+
+# Flaky scenario retries (utils/flaky.py)
+# Extra attempts for a failed scenario within the same run, 0 disables retries
+SCENARIO_RETRIES = get_int_setting("SCENARIO_RETRIES", 0)
+# Scenarios expected to fail are not retried
+RETRY_EXCLUDE_TAGS = {"known_defect"}
+
+# DiscoverPage benchmarks (utils/benchmark.py)
+BENCHMARK_BASELINE = get_setting("BENCHMARK_BASELINE", "benchmarks/baseline.json")
+# Allowed growth of an operation's median latency before it counts as a regression
+BENCHMARK_THRESHOLD = get_float_setting("BENCHMARK_THRESHOLD", 0.2)
+
+# Browserless API execution mode (pages/discover_api.py, utils/api_client.py)
+# browser or api; scenarios tagged @ui only run in browser mode
+EXECUTION_MODE = get_setting("EXECUTION_MODE", "browser")
+DISCOVER_API_URL = get_setting("DISCOVER_API_URL", "https://api.themoviedb.org/3")
+DISCOVER_API_KEY = get_setting("DISCOVER_API_KEY", "")
+# Keep-alive connections per host, request timeout in seconds, retries on 429/5xx
+API_POOL_SIZE = get_int_setting("API_POOL_SIZE", 4)
+API_TIMEOUT = get_float_setting("API_TIMEOUT", 10)
+API_RETRIES = get_int_setting("API_RETRIES", 2)
+# Endpoint behind each category per content type, used while no genre or year filter is set
+API_CATEGORY_ENDPOINTS = {
+    'Popular': {'movie': "movie/popular", 'tv': "tv/popular"},
+    'Trend': {'movie': "trending/movie/week", 'tv': "trending/tv/week"},
+    'Newest': {'movie': "movie/now_playing", 'tv': "tv/on_the_air"},
+    'Top rated': {'movie': "movie/top_rated", 'tv': "tv/top_rated"},
+}
+# Sort order of each category on discover/<type>, used once a genre or year filter is set
+API_CATEGORY_SORT = {
+    'Popular': {'movie': "popularity.desc", 'tv': "popularity.desc"},
+    'Trend': {'movie': "popularity.desc", 'tv': "popularity.desc"},
+    'Newest': {'movie': "primary_release_date.desc", 'tv': "first_air_date.desc"},
+    'Top rated': {'movie': "vote_average.desc", 'tv': "vote_average.desc"},
+}
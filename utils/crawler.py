@@ -0,0 +1,236 @@
+# Pagination crawler module
+"""
+Walk every result page of one or more category/type combinations and check consistency
+
+Usage:
+    python -m utils.crawler --crawl "Top rated" --crawl "Popular" --crawl "Top rated:TV Shows"
+    python -m utils.crawler --crawl "Top rated" --max-pages 50 --profile debug
+
+Each --crawl is "<category>" or "<category>:<type>". All crawls share one browser and run
+in separate tabs: after clicking Next in one tab the crawler moves on to the next tab, so
+page loads overlap instead of running back to back.
+
+The pipeline is made of generators (crawl -> check -> report) and keeps no page once it
+has been checked. Per crawl it only remembers title hashes, the expected page size and
+the last rating, so memory stays bounded for a full 500+ page sweep. Findings are
+appended to a JSONL file as they are found.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+
+from pages.discover_page import DiscoverPage
+from utils.config import APP_URL, READINESS_RERENDER_TIMEOUT
+from utils.driver_factory import get_driver
+from utils.logger import setup_logging
+from utils.readiness import mark_rendered, wait_until_settled
+
+logger = logging.getLogger("test.crawler")
+
+# Categories whose results are sorted, as (card field, descending)
+CATEGORY_ORDERING = {
+    "Top rated": ("rating", True),
+}
+
+PROGRESS_EVERY = 25
+
+
+class TabCrawl:
+    """One category/type combination being crawled in its own browser tab"""
+
+    def __init__(self, driver, category, type_value=None, base_url=APP_URL, max_pages=None):
+        self.driver = driver
+        self.category = category
+        self.type_value = type_value
+        self.base_url = base_url
+        self.max_pages = max_pages
+        self.label = f"{category}:{type_value}" if type_value else category
+        self.handle = None
+        self.page = None
+        self.page_number = 0
+        self.token = None
+        self.done = False
+        self.started = None
+
+    def start(self, new_tab):
+        """Open the app in a tab and apply the filters"""
+        if new_tab:
+            self.driver.switch_to.new_window('tab')
+        self.handle = self.driver.current_window_handle
+        self.page = DiscoverPage(self.driver, self.base_url)
+        self.page.open()
+        if self.type_value:
+            self.page.select_type(self.type_value)
+        self.page.select_category(self.category)
+        self.started = time.perf_counter()
+
+    def advance(self):
+        """
+        Read the current page and click Next without waiting for the result
+        The wait for the re-render happens on the next visit to this tab
+        """
+        self.driver.switch_to.window(self.handle)
+        if self.token is not None:
+            settled = wait_until_settled(
+                self.driver, f"crawl {self.label} page {self.page_number + 1}",
+                self.page.card_selector, self.token, timeout=READINESS_RERENDER_TIMEOUT
+            )
+            if not settled:
+                logger.warning(f"[{self.label}] page {self.page_number + 1} did not re-render")
+
+        snapshot = self.page.snapshot()
+        self.page_number += 1
+        record = {
+            'crawl': self.label,
+            'page': self.page_number,
+            'active_page': snapshot['active_page'],
+            'cards': snapshot['cards'],
+            'has_next': snapshot['pagination']['has_next'],
+        }
+
+        at_limit = self.max_pages is not None and self.page_number >= self.max_pages
+        if snapshot['pagination']['has_next'] and not at_limit:
+            self.token = mark_rendered(self.driver, self.page.card_selector)
+            self.page.locators.click("next_link")
+        else:
+            self.done = True
+        return record
+
+    @property
+    def pages_per_second(self):
+        elapsed = time.perf_counter() - self.started if self.started else 0
+        return self.page_number / elapsed if elapsed else 0.0
+
+
+def crawl_tabs(crawls):
+    """Round-robin over the crawls, yielding (crawl, page record) until all are done"""
+    for index, crawl in enumerate(crawls):
+        crawl.start(new_tab=index > 0)
+    active = list(crawls)
+    while active:
+        for crawl in list(active):
+            yield crawl, crawl.advance()
+            if crawl.done:
+                active.remove(crawl)
+
+
+class ConsistencyChecker:
+    """Streaming checks for one crawl: duplicates, page size, ordering, page indicator"""
+
+    def __init__(self, category):
+        self.ordering = CATEGORY_ORDERING.get(category)
+        self.seen = {}
+        self.page_size = None
+        self.last_value = None
+
+    @staticmethod
+    def _key(title):
+        # 8-byte digests keep the duplicate index small even for tens of thousands of titles
+        return hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest()
+
+    def check(self, record):
+        """Return the findings for one page record"""
+        findings = []
+        page = record['page']
+        cards = record['cards']
+
+        if record['active_page'] and record['active_page'] != str(page):
+            findings.append(f"page indicator shows {record['active_page']}")
+
+        if self.page_size is None:
+            self.page_size = len(cards)
+        elif len(cards) != self.page_size and record['has_next']:
+            # Only the last page may be short
+            findings.append(f"page size {len(cards)}, expected {self.page_size}")
+
+        for card in cards:
+            key = self._key(card['title'])
+            if key in self.seen:
+                findings.append(f"duplicate title '{card['title']}' (first seen on page {self.seen[key]})")
+            else:
+                self.seen[key] = page
+
+        if self.ordering:
+            field, descending = self.ordering
+            for card in cards:
+                value = card.get(field)
+                if value is None:
+                    continue
+                if self.last_value is not None and (value > self.last_value if descending else value < self.last_value):
+                    findings.append(f"ordering broken at '{card['title']}': {field} {value} after {self.last_value}")
+                self.last_value = value
+        return findings
+
+
+def check_pages(records):
+    """Attach findings to each (crawl, record) pair, checkers are kept per crawl"""
+    checkers = {}
+    for crawl, record in records:
+        checker = checkers.setdefault(crawl.label, ConsistencyChecker(crawl.category))
+        yield crawl, record, checker.check(record)
+
+
+def run(driver, specs, base_url=APP_URL, max_pages=None, findings_path=None):
+    """
+    Crawl every (category, type) in specs and write findings to findings_path
+    Returns a summary dict per crawl with pages, findings and pages per second
+    """
+    crawls = [TabCrawl(driver, category, type_value, base_url, max_pages) for category, type_value in specs]
+    findings_path = findings_path or f"reports/crawl-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+    os.makedirs(os.path.dirname(findings_path) or ".", exist_ok=True)
+
+    summary = {crawl.label: {'pages': 0, 'findings': 0} for crawl in crawls}
+    start = time.perf_counter()
+    total_pages = 0
+    with open(findings_path, "w") as out:
+        for crawl, record, findings in check_pages(crawl_tabs(crawls)):
+            total_pages += 1
+            summary[crawl.label]['pages'] = record['page']
+            summary[crawl.label]['findings'] += len(findings)
+            for finding in findings:
+                logger.warning(f"[{crawl.label}] page {record['page']}: {finding}")
+                out.write(json.dumps({'crawl': crawl.label, 'page': record['page'], 'finding': finding}) + "\n")
+            if total_pages % PROGRESS_EVERY == 0:
+                rate = total_pages / (time.perf_counter() - start)
+                logger.info(f"Crawled {total_pages} pages - {rate:.2f} pages/s overall")
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    for crawl in crawls:
+        summary[crawl.label]['pages_per_second'] = round(crawl.pages_per_second, 2)
+    logger.info(f"Crawl finished: {total_pages} pages in {elapsed:.1f}s ({total_pages / elapsed:.2f} pages/s), findings in {findings_path}")
+    return summary
+
+
+def parse_spec(value):
+    """'Top rated' -> ('Top rated', None), 'Top rated:TV Shows' -> ('Top rated', 'TV Shows')"""
+    category, _, type_value = value.partition(":")
+    return category.strip(), type_value.strip() or None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Crawl every result page and check pagination consistency")
+    parser.add_argument("--crawl", action="append", required=True, help='"<category>" or "<category>:<type>", repeatable')
+    parser.add_argument("--max-pages", type=int, default=None, help="stop each crawl after this many pages")
+    parser.add_argument("--profile", default="fast", help="browser launch profile (default: fast)")
+    parser.add_argument("--base-url", default=APP_URL)
+    parser.add_argument("--findings", default=None, help="JSONL file for findings (default: reports/crawl-<time>.jsonl)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    driver = get_driver(args.profile)
+    try:
+        summary = run(driver, [parse_spec(spec) for spec in args.crawl], args.base_url, args.max_pages, args.findings)
+    finally:
+        driver.quit()
+
+    for label, result in summary.items():
+        print(f"{label}: {result['pages']} pages, {result['findings']} findings, {result['pages_per_second']} pages/s")
+    return 1 if any(result['findings'] for result in summary.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
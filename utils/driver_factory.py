@@ -1,17 +1,175 @@
 # Driver factory module
+import atexit
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
 from selenium import webdriver
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.webdriver import LocalWebDriver
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.chrome.options import Options
+from utils.config import BROWSER_PROFILE, BROWSER_PROFILES, CHROMEDRIVER_PATH, DRIVER_CACHE_PATH, NETWORK_CAPTURE
+from utils.performance import install as install_performance
+from utils.readiness import install as install_readiness
+
+logger = logging.getLogger("driver.factory")
+
+# Commands that print the installed Chrome version, tried in order
+CHROME_VERSION_COMMANDS = [
+    ["google-chrome", "--version"],
+    ["google-chrome-stable", "--version"],
+    ["chromium", "--version"],
+    ["chromium-browser", "--version"],
+    ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"],
+    ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+]
+
+_service = None
+_service_lock = threading.Lock()
+
+
+class SharedServiceChrome(webdriver.Chrome):
+    """
+    Chrome session attached to the shared chromedriver service
+    The Chrome-specific commands (get_log, execute_cdp_cmd, ...) come from webdriver.Chrome;
+    quit() only ends the browser session, the chromedriver process keeps running
+    """
+
+    def __init__(self, service, options):
+        # ChromiumDriver.__init__ would start the service again; do the rest of what it does
+        # and go straight to LocalWebDriver, which marks the session local (_is_remote False)
+        self.service = service
+        self.options = options
+        LocalWebDriver.__init__(
+            self,
+            command_executor=ChromeRemoteConnection(
+                service.service_url, keep_alive=True, ignore_proxy=options._ignore_local_proxy
+            ),
+            options=options
+        )
+
+    def quit(self):
+        webdriver.Remote.quit(self)
+
+
+def get_chrome_version():
+    """Installed Chrome version (e.g. '120.0.6099.109'), or None if it cannot be detected"""
+    for command in CHROME_VERSION_COMMANDS:
+        if command[0] == "reg" and not sys.platform.startswith("win"):
+            continue
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r"\d+\.\d+\.\d+\.\d+", output)
+        if match:
+            return match.group(0)
+    return None
+
+
+def _load_cache():
+    try:
+        with open(DRIVER_CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
 
-def get_driver():
+def _save_cache(chrome_version, driver_path):
+    os.makedirs(os.path.dirname(DRIVER_CACHE_PATH), exist_ok=True)
+    with open(DRIVER_CACHE_PATH, "w") as f:
+        json.dump({'chrome_version': chrome_version, 'driver_path': driver_path}, f, indent=2)
+
+
+def resolve_driver_path():
+    """
+    Find the chromedriver binary matching the installed Chrome
+
+    The result is cached per machine and reused until the Chrome version changes,
+    so webdriver-manager only runs after a Chrome upgrade. CHROMEDRIVER_PATH skips
+    the lookup entirely, and a chromedriver on PATH is used when webdriver-manager
+    cannot reach the network (air-gapped runners).
+    """
+    if CHROMEDRIVER_PATH:
+        return CHROMEDRIVER_PATH
+
+    chrome_version = get_chrome_version()
+    cache = _load_cache()
+    cached_path = cache.get('driver_path')
+    if cached_path and os.path.isfile(cached_path) and cache.get('chrome_version') == chrome_version:
+        logger.info(f"Using cached chromedriver for Chrome {chrome_version}: {cached_path}")
+        return cached_path
+
+    logger.info(f"Resolving chromedriver for Chrome {chrome_version} (cached: {cache.get('chrome_version')})")
+    try:
+        driver_path = ChromeDriverManager().install()
+    except Exception as e:
+        driver_path = shutil.which("chromedriver")
+        if not driver_path:
+            raise
+        logger.warning(f"webdriver-manager failed ({e}), using chromedriver from PATH: {driver_path}")
+
+    _save_cache(chrome_version, driver_path)
+    return driver_path
+
+
+def get_service():
+    """Start the chromedriver service once per process and share it between sessions"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            service = Service(resolve_driver_path())
+            service.start()
+            atexit.register(service.stop)
+            _service = service
+            logger.info(f"Started shared chromedriver service at {service.service_url}")
+        return _service
+
+
+def build_options(profile, network_capture=NETWORK_CAPTURE):
+    """
+    Translate a launch profile from utils.config.BROWSER_PROFILES into Chrome options
+    network_capture turns on the performance log that utils.network_capture reads
+    """
     options = Options()
-    options.add_argument("--start-maximized")
-    options.add_argument("--disable-notifications")
-
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=options
-    )
-    driver.implicitly_wait(10)
+    if profile['headless']:
+        options.add_argument("--headless=new")
+    if profile['window_size']:
+        width, height = profile['window_size']
+        options.add_argument(f"--window-size={width},{height}")
+    for argument in profile['arguments']:
+        options.add_argument(argument)
+    if profile['prefs']:
+        options.add_experimental_option("prefs", profile['prefs'])
+    # Console messages are saved with the failure artifacts (utils.artifacts)
+    logging_prefs = {"browser": "ALL"}
+    if network_capture:
+        # Network events go to the performance log, read by utils.network_capture
+        logging_prefs["performance"] = "ALL"
+        options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    options.set_capability("goog:loggingPrefs", logging_prefs)
+    return options
+
+
+def get_driver(profile_name=None, network_capture=NETWORK_CAPTURE):
+    profile_name = profile_name or BROWSER_PROFILE
+    if profile_name not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile_name}', expected one of {sorted(BROWSER_PROFILES)}")
+    profile = BROWSER_PROFILES[profile_name]
+
+    driver = SharedServiceChrome(get_service(), build_options(profile, network_capture))
+    driver.implicitly_wait(profile['implicit_wait'])
+    # Remember the profile so the browser pool returns the session to the right queue
+    driver.profile_name = profile_name
+    # Track in-flight requests and DOM mutations on every page for DiscoverPage waits
+    install_readiness(driver)
+    # Record long tasks from the start of every page for the performance budget steps
+    install_performance(driver)
     return driver
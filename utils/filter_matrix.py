@@ -0,0 +1,274 @@
+# Filter matrix module
+"""
+Run combinations of Discover filters in one browser session
+
+Usage:
+    python -m utils.filter_matrix                       # pairwise over the default dimensions
+    python -m utils.filter_matrix --strength 3          # every 3-way interaction
+    python -m utils.filter_matrix --strength 0          # full cartesian product
+    python -m utils.filter_matrix --dimension "type=Movie,TV Shows" --dimension "year=1990-1999,2020-2024"
+
+Each --dimension is "<name>=<value>,<value>,..." and replaces the defaults (category, type,
+genre, year). Year values are "<start>-<end>".
+
+With --strength N the combinations are reduced greedily so every N-way combination of
+values still appears in at least one run (pairwise by default). The combinations are then
+ordered so consecutive ones differ in as few filters as possible, and the runner only
+changes the filters that differ from the current page state - the page is opened once and
+only reopened when applying a filter fails.
+
+Each combination is checked against the page snapshot and the app's API traffic: the type,
+genre and year dropdowns show the requested values, every card year lies inside the
+requested range and the latest results request is for the requested category. Findings
+are appended to a JSONL file; the summary reports combinations per minute.
+"""
+import argparse
+import itertools
+import json
+import logging
+import os
+import sys
+import time
+
+from pages.discover_page import DiscoverPage
+from utils.config import API_CATEGORY_ENDPOINTS, API_CATEGORY_SORT, APP_URL
+from utils.driver_factory import get_driver
+from utils.logger import setup_logging
+from utils.network_capture import NetworkCapture
+
+logger = logging.getLogger("test.matrix")
+
+# Filter dimensions and values, in the order filters are applied to the page
+FILTER_DIMENSIONS = {
+    'type': ["Movie", "TV Shows"],
+    'genre': ["Action", "Comedy", "Drama"],
+    'year': ["1990-1999", "2000-2009", "2010-2019"],
+    'category': ["Popular", "Trend", "Newest", "Top rated"],
+}
+
+# How to set each dimension on a DiscoverPage
+APPLY_FILTER = {
+    'type': lambda page, value: page.select_type(value),
+    'genre': lambda page, value: page.select_genre(value),
+    'year': lambda page, value: page.set_year_range(*value.split("-", 1)),
+    'category': lambda page, value: page.select_category(value),
+}
+
+# Relative cost of changing a dimension, the year range takes two dropdown interactions
+CHANGE_COST = {'year': 2}
+
+PROGRESS_EVERY = 10
+
+
+def all_combinations(dimensions):
+    """Cartesian product of the dimension values, as {dimension: value} dicts"""
+    names = list(dimensions)
+    return [dict(zip(names, values)) for values in itertools.product(*dimensions.values())]
+
+
+def _interactions(combination, strength):
+    return set(itertools.combinations(sorted(combination.items()), strength))
+
+
+def reduce_combinations(dimensions, strength=2):
+    """
+    Greedy n-wise reduction: keep picking the combination that covers the most
+    not yet covered strength-way value interactions until all are covered
+    strength 0 (or >= number of dimensions) returns the full product
+    """
+    candidates = all_combinations(dimensions)
+    if not strength or strength >= len(dimensions):
+        return candidates
+
+    interactions = [_interactions(combination, strength) for combination in candidates]
+    uncovered = set().union(*interactions)
+    selected = []
+    while uncovered:
+        best = max(range(len(candidates)), key=lambda index: len(interactions[index] & uncovered))
+        selected.append(candidates[best])
+        uncovered -= interactions[best]
+    return selected
+
+
+def change_cost(state, combination):
+    """Cost of moving the page from state to combination"""
+    return sum(CHANGE_COST.get(name, 1) for name, value in combination.items() if state.get(name) != value)
+
+
+def order_for_reuse(combinations):
+    """Nearest-neighbour ordering so each combination changes as few filters as possible"""
+    remaining = list(combinations)
+    ordered = []
+    state = {}
+    while remaining:
+        index = min(range(len(remaining)), key=lambda i: change_cost(state, remaining[i]))
+        state = remaining.pop(index)
+        ordered.append(state)
+    return ordered
+
+
+def check_combination(combination, snapshot, response=None):
+    """
+    Findings for one combination from the page snapshot and the latest captured
+    results response (see utils.network_capture), which tells the category apart
+    """
+    findings = []
+    filters = snapshot['filters']
+    dropdowns = filters['dropdowns']
+
+    if 'type' in combination and dropdowns and dropdowns[0] != combination['type']:
+        findings.append(f"type dropdown shows '{dropdowns[0]}'")
+
+    if 'genre' in combination and len(dropdowns) > 1 and dropdowns[1] != combination['genre']:
+        findings.append(f"genre dropdown shows '{dropdowns[1]}'")
+
+    if 'category' in combination:
+        category = combination['category']
+        media = "tv" if combination.get('type') == "TV Shows" else "movie"
+        if response is None:
+            findings.append(f"no API response captured to check category '{category}'")
+        # Without filters the app calls the category's endpoint, with filters discover/<type> sorted by it
+        elif not (response['path'].endswith(API_CATEGORY_ENDPOINTS[category][media])
+                  or response['params'].get('sort_by') == API_CATEGORY_SORT[category][media]):
+            findings.append(f"API request {response['path']} {response['params'].get('sort_by')} "
+                            f"is not for category '{category}'")
+
+    if 'year' in combination:
+        start, end = combination['year'].split("-", 1)
+        if filters['start_year'] is not None and (filters['start_year'], filters['end_year']) != (start, end):
+            findings.append(f"year dropdowns show {filters['start_year']}-{filters['end_year']}")
+        outside = [card for card in snapshot['cards'] if card['year'] and not start <= card['year'] <= end]
+        for card in outside:
+            findings.append(f"'{card['title']}' ({card['year']}) outside {start}-{end}")
+    return findings
+
+
+class MatrixRunner:
+    """Moves one DiscoverPage from combination to combination, changing only what differs"""
+
+    def __init__(self, driver, base_url=APP_URL, network=None):
+        self.page = DiscoverPage(driver, base_url)
+        # NetworkCapture of the session, the category is checked against its latest results request
+        self.network = network
+        # Filters known to be set on the page; empty after (re)opening
+        self.state = {}
+        self.changes = 0
+        self.reopens = 0
+
+    def open(self):
+        self.page.open()
+        self.state = {}
+
+    def apply(self, combination):
+        """Set the combination's filters, in dimension order, skipping those already set"""
+        for name in APPLY_FILTER:
+            if name not in combination or self.state.get(name) == combination[name]:
+                continue
+            APPLY_FILTER[name](self.page, combination[name])
+            self.state[name] = combination[name]
+            self.changes += 1
+
+    def run_one(self, combination):
+        """Apply and check one combination, returns (card count, findings)"""
+        if self.network:
+            self.network.clear()
+        try:
+            self.apply(combination)
+        except Exception as e:
+            # Page state is unknown after a failed interaction, start over from a fresh page
+            logger.warning(f"Could not apply {combination}: {e}")
+            self.reopens += 1
+            self.open()
+            return 0, [f"could not apply filters: {e}"]
+        self.page.wait_until_ready(f"matrix {combination}")
+        snapshot = self.page.snapshot()
+        response = self.network.wait_for_response(lambda r: 'results' in r['body']) if self.network else None
+        return len(snapshot['cards']), check_combination(combination, snapshot, response)
+
+
+def run(driver, combinations, base_url=APP_URL, findings_path=None):
+    """
+    Run every combination in one session and write findings to findings_path
+    Returns a summary dict with counts, filter changes and combinations per minute
+    """
+    combinations = order_for_reuse(combinations)
+    findings_path = findings_path or f"reports/matrix-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+    os.makedirs(os.path.dirname(findings_path) or ".", exist_ok=True)
+
+    runner = MatrixRunner(driver, base_url, NetworkCapture(driver))
+    start = time.perf_counter()
+    runner.open()
+    summary = {'combinations': len(combinations), 'findings': 0, 'empty': 0}
+    with open(findings_path, "w") as out:
+        for index, combination in enumerate(combinations, 1):
+            cards, findings = runner.run_one(combination)
+            summary['empty'] += 0 if cards else 1
+            summary['findings'] += len(findings)
+            for finding in findings:
+                logger.warning(f"{combination}: {finding}")
+                out.write(json.dumps({'combination': combination, 'cards': cards, 'finding': finding}) + "\n")
+            if index % PROGRESS_EVERY == 0:
+                rate = index / (time.perf_counter() - start) * 60
+                logger.info(f"{index}/{len(combinations)} combinations - {rate:.1f} per minute")
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    summary.update({
+        'seconds': round(elapsed, 1),
+        'per_minute': round(len(combinations) / elapsed * 60, 1),
+        'filter_changes': runner.changes,
+        # What opening a fresh page per combination would have cost in filter changes
+        'filter_changes_without_reuse': sum(len(combination) for combination in combinations),
+        'reopens': runner.reopens,
+        'findings_path': findings_path,
+    })
+    logger.info(
+        f"Filter matrix finished: {len(combinations)} combinations in {elapsed:.1f}s "
+        f"({summary['per_minute']} per minute), {runner.changes} filter changes "
+        f"instead of {summary['filter_changes_without_reuse']}, findings in {findings_path}"
+    )
+    return summary
+
+
+def parse_dimension(value):
+    """'type=Movie,TV Shows' -> ('type', ['Movie', 'TV Shows'])"""
+    name, _, values = value.partition("=")
+    name = name.strip()
+    if name not in APPLY_FILTER:
+        raise argparse.ArgumentTypeError(f"Unknown filter '{name}', expected one of {sorted(APPLY_FILTER)}")
+    return name, [v.strip() for v in values.split(",") if v.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run combinations of Discover filters in one browser session")
+    parser.add_argument("--dimension", action="append", type=parse_dimension, default=[],
+                        help='"<filter>=<value>,<value>", repeatable; replaces the default dimensions')
+    parser.add_argument("--strength", type=int, default=2, help="n-wise coverage, 0 for every combination (default: 2)")
+    parser.add_argument("--profile", default="fast", help="browser launch profile (default: fast)")
+    parser.add_argument("--base-url", default=APP_URL)
+    parser.add_argument("--findings", default=None, help="JSONL file for findings (default: reports/matrix-<time>.jsonl)")
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    given = dict(args.dimension)
+    # Keep the apply order of FILTER_DIMENSIONS whatever order the options came in
+    dimensions = {name: given[name] for name in APPLY_FILTER if name in given} if given else FILTER_DIMENSIONS
+    combinations = reduce_combinations(dimensions, args.strength)
+    total = len(all_combinations(dimensions))
+    logger.info(f"Running {len(combinations)} of {total} combinations (strength {args.strength or 'all'})")
+
+    # The category check reads the app's API requests from the performance log
+    driver = get_driver(args.profile, network_capture=True)
+    try:
+        summary = run(driver, combinations, args.base_url, args.findings)
+    finally:
+        driver.quit()
+
+    print(
+        f"{summary['combinations']} combinations, {summary['findings']} findings, "
+        f"{summary['empty']} without results, {summary['per_minute']} combinations/min"
+    )
+    return 1 if summary['findings'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
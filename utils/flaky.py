@@ -0,0 +1,75 @@
+# Flaky scenario retry module
+"""
+Retry failed scenarios in the same behave session
+
+enable_retries() wraps Scenario.run for every scenario of a feature (outline rows
+included), the same way behave.contrib.scenario_autoretry does, and stores the current
+attempt on the scenario (scenario.attempt, scenario.max_attempts). Every attempt goes
+through before_scenario/after_scenario, so a retry checks out the already running
+browser from the pool after its state reset instead of launching a new one.
+
+features/environment.py only reports the final attempt: a scenario that passes after
+failing is "flaky", one that fails every attempt is "failed". Errors count as failures
+here: behave reports an exception other than an AssertionError (a timeout, a refused
+connection) as Status.error rather than Status.failed.
+"""
+import logging
+
+logger = logging.getLogger("test.flaky")
+
+
+def enable_retries(feature, retries, exclude_tags=()):
+    """Allow every scenario of feature up to retries extra attempts, unless tagged with an excluded tag"""
+    for scenario in feature.walk_scenarios():
+        if set(exclude_tags) & set(scenario.effective_tags):
+            continue
+        _patch(scenario, retries + 1)
+
+
+def _patch(scenario, max_attempts):
+    run = scenario.run
+
+    def run_with_retries(runner):
+        scenario.max_attempts = max_attempts
+        # Why the earlier attempts failed, filled in by after_scenario (see failure_message)
+        scenario.retry_errors = []
+        for attempt in range(1, max_attempts + 1):
+            scenario.attempt = attempt
+            failed = run(runner)
+            if not failed:
+                if attempt > 1:
+                    logger.warning(f"Scenario passed on attempt {attempt}: {scenario.name}")
+                return False
+            if attempt < max_attempts:
+                logger.warning(f"Scenario failed on attempt {attempt} of {max_attempts}, retrying: {scenario.name}")
+        return True
+
+    scenario.run = run_with_retries
+
+
+def is_final_attempt(scenario):
+    """True if after_scenario sees the attempt that decides the outcome"""
+    return (not scenario.status.has_failed()
+            or getattr(scenario, 'attempt', 1) >= getattr(scenario, 'max_attempts', 1))
+
+
+def outcome(scenario):
+    """'passed', 'failed' or 'flaky' (passed after at least one failed attempt)"""
+    if scenario.status.has_failed():
+        return "failed"
+    return "flaky" if getattr(scenario, 'attempt', 1) > 1 else "passed"
+
+
+def failing_step(scenario):
+    """First step of the scenario that failed or raised an error, None if there is none"""
+    return next((step for step in scenario.steps if step.status.has_failed()), None)
+
+
+def failure_message(scenario):
+    """Why the scenario failed: the error of its failing step, or of a hook"""
+    step = failing_step(scenario)
+    if step is not None and step.exception:
+        return str(step.exception) or type(step.exception).__name__
+    if getattr(scenario, 'exception', None):
+        return str(scenario.exception) or type(scenario.exception).__name__
+    return getattr(scenario, 'error_message', None) or "unknown error"
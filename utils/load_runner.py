@@ -0,0 +1,429 @@
+# Load runner module
+"""
+Replay the feature files as concurrent virtual users against a locally hosted Discover app
+
+Usage:
+    python -m utils.load_runner --base-url http://localhost:3000 --users 20 --ramp-up 60 --duration 300
+    python -m utils.load_runner --users 10 --rate 0.5 --tag smoke      # paced at 0.5 scenarios/s
+    python -m utils.load_runner --standin --users 5 --duration 60
+
+Every virtual user is a thread with one headless browser (the "fast" profile by default).
+Users start evenly spread over --ramp-up seconds and loop over the selected scenarios
+until --duration has passed since the start; a scenario that is running then finishes.
+With --rate the users share one schedule of start slots, so the whole run starts at most
+that many scenarios per second; without it every user starts its next scenario right away.
+
+Scenarios run in-process: feature files are parsed and steps matched with behave's
+parser and step registry, and each scenario gets a fresh context with the same
+attributes features/environment.py sets (driver, base_url, wait_policy, network,
+test_result). Hooks, allure and the HTML report are not involved.
+
+Resources stay bounded however long the run is: one browser per user, reset between
+scenarios and relaunched every --recycle scenarios; per-step latency percentiles come
+from a fixed-size reservoir sample; the timeline has one bucket per --interval seconds.
+
+The summary (throughput, per-step latency percentiles and error rates, the timeline of
+scenarios and errors per interval, the most frequent errors) is written to
+reports/load/<time>.json. The run exits with 1 if the scenario error rate exceeds
+--max-error-rate.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from behave.parser import parse_file
+from behave.runner_util import load_step_modules
+from behave.step_registry import registry
+from selenium.common.exceptions import WebDriverException
+
+from utils.benchmark import percentile
+from utils.browser_pool import is_alive, reset_session
+from utils.config import APP_URL, NETWORK_CAPTURE
+from utils.driver_factory import get_driver
+from utils.logger import setup_logging
+from utils.network_capture import NetworkCapture
+from utils.standin import StandinServer
+from utils.wait_policy import WaitPolicy
+
+logger = logging.getLogger("test.load")
+
+# Latency samples kept per step for the percentiles
+SAMPLES_PER_STEP = 2000
+# Distinct error messages kept for the summary
+MAX_DISTINCT_ERRORS = 50
+# Seconds a user waits before relaunching a browser that failed to start or crashed its loop
+LAUNCH_BACKOFF = 5
+
+
+class VirtualUserContext:
+    """
+    What a step sees as behave's context while a virtual user replays a scenario:
+    plain attributes, plus the hook behave's Match.run uses around step functions
+    """
+
+    def __init__(self, **attributes):
+        self.__dict__.update(attributes)
+
+    @contextmanager
+    def use_with_user_mode(self):
+        yield
+
+
+def load_scenarios(features_dir="features", include_tags=(), exclude_tags=("known_defect",)):
+    """
+    Parse the feature files and match every step against the step definitions
+    Returns [(scenario, [(step, match), ...])]; raises ValueError on an undefined step
+    """
+    load_step_modules([os.path.join(features_dir, "steps")])
+    scenarios = []
+    for path in sorted(glob.glob(os.path.join(features_dir, "**", "*.feature"), recursive=True)):
+        for scenario in parse_file(path).walk_scenarios():
+            tags = set(scenario.effective_tags)
+            if include_tags and not tags & set(include_tags):
+                continue
+            if tags & set(exclude_tags):
+                continue
+            steps = []
+            for step in scenario.all_steps:
+                match = registry.find_match(step)
+                if match is None:
+                    raise ValueError(f"Undefined step in {step.filename}:{step.line}: {step.keyword} {step.name}")
+                steps.append((step, match))
+            scenarios.append((scenario, steps))
+    return scenarios
+
+
+class Pacer:
+    """Start slots shared by all users, rate per second; no pacing when rate is None"""
+
+    def __init__(self, rate=None):
+        self.interval = 1 / rate if rate else 0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, stop):
+        """Block until the caller's slot, False if stop was set in the meantime"""
+        if not self.interval:
+            return not stop.is_set()
+        with self._lock:
+            slot = max(self._next, time.monotonic())
+            self._next = slot + self.interval
+        return not stop.wait(max(0, slot - time.monotonic()))
+
+
+class LoadStats:
+    """Thread-safe counters and bounded latency samples for one load run"""
+
+    def __init__(self, interval, samples_per_step=SAMPLES_PER_STEP):
+        self.start = time.monotonic()
+        self.interval = interval
+        self.samples_per_step = samples_per_step
+        self.scenarios = Counter()
+        self.steps = {}
+        self.timeline = {}
+        self.errors = Counter()
+        self._random = random.Random(0)
+        self._lock = threading.Lock()
+
+    def _bucket(self):
+        index = int((time.monotonic() - self.start) // self.interval)
+        return self.timeline.setdefault(index, Counter())
+
+    def record_step(self, name, seconds, ok):
+        with self._lock:
+            step = self.steps.setdefault(name, {'count': 0, 'errors': 0, 'samples': []})
+            step['count'] += 1
+            step['errors'] += 0 if ok else 1
+            # Reservoir sampling: every measurement has the same chance to be kept
+            samples = step['samples']
+            if len(samples) < self.samples_per_step:
+                samples.append(seconds)
+            else:
+                slot = self._random.randrange(step['count'])
+                if slot < self.samples_per_step:
+                    samples[slot] = seconds
+            bucket = self._bucket()
+            bucket['steps'] += 1
+            bucket['step_errors'] += 0 if ok else 1
+
+    def record_scenario(self, ok, error=None):
+        with self._lock:
+            self.scenarios['passed' if ok else 'failed'] += 1
+            bucket = self._bucket()
+            bucket['scenarios'] += 1
+            bucket['failed'] += 0 if ok else 1
+            if error and (error in self.errors or len(self.errors) < MAX_DISTINCT_ERRORS):
+                self.errors[error] += 1
+
+    def interval_line(self, index):
+        """One progress line for a finished timeline bucket"""
+        with self._lock:
+            bucket = Counter(self.timeline.get(index, {}))
+        rate = bucket['scenarios'] / self.interval
+        errors = bucket['failed'] / bucket['scenarios'] if bucket['scenarios'] else 0
+        return (
+            f"t={index * self.interval:.0f}-{(index + 1) * self.interval:.0f}s: {bucket['scenarios']} scenarios "
+            f"({rate:.2f}/s), {bucket['failed']} failed ({errors:.1%}), {bucket['step_errors']} step errors"
+        )
+
+    def summary(self):
+        with self._lock:
+            elapsed = time.monotonic() - self.start
+            total = sum(self.scenarios.values())
+            steps = {}
+            for name, step in self.steps.items():
+                samples = [seconds * 1000 for seconds in step['samples']]
+                steps[name] = {
+                    'count': step['count'],
+                    'errors': step['errors'],
+                    'error_rate': round(step['errors'] / step['count'], 4),
+                    'median_ms': round(percentile(samples, 50), 1),
+                    'p95_ms': round(percentile(samples, 95), 1),
+                    'p99_ms': round(percentile(samples, 99), 1),
+                }
+            timeline = [
+                {
+                    'start_s': index * self.interval,
+                    'scenarios': bucket['scenarios'],
+                    'failed': bucket['failed'],
+                    'error_rate': round(bucket['failed'] / bucket['scenarios'], 4) if bucket['scenarios'] else 0,
+                    'per_second': round(bucket['scenarios'] / self.interval, 3),
+                    'steps': bucket['steps'],
+                    'step_errors': bucket['step_errors'],
+                }
+                for index, bucket in sorted(self.timeline.items())
+            ]
+            return {
+                'seconds': round(elapsed, 1),
+                'scenarios': total,
+                'passed': self.scenarios['passed'],
+                'failed': self.scenarios['failed'],
+                'error_rate': round(self.scenarios['failed'] / total, 4) if total else 0,
+                'per_second': round(total / elapsed, 3) if elapsed else 0,
+                'steps': steps,
+                'timeline': timeline,
+                'errors': self.errors.most_common(),
+            }
+
+
+def _error_message(error):
+    return str(error).splitlines()[0] if str(error) else type(error).__name__
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except WebDriverException as e:
+        logger.debug(f"Could not quit browser: {e}")
+
+
+class LoadRun:
+    """Virtual users replaying scenarios against base_url until the deadline"""
+
+    def __init__(self, scenarios, base_url, users, duration, ramp_up=0, rate=None, profile="fast",
+                 recycle=50, interval=10):
+        self.scenarios = scenarios
+        self.base_url = base_url
+        self.users = users
+        self.duration = duration
+        self.ramp_up = ramp_up
+        self.profile = profile
+        self.recycle = recycle
+        self.pacer = Pacer(rate)
+        self.stats = LoadStats(interval)
+        self.stop = threading.Event()
+
+    def run_scenario(self, driver, scenario, steps):
+        """Replay one scenario in driver, recording every step; returns True if it passed"""
+        try:
+            context = VirtualUserContext(
+                driver=driver,
+                base_url=self.base_url,
+                execution_mode="browser",
+                scenario=scenario,
+                wait_policy=WaitPolicy(scenario.effective_tags),
+                network=None,
+                test_result={'name': scenario.name, 'status': 'unknown', 'error': None},
+            )
+            if NETWORK_CAPTURE:
+                context.network = NetworkCapture(driver, policy=context.wait_policy)
+                context.network.clear()
+        except Exception as e:
+            message = _error_message(e)
+            logger.warning(f"{scenario.name} failed in setup: {message}")
+            self.stats.record_scenario(False, f"setup: {message[:200]}")
+            return False
+
+        for step, match in steps:
+            context.text, context.table = step.text, step.table
+            context.wait_policy.enter_step(step.step_type, step.name)
+            start = time.perf_counter()
+            try:
+                match.run(context)
+            except Exception as e:
+                self.stats.record_step(f"{step.step_type} {step.name}", time.perf_counter() - start, False)
+                message = _error_message(e)
+                logger.warning(f"{scenario.name} failed at '{step.keyword} {step.name}': {message}")
+                self.stats.record_scenario(False, f"{step.step_type} {step.name}: {message[:200]}")
+                return False
+            self.stats.record_step(f"{step.step_type} {step.name}", time.perf_counter() - start, True)
+        self.stats.record_scenario(True)
+        return True
+
+    def _launch(self):
+        try:
+            return get_driver(self.profile)
+        except WebDriverException as e:
+            logger.error(f"Browser launch failed: {e}")
+            self.stats.record_scenario(False, f"browser launch: {_error_message(e)[:200]}")
+            self.stop.wait(LAUNCH_BACKOFF)
+            return None
+
+    def virtual_user(self, user_id):
+        # Spread the user starts evenly over the ramp-up
+        if self.stop.wait(self.ramp_up * user_id / self.users):
+            return
+        driver = None
+        iteration = 0
+        try:
+            while self.pacer.wait(self.stop):
+                if driver is None:
+                    driver = self._launch()
+                    if driver is None:
+                        continue
+                # Users start at different scenarios so the mix is even from the first second
+                scenario, steps = self.scenarios[(user_id + iteration) % len(self.scenarios)]
+                iteration += 1
+                try:
+                    passed = self.run_scenario(driver, scenario, steps)
+
+                    if iteration % self.recycle == 0 or not (passed or is_alive(driver)):
+                        _quit(driver)
+                        driver = None
+                        continue
+                    try:
+                        reset_session(driver)
+                    except WebDriverException:
+                        _quit(driver)
+                        driver = None
+                except Exception as e:
+                    # Count it against the run and carry on with a fresh browser, a dead user would go unnoticed
+                    message = _error_message(e)
+                    logger.exception(f"Virtual user {user_id} failed outside a step: {message}")
+                    self.stats.record_scenario(False, f"virtual user: {message[:200]}")
+                    if driver is not None:
+                        _quit(driver)
+                        driver = None
+                    self.stop.wait(LAUNCH_BACKOFF)
+        finally:
+            if driver is not None:
+                _quit(driver)
+
+    def run(self):
+        """Run until the duration is over and all users finished their scenario, returns the summary"""
+        threads = [
+            threading.Thread(target=self.virtual_user, args=(user_id,), name=f"vu-{user_id}", daemon=True)
+            for user_id in range(self.users)
+        ]
+        for thread in threads:
+            thread.start()
+
+        reported = 0
+        interval = self.stats.interval
+        deadline = self.stats.start + self.duration
+        while time.monotonic() < deadline:
+            time.sleep(min(interval, max(0, deadline - time.monotonic())))
+            finished = int((time.monotonic() - self.stats.start) // interval)
+            for index in range(reported, finished):
+                logger.warning(self.stats.interval_line(index))
+            reported = max(reported, finished)
+
+        self.stop.set()
+        for thread in threads:
+            thread.join()
+        return self.stats.summary()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay the feature files as concurrent virtual users")
+    parser.add_argument("--users", type=int, default=5, help="concurrent virtual users (browsers)")
+    parser.add_argument("--duration", type=float, default=60, help="seconds to keep starting scenarios")
+    parser.add_argument("--ramp-up", type=float, default=0, help="seconds over which users start")
+    parser.add_argument("--rate", type=float, default=None, help="target scenarios per second for all users")
+    parser.add_argument("--tag", action="append", default=[], help="only scenarios with this tag, repeatable")
+    parser.add_argument("--exclude-tag", action="append", default=None,
+                        help="skip scenarios with this tag, repeatable (default: known_defect)")
+    parser.add_argument("--features", default="features")
+    parser.add_argument("--base-url", default=APP_URL, help="the Discover app under load")
+    parser.add_argument("--standin", action="store_true",
+                        help="serve the app from the replay stand-in instead of --base-url")
+    parser.add_argument("--profile", default="fast", help="browser launch profile (default: fast)")
+    parser.add_argument("--recycle", type=int, default=50, help="relaunch a user's browser after this many scenarios")
+    parser.add_argument("--interval", type=float, default=10, help="seconds per timeline bucket")
+    parser.add_argument("--max-error-rate", type=float, default=0.05, help="exit with 1 above this scenario error rate")
+    parser.add_argument("--log-level", default="WARNING", help="step logs at INFO get noisy with many users")
+    args = parser.parse_args(argv)
+
+    setup_logging(level=args.log_level)
+    exclude = ["known_defect"] if args.exclude_tag is None else args.exclude_tag
+    try:
+        scenarios = load_scenarios(args.features, args.tag, exclude)
+    except ValueError as e:
+        parser.error(str(e))
+    if not scenarios:
+        parser.error("No scenarios match the given tags")
+
+    standin = None
+    base_url = args.base_url
+    if args.standin:
+        standin = StandinServer("replay").start()
+        base_url = standin.url
+
+    print(
+        f"Load run: {args.users} users, {len(scenarios)} scenarios, {args.duration:.0f}s "
+        f"(ramp-up {args.ramp_up:.0f}s, rate {args.rate or 'unpaced'}) against {base_url}"
+    )
+    load = LoadRun(scenarios, base_url, args.users, args.duration, args.ramp_up, args.rate, args.profile,
+                   args.recycle, args.interval)
+    try:
+        summary = load.run()
+    finally:
+        if standin:
+            standin.stop()
+
+    summary['config'] = {
+        'users': args.users, 'duration': args.duration, 'ramp_up': args.ramp_up, 'rate': args.rate,
+        'tags': args.tag, 'exclude_tags': exclude, 'base_url': base_url, 'profile': args.profile,
+    }
+    os.makedirs("reports/load", exist_ok=True)
+    summary_path = f"reports/load/{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+
+    for name, step in sorted(summary['steps'].items(), key=lambda item: item[1]['p95_ms'], reverse=True):
+        print(
+            f"  p50 {step['median_ms']:8.1f} ms  p95 {step['p95_ms']:8.1f} ms  p99 {step['p99_ms']:8.1f} ms  "
+            f"errors {step['errors']}/{step['count']}  {name}"
+        )
+    for error, count in summary['errors'][:5]:
+        print(f"  {count}x {error}")
+    print(
+        f"{summary['scenarios']} scenarios in {summary['seconds']}s ({summary['per_second']}/s), "
+        f"{summary['failed']} failed ({summary['error_rate']:.1%}), summary in {summary_path}"
+    )
+    if not summary['scenarios']:
+        print("No scenarios finished, the run did not measure anything")
+        return 1
+    return 1 if summary['error_rate'] > args.max_error_rate else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,30 +1,147 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
+import queue
+
+from utils.config import LOG_BACKUPS, LOG_JSON, LOG_LEVEL, LOG_MAX_BYTES
+
+# Scenario/step the process is currently running, attached to every record
+_log_context = {'scenario': None, 'scenario_id': None, 'step': None, 'step_id': None, 'worker': None}
+
+# Listener thread doing the formatting and I/O and the root handler feeding it, None until setup_logging runs
+_listener = None
+_queue_handler = None
+
+
+class ContextFilter(logging.Filter):
+    """Stamp records with the current scenario and step when they are created"""
+
+    def filter(self, record):
+        for key, value in _log_context.items():
+            setattr(record, key, value)
+        return True
+
+
+class FastQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueue the record as is - the queue never leaves the process, so there is no need to
+    format or strip it on the calling thread; the listener formats it
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the scenario and step ids"""
+
+    def format(self, record):
+        entry = {
+            'ts': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'worker': record.worker,
+            'scenario': record.scenario,
+            'scenario_id': record.scenario_id,
+            'step': record.step,
+            'step_id': record.step_id,
+            'thread': record.threadName,
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def set_log_context(**values):
+    """Update the scenario/step fields attached to log records, e.g. set_log_context(step=None)"""
+    _log_context.update(values)
+
+
+def _resolve_level(level):
+    """Numeric level for a level name ("debug", "INFO") or number, None if the level is unknown"""
+    if isinstance(level, int):
+        return level
+    level = str(level).strip()
+    if level.isdigit():
+        return int(level)
+    resolved = logging.getLevelName(level.upper())
+    # getLevelName returns "Level <name>" for names it does not know
+    return resolved if isinstance(resolved, int) else None
+
+
+def setup_logging(worker_id=None, json_logs=LOG_JSON, level=LOG_LEVEL):
+    """
+    Setup minimal logging for the framework
+    Test code only puts records on a queue; a listener thread formats them and writes the
+    console, logs/automation.log and (json_logs) logs/automation.jsonl. Parallel workers
+    get their own files (automation-worker-<id>.log) and files rotate by size.
+    Calling it again is a no-op.
+    """
+    global _listener, _queue_handler
+    root_logger = logging.getLogger()
+    if _listener is not None:
+        return root_logger
 
-def setup_logging():
-    """Setup minimal logging for the framework"""
     # Create logs directory if it doesn't exist
     os.makedirs("logs", exist_ok=True)
+    _log_context['worker'] = worker_id
+    suffix = f"-worker-{worker_id}" if worker_id is not None else ""
 
     # Create formatter
     formatter = logging.Formatter('%(asctime)s | %(levelname)s | %(name)s | %(message)s')
 
-    # Console handler
+    # Console handler - stays at INFO even when the files get DEBUG
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
+    requested_level, level = level, _resolve_level(level)
+    if level is None:
+        level = logging.INFO
+    console_handler.setLevel(max(logging.INFO, level))
 
-    # File handler
-    file_handler = logging.FileHandler("logs/automation.log")
+    # File handlers
+    handlers = [console_handler]
+    file_handler = logging.handlers.RotatingFileHandler(
+        f"logs/automation{suffix}.log", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS
+    )
     file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+    if json_logs:
+        json_handler = logging.handlers.RotatingFileHandler(
+            f"logs/automation{suffix}.jsonl", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS
+        )
+        json_handler.setFormatter(JsonFormatter())
+        handlers.append(json_handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = FastQueueHandler(log_queue)
+    _queue_handler.addFilter(ContextFilter())
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
 
     # Configure root logger
-    root_logger = logging.getLogger()
-    root_logger.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
-    root_logger.addHandler(file_handler)
+    root_logger.setLevel(level)
+    root_logger.addHandler(_queue_handler)
+    if _resolve_level(requested_level) is None:
+        logging.getLogger(__name__).warning(f"Unknown log level '{requested_level}', logging at INFO")
 
     # Reduce WebDriver Manager logging noise to WARN level
     logging.getLogger('WDM').setLevel(logging.WARNING)
     logging.getLogger('urllib3').setLevel(logging.WARNING)
+    # Every WebDriver command is logged at DEBUG by selenium
+    logging.getLogger('selenium').setLevel(logging.INFO)
 
     return root_logger
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        _listener = None
+        _queue_handler = None
@@ -0,0 +1,144 @@
+# Timing metrics module
+"""
+Per-phase timing for a test run, exported as JSONL and Prometheus text
+
+Phases recorded by features/environment.py: browser_launch, scenario, step, screenshot,
+teardown. Every public DiscoverPage method (open included) is recorded under the
+discover_page phase through the timed_methods class decorator.
+
+Every measurement is appended to reports/metrics/<run_id>.jsonl as it happens; close()
+writes reports/metrics/<run_id>.prom with per phase/name sum, count and max, ready for a
+Prometheus textfile collector or a quick diff between two commits.
+"""
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from utils.config import METRICS_DIR
+
+logger = logging.getLogger("test.metrics")
+
+# Recorder used by timed_methods, set by the run that owns it
+_active = None
+# Per thread: set while a timed method runs, so the methods it calls are not timed again
+_timing = threading.local()
+
+
+class MetricsRecorder:
+    """Collects timings for one run (or one parallel worker of a run)"""
+
+    def __init__(self, run_id=None, worker_id=None, metrics_dir=METRICS_DIR):
+        self.run_id = run_id or datetime.now().strftime("%Y%m%d-%H%M%S")
+        suffix = f"-worker-{worker_id}" if worker_id is not None else ""
+        os.makedirs(metrics_dir, exist_ok=True)
+        self.jsonl_path = os.path.join(metrics_dir, f"{self.run_id}{suffix}.jsonl")
+        self.prom_path = os.path.join(metrics_dir, f"{self.run_id}{suffix}.prom")
+        self.worker_id = worker_id
+        self.scenario = None
+        self._totals = {}
+        self._lock = threading.Lock()
+        self._file = open(self.jsonl_path, "a", buffering=1)
+
+    def record(self, phase, name, seconds, **labels):
+        """Store one measurement"""
+        entry = {
+            'ts': round(time.time(), 3),
+            'run_id': self.run_id,
+            'worker': self.worker_id,
+            'scenario': self.scenario,
+            'phase': phase,
+            'name': name,
+            'seconds': round(seconds, 6),
+        }
+        entry.update(labels)
+        with self._lock:
+            self._file.write(json.dumps(entry) + "\n")
+            total = self._totals.setdefault((phase, name), [0.0, 0, 0.0])
+            total[0] += seconds
+            total[1] += 1
+            total[2] = max(total[2], seconds)
+
+    @contextmanager
+    def timer(self, phase, name, **labels):
+        """Record the duration of the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, name, time.perf_counter() - start, **labels)
+
+    def close(self):
+        """Flush the JSONL file and write the Prometheus summary"""
+        with self._lock:
+            self._file.close()
+            totals = sorted(self._totals.items())
+        lines = [
+            "# HELP qa_phase_duration_seconds Time spent per phase of the test run",
+            "# TYPE qa_phase_duration_seconds summary",
+        ]
+        for (phase, name), (seconds, count, _) in totals:
+            labels = _labels(phase, name)
+            lines.append(f"qa_phase_duration_seconds_sum{{{labels}}} {seconds:.6f}")
+            lines.append(f"qa_phase_duration_seconds_count{{{labels}}} {count}")
+        lines += [
+            "# HELP qa_phase_duration_max_seconds Slowest single measurement per phase",
+            "# TYPE qa_phase_duration_max_seconds gauge",
+        ]
+        for (phase, name), (_, _, maximum) in totals:
+            lines.append(f"qa_phase_duration_max_seconds{{{_labels(phase, name)}}} {maximum:.6f}")
+        with open(self.prom_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        logger.info(f"Metrics written to {self.jsonl_path} and {self.prom_path}")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(phase, name):
+    return f'phase="{_escape(phase)}",name="{_escape(name)}"'
+
+
+def set_recorder(recorder):
+    """Make recorder the target of timed_methods (None turns recording off)"""
+    global _active
+    _active = recorder
+
+
+def get_recorder():
+    return _active
+
+
+def timed_methods(phase):
+    """
+    Class decorator recording the duration of every public method under phase
+    Only the outermost timed call on a thread is recorded (set_year_range calling
+    wait_until_ready counts once), so the phase total is not inflated by nesting
+    """
+    def decorate(cls):
+        for attribute, value in list(vars(cls).items()):
+            if attribute.startswith("_") or not callable(value):
+                continue
+            setattr(cls, attribute, _timed(phase, value))
+        return cls
+    return decorate
+
+
+def _timed(phase, method):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        recorder = _active
+        if recorder is None or getattr(_timing, 'active', False):
+            return method(*args, **kwargs)
+        _timing.active = True
+        try:
+            with recorder.timer(phase, method.__name__):
+                return method(*args, **kwargs)
+        finally:
+            _timing.active = False
+    return wrapper
@@ -0,0 +1,117 @@
+# Network capture module
+"""
+Capture the app's API traffic through Chrome DevTools
+
+Chrome is started with performance logging for the Network domain (see driver_factory),
+so every request and response shows up in the "performance" log. NetworkCapture reads
+that log, keeps the calls whose URL matches NETWORK_CAPTURE_PATTERN and fetches their
+JSON bodies with Network.getResponseBody, so steps can assert on what the backend
+actually returned instead of polling the rendered cards.
+"""
+import json
+import logging
+import re
+import time
+from urllib.parse import parse_qsl, urlsplit
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import NETWORK_CAPTURE_PATTERN
+from utils.wait_policy import WaitPolicy
+
+logger = logging.getLogger("network.capture")
+
+# Seconds between reads of the performance log while waiting for a response
+POLL_INTERVAL = 0.05
+
+
+class NetworkCapture:
+    """
+    Collects API responses seen by one browser session
+
+    Each captured response is a dict with url, path, params (query parameters),
+    status and body (parsed JSON, or None if the body was not JSON)
+    """
+
+    def __init__(self, driver, url_pattern=NETWORK_CAPTURE_PATTERN, policy=None):
+        self.driver = driver
+        self.url_pattern = re.compile(url_pattern)
+        # Waits for a response are bounded by the scenario's wait budget
+        self.policy = policy or WaitPolicy()
+        self.responses = []
+        self._requests = {}
+        self._statuses = {}
+
+    def clear(self):
+        """Drop everything captured so far, including log entries from an earlier scenario"""
+        try:
+            self.driver.get_log("performance")
+        except (WebDriverException, AttributeError) as e:
+            logger.debug(f"Could not drain performance log: {e}")
+        self.responses = []
+        self._requests = {}
+        self._statuses = {}
+
+    def poll(self):
+        """Read new DevTools events and return the API responses that finished since the last poll"""
+        try:
+            entries = self.driver.get_log("performance")
+        except (WebDriverException, AttributeError) as e:
+            logger.warning(f"Performance log not available, is network capture enabled? {e}")
+            return []
+
+        finished = []
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == "Network.requestWillBeSent":
+                request = params['request']
+                if request['method'] == "GET" and self.url_pattern.search(request['url']):
+                    self._requests[params['requestId']] = request['url']
+            elif method == "Network.responseReceived" and params['requestId'] in self._requests:
+                self._statuses[params['requestId']] = params['response']['status']
+            elif method == "Network.loadingFinished" and params['requestId'] in self._requests:
+                finished.append(self._build_response(params['requestId']))
+
+        self.responses.extend(finished)
+        return finished
+
+    def _build_response(self, request_id):
+        url = self._requests.pop(request_id)
+        parts = urlsplit(url)
+        body = None
+        try:
+            raw = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            body = json.loads(raw['body']) if not raw.get('base64Encoded') else None
+        except (WebDriverException, ValueError) as e:
+            logger.debug(f"No JSON body for {url}: {e}")
+        response = {
+            'url': url,
+            'path': parts.path,
+            'params': dict(parse_qsl(parts.query)),
+            'status': self._statuses.pop(request_id, None),
+            'body': body,
+        }
+        logged_params = {k: v for k, v in response['params'].items() if k != "api_key"}
+        logger.info(f"Captured API response {response['status']} {parts.path} {logged_params}")
+        return response
+
+    def wait_for_response(self, predicate=lambda response: True):
+        """
+        Wait for a captured JSON object response matching predicate, checking earlier captures first
+        Returns the newest match, or None once the current wait budget is used up
+        """
+        timeout = self.policy.timeout
+        with self.policy.blocked("api response"):
+            deadline = time.perf_counter() + timeout
+            self.poll()
+            candidates = list(self.responses)
+            while True:
+                matches = [r for r in candidates if isinstance(r['body'], dict) and predicate(r)]
+                if matches:
+                    return matches[-1]
+                if time.perf_counter() >= deadline:
+                    logger.warning(f"No matching API response within {timeout}s")
+                    return None
+                time.sleep(POLL_INTERVAL)
+                candidates = self.poll()
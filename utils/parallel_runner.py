@@ -0,0 +1,234 @@
+# Parallel behave runner module
+"""
+Run the behave suite sharded across worker processes
+
+Usage:
+    python -m utils.parallel_runner --workers 4
+    python -m utils.parallel_runner --workers 4 -- --tags=@smoke
+
+Each worker is a separate behave process with its own browser pool. Workers write
+their results to reports/results/ and allure results to one shared directory; the
+runner merges the results into a single reports/test_report.html at the end.
+
+With a run history (utils/run_history.py) shards are balanced by estimated duration,
+and scenarios that failed recently or whose steps changed run first in their shard
+(known defects, RETRY_EXCLUDE_TAGS, keep their place).
+"""
+import argparse
+import glob
+import hashlib
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+from behave.parser import parse_file
+
+from utils.config import RETRY_EXCLUDE_TAGS
+from utils.logger import setup_logging
+from utils.report import RESULTS_DIR, REPORT_PATH, generate_html_report, read_results
+from utils.run_history import RunHistory, scenario_key
+
+logger = logging.getLogger("test.parallel")
+
+ALLURE_FORMATTER = "allure_behave.formatter:AllureFormatter"
+
+
+def collect_scenarios(feature_paths):
+    """
+    Find every scenario in the given feature files
+    Returns a list of (feature_path, [(line, weight, name, text_hash), ...]) where weight is
+    the number of test cases the scenario runs (example rows for a Scenario Outline) and
+    text_hash identifies the current text of its steps
+    """
+    features = []
+    for path in feature_paths:
+        scenarios = []
+        in_outline = header_pending = False
+        with open(path, encoding="utf-8") as f:
+            for line_no, raw in enumerate(f, start=1):
+                line = raw.strip()
+                if line.startswith(("Scenario Outline:", "Scenario Template:")):
+                    scenarios.append([line_no, 0, line.split(":", 1)[1].strip(), hashlib.blake2b(digest_size=8)])
+                    in_outline = True
+                elif line.startswith("Scenario:"):
+                    scenarios.append([line_no, 1, line.split(":", 1)[1].strip(), hashlib.blake2b(digest_size=8)])
+                    in_outline = False
+                elif line.startswith(("Examples:", "Scenarios:")):
+                    header_pending = True
+                elif line.startswith("|") and in_outline:
+                    # First row of an Examples table is the header, not a test case
+                    if header_pending:
+                        header_pending = False
+                    else:
+                        scenarios[-1][1] += 1
+                if scenarios and line and not line.startswith(("#", "@")):
+                    scenarios[-1][3].update(line.encode("utf-8"))
+        if scenarios:
+            features.append((path, [
+                (line_no, max(weight, 1), name, text_hash.hexdigest())
+                for line_no, weight, name, text_hash in scenarios
+            ]))
+    return features
+
+
+def tagged_scenarios(feature_paths, tags):
+    """History keys of the scenarios carrying any of tags, on the scenario or inherited from the feature"""
+    keys = set()
+    for path in feature_paths:
+        for scenario in parse_file(path).walk_scenarios():
+            if set(tags) & set(scenario.effective_tags):
+                keys.add(scenario_key(path, scenario.name))
+    return keys
+
+
+def build_shards(features, workers, estimates=None, first=()):
+    """
+    Balance scenarios across shards by estimated duration (scenario count without history)
+
+    Features larger than an even share are split into chunks so one big feature
+    cannot pin a single worker; chunks are then assigned largest first to the
+    least loaded shard. Scenarios of a feature stay together where possible.
+    Scenarios whose key is in first get a chunk of their own that runs at the start of its shard.
+
+    estimates maps scenario keys to seconds; scenarios without history are assumed to
+    take the average time per test case of those with history.
+    """
+    estimates = estimates or {}
+    count = sum(weight for _, scenarios in features for _, weight, _, _ in scenarios)
+    if count == 0:
+        return []
+    known = [(estimates[scenario_key(path, name)], weight) for path, scenarios in features
+             for _, weight, name, _ in scenarios if scenario_key(path, name) in estimates]
+    per_case = sum(seconds for seconds, _ in known) / sum(weight for _, weight in known) if known else 1.0
+
+    def cost(path, weight, name):
+        return estimates.get(scenario_key(path, name), per_case * weight)
+
+    total = sum(cost(path, weight, name) for path, scenarios in features for _, weight, name, _ in scenarios)
+    workers = max(1, min(workers, count))
+    target = total / workers
+
+    chunks = []
+    for path, scenarios in features:
+        chunk, chunk_cost, chunk_count = [], 0.0, 0
+        for line_no, weight, name, _ in scenarios:
+            if scenario_key(path, name) in first:
+                chunks.append((cost(path, weight, name), weight, True, path, [line_no]))
+                continue
+            if chunk and chunk_cost + cost(path, weight, name) > target:
+                chunks.append((chunk_cost, chunk_count, False, path, chunk))
+                chunk, chunk_cost, chunk_count = [], 0.0, 0
+            chunk.append(line_no)
+            chunk_cost += cost(path, weight, name)
+            chunk_count += weight
+        if chunk:
+            chunks.append((chunk_cost, chunk_count, False, path, chunk))
+
+    shards = [{'weight': 0, 'seconds': 0.0, 'chunks': []} for _ in range(workers)]
+    for chunk_cost, chunk_count, priority, path, lines in sorted(chunks, key=lambda c: c[0], reverse=True):
+        shard = min(shards, key=lambda s: s['seconds'])
+        shard['weight'] += chunk_count
+        shard['seconds'] += chunk_cost
+        shard['chunks'].append((priority, [f"{path}:{line_no}" for line_no in lines]))
+    for shard in shards:
+        # Priority chunks first, otherwise keep the assignment order (stable sort);
+        # behave takes one "<path>:<line>" location per scenario
+        shard['locations'] = [
+            location for _, locations in sorted(shard.pop('chunks'), key=lambda c: not c[0]) for location in locations
+        ]
+    return [s for s in shards if s['locations']]
+
+
+def start_worker(worker_id, locations, allure_dir, behave_args, run_id):
+    """Launch one behave process for a shard, output goes to logs/worker-<id>.out"""
+    command = [
+        sys.executable, "-m", "behave", *locations,
+        "-D", f"worker_id={worker_id}",
+        "-D", f"run_id={run_id}",
+        f"--format={ALLURE_FORMATTER}", "--out", allure_dir,
+        "--format=progress",
+        *behave_args,
+    ]
+    os.makedirs("logs", exist_ok=True)
+    output = open(f"logs/worker-{worker_id}.out", "w")
+    logger.info(f"Starting worker {worker_id}: {' '.join(locations)}")
+    process = subprocess.Popen(command, stdout=output, stderr=subprocess.STDOUT)
+    return process, output
+
+
+def run(features_dir="features", workers=None, allure_dir="allure-results", behave_args=()):
+    """Shard the suite, run the shards in parallel and merge the results"""
+    workers = workers or os.cpu_count() or 1
+    feature_paths = sorted(glob.glob(os.path.join(features_dir, "*.feature")))
+    features = collect_scenarios(feature_paths)
+
+    # Workers share one run id so their metrics files and history entries group together
+    run_id = time.strftime("%Y%m%d-%H%M%S")
+    history = RunHistory()
+    history.start_run(run_id)
+    hashes = {scenario_key(path, name): text_hash for path, scenarios in features for _, _, name, text_hash in scenarios}
+    failing = history.recent_failures()
+    changed = history.changed(hashes)
+    history.register_versions(run_id, hashes)
+    estimates = history.estimates()
+    history.close()
+    # Known defects fail on every run, running them first would not tell anything new
+    expected_failures = tagged_scenarios(feature_paths, RETRY_EXCLUDE_TAGS)
+    failing = (set(failing) & set(hashes)) - expected_failures
+    changed = changed - expected_failures
+    first = failing | changed
+    if first:
+        logger.info(f"Running first: {len(failing)} recently failing, {len(changed)} new or changed scenarios")
+
+    shards = build_shards(features, workers, estimates, first)
+    if not shards:
+        logger.warning(f"No scenarios found in {features_dir}")
+        return 0
+
+    # Start from a clean slate so stale worker output is not merged into this run
+    shutil.rmtree(RESULTS_DIR, ignore_errors=True)
+    shutil.rmtree(allure_dir, ignore_errors=True)
+    os.makedirs(allure_dir, exist_ok=True)
+
+    logger.info(f"Running {sum(s['weight'] for s in shards)} scenarios on {len(shards)} workers")
+    if estimates:
+        shard_seconds = ", ".join(f"{shard['seconds']:.0f}s" for shard in shards)
+        logger.info(f"Estimated run time: {max(s['seconds'] for s in shards):.0f}s (shards: {shard_seconds})")
+    start = time.perf_counter()
+    running = [
+        start_worker(worker_id, shard['locations'], allure_dir, behave_args, run_id)
+        for worker_id, shard in enumerate(shards)
+    ]
+
+    exit_code = 0
+    for worker_id, (process, output) in enumerate(running):
+        return_code = process.wait()
+        output.close()
+        logger.info(f"Worker {worker_id} finished with exit code {return_code}")
+        exit_code = exit_code or return_code
+
+    # Workers log results as they go, so even a crashed worker's finished scenarios are reported
+    counts = generate_html_report(read_results(), REPORT_PATH)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Parallel run finished in {elapsed:.1f}s - {counts['total']} results, {counts['failed']} failed")
+    return exit_code
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run behave features in parallel worker processes")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes (default: CPU count)")
+    parser.add_argument("--features", default="features", help="directory containing the .feature files")
+    parser.add_argument("--allure-dir", default="allure-results", help="shared allure results directory")
+    parser.add_argument("behave_args", nargs=argparse.REMAINDER, help="extra behave arguments after --")
+    args = parser.parse_args(argv)
+
+    behave_args = args.behave_args[1:] if args.behave_args[:1] == ["--"] else args.behave_args
+    setup_logging()
+    return run(args.features, args.workers, args.allure_dir, behave_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+# Front-end performance module
+"""
+Read front-end timings from the browser Performance API
+
+An observer script is registered on every new document (next to the readiness
+instrumentation) so long tasks are recorded from the start of the page. measure() then
+collects, in one WebDriver round trip:
+    navigation  - Navigation Timing and paint timing for the current document, and an
+                  interactive time: the latest of DOMContentLoaded, the end of the last
+                  long task and the last DOM/network activity seen by utils/readiness.py
+    interaction - time from a performance_now() taken before an in-page action (select a
+                  filter, change page) to the last DOM/network activity it caused
+Both include the long tasks and resource timing entries since the start point.
+"""
+import logging
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger("page.performance")
+
+# Long tasks longer than this block input; the excess counts towards blocking time
+LONG_TASK_THRESHOLD_MS = 50
+
+OBSERVER_JS = """
+(function () {
+    if (window.__qaPerf) { return; }
+    var state = window.__qaPerf = {longTasks: [], supported: true};
+    try { performance.setResourceTimingBufferSize(1000); } catch (e) {}
+    try {
+        new PerformanceObserver(function (list) {
+            list.getEntries().forEach(function (entry) {
+                state.longTasks.push({start: entry.startTime, duration: entry.duration});
+            });
+        }).observe({type: 'longtask', buffered: true});
+    } catch (e) { state.supported = false; }
+})();
+"""
+
+MEASURE_JS = OBSERVER_JS + """
+var since = arguments[0], threshold = arguments[1];
+var perf = window.__qaPerf, ready = window.__qaReadiness, now = performance.now();
+var from = since === null ? 0 : since;
+var settled = ready ? Math.max(ready.lastMutation, ready.lastNetwork) - performance.timeOrigin : now;
+settled = Math.min(Math.max(settled, from), now);
+
+var tasks = perf.longTasks.filter(function (t) { return t.start >= from; });
+var resources = performance.getEntriesByType('resource').filter(function (r) { return r.startTime >= from; });
+var lastTaskEnd = 0;
+var result = {
+    long_tasks: tasks.length, long_task_ms: 0, blocking_ms: 0, long_tasks_supported: perf.supported,
+    resources: resources.length, transfer_bytes: 0, slowest_resource_ms: 0
+};
+tasks.forEach(function (t) {
+    result.long_task_ms += t.duration;
+    result.blocking_ms += Math.max(0, t.duration - threshold);
+    lastTaskEnd = Math.max(lastTaskEnd, t.start + t.duration);
+});
+resources.forEach(function (r) {
+    result.transfer_bytes += r.transferSize || 0;
+    result.slowest_resource_ms = Math.max(result.slowest_resource_ms, r.duration);
+});
+
+if (since === null) {
+    var nav = performance.getEntriesByType('navigation')[0] || {};
+    var paints = {};
+    performance.getEntriesByType('paint').forEach(function (p) { paints[p.name] = p.startTime; });
+    result.kind = 'navigation';
+    result.ttfb_ms = nav.responseStart || null;
+    result.dom_interactive_ms = nav.domInteractive || null;
+    result.dom_content_loaded_ms = nav.domContentLoadedEventEnd || null;
+    result.load_ms = nav.loadEventEnd || null;
+    result.first_paint_ms = paints['first-paint'] || null;
+    result.first_contentful_paint_ms = paints['first-contentful-paint'] || null;
+    result.interactive_ms = Math.max(nav.domContentLoadedEventEnd || 0, lastTaskEnd, settled);
+    result.duration_ms = result.interactive_ms;
+} else {
+    result.kind = 'interaction';
+    result.duration_ms = settled - since;
+    result.interactive_ms = Math.max(settled, lastTaskEnd) - since;
+}
+return result;
+"""
+
+
+def install(driver):
+    """Register the long task observer for every document the driver loads"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": OBSERVER_JS})
+    except (AttributeError, WebDriverException) as e:
+        # Without CDP the observer starts on the first measure() and misses earlier long tasks
+        logger.warning(f"Could not register performance observer via CDP: {e}")
+
+
+def performance_now(driver):
+    """Current performance.now() of the page, the start point for an interaction measurement"""
+    try:
+        return driver.execute_script("return performance.now();")
+    except WebDriverException as e:
+        logger.debug(f"Could not read performance.now(): {e}")
+        return None
+
+
+def measure(driver, action, since=None):
+    """
+    Collect timings for the current document (since=None) or for an interaction started at since
+    Returns a dict with the action, kind and timings in ms (rounded), or None if the page could not be read
+    """
+    try:
+        result = driver.execute_script(MEASURE_JS, since, LONG_TASK_THRESHOLD_MS)
+    except WebDriverException as e:
+        logger.warning(f"Could not read performance timings ({action}): {e}")
+        return None
+
+    timings = {'action': action}
+    for key, value in result.items():
+        timings[key] = round(value, 1) if isinstance(value, float) else value
+    logger.info(
+        f"Performance ({action}) - {timings['kind']} {timings['duration_ms']} ms, "
+        f"interactive {timings['interactive_ms']} ms, long tasks {timings['long_tasks']} "
+        f"({timings['blocking_ms']} ms blocking), resources {timings['resources']}"
+    )
+    return timings
@@ -0,0 +1,138 @@
+# Page readiness module
+"""
+Decide when the React app has settled from real browser signals instead of fixed sleeps
+
+An instrumentation script is registered on every new document. It counts in-flight
+fetch/XHR requests and records the time of the last DOM mutation and the last finished
+request. wait_until_settled then blocks, inside the browser and in a single WebDriver
+round trip, until no request is in flight and both have been quiet for a short window.
+
+For actions that replace the results, mark_rendered tags the current card container
+before the action so the wait can also require that it has been re-rendered.
+"""
+import logging
+import time
+import uuid
+
+from selenium.common.exceptions import WebDriverException
+
+from utils.config import READINESS_QUIET_MS, READINESS_TIMEOUT
+
+logger = logging.getLogger("page.readiness")
+
+MARKER_ATTRIBUTE = "data-qa-render"
+
+INSTRUMENT_JS = """
+(function () {
+    if (window.__qaReadiness) { return; }
+    var state = window.__qaReadiness = {inflight: 0, lastMutation: Date.now(), lastNetwork: Date.now()};
+    function done() { state.inflight = Math.max(0, state.inflight - 1); state.lastNetwork = Date.now(); }
+
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function () {
+            state.inflight++;
+            try {
+                return originalFetch.apply(this, arguments).finally(done);
+            } catch (e) { done(); throw e; }
+        };
+    }
+
+    var originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        state.inflight++;
+        this.addEventListener('loadend', done, {once: true});
+        try {
+            return originalSend.apply(this, arguments);
+        } catch (e) { done(); throw e; }
+    };
+
+    function observe() {
+        new MutationObserver(function () { state.lastMutation = Date.now(); }).observe(
+            document.documentElement, {childList: true, subtree: true, attributes: true, characterData: true}
+        );
+    }
+    if (document.documentElement) { observe(); } else { document.addEventListener('DOMContentLoaded', observe); }
+})();
+"""
+
+# Runs the (idempotent) instrumentation first so pages loaded before install() are still covered
+SETTLE_JS = INSTRUMENT_JS + """
+var quietMs = arguments[0], timeoutMs = arguments[1], selector = arguments[2], token = arguments[3];
+var callback = arguments[arguments.length - 1];
+var start = Date.now();
+(function check() {
+    var state = window.__qaReadiness, now = Date.now();
+    var rerendered = !token || (
+        !document.querySelector('[""" + MARKER_ATTRIBUTE + """="' + token + '"]') && !!document.querySelector(selector)
+    );
+    var quiet = state.inflight === 0 && now - state.lastMutation >= quietMs && now - state.lastNetwork >= quietMs;
+    if (quiet && rerendered) {
+        return callback({settled: true, rerendered: rerendered, inflight: 0, waited: now - start});
+    }
+    if (now - start >= timeoutMs) {
+        return callback({settled: false, rerendered: rerendered, inflight: state.inflight, waited: now - start});
+    }
+    setTimeout(check, 10);
+})();
+"""
+
+MARK_JS = """
+var element = document.querySelector(arguments[0]);
+if (!element) { return false; }
+element.setAttribute('""" + MARKER_ATTRIBUTE + """', arguments[1]);
+return true;
+"""
+
+
+def install(driver):
+    """Register the instrumentation script for every document the driver loads"""
+    try:
+        driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": INSTRUMENT_JS})
+    except (AttributeError, WebDriverException) as e:
+        # Without CDP the script is injected on the first wait, which can miss early requests
+        logger.warning(f"Could not register readiness instrumentation via CDP: {e}")
+
+
+def mark_rendered(driver, selector):
+    """
+    Tag the first element matching selector before an action that re-renders it
+    Returns a token for wait_until_settled, or None if nothing is rendered yet
+    """
+    token = uuid.uuid4().hex[:8]
+    try:
+        return token if driver.execute_script(MARK_JS, selector, token) else None
+    except WebDriverException:
+        return None
+
+
+def wait_until_settled(driver, label, selector=None, token=None, quiet_ms=READINESS_QUIET_MS, timeout=READINESS_TIMEOUT):
+    """
+    Block until requests are finished and the DOM has been quiet for quiet_ms
+    With a token from mark_rendered, also wait for the marked element to be replaced
+    Returns True if the page settled, False if the timeout was reached first
+    """
+    start = time.perf_counter()
+    try:
+        result = driver.execute_async_script(SETTLE_JS, quiet_ms, int(timeout * 1000), selector, token)
+    except WebDriverException as e:
+        # Navigation while the script runs unloads it; the new document is checked once more
+        logger.debug(f"Readiness check interrupted ({label}): {e}")
+        remaining = max(0.0, timeout - (time.perf_counter() - start))
+        try:
+            result = driver.execute_async_script(SETTLE_JS, quiet_ms, int(remaining * 1000), selector, token)
+        except WebDriverException as e:
+            # Treated like a timeout, the step's own waits decide whether the page is usable
+            waited_ms = (time.perf_counter() - start) * 1000
+            logger.warning(f"Page not settled after {waited_ms:.0f} ms ({label}) - readiness check failed: {e}")
+            return False
+
+    waited_ms = (time.perf_counter() - start) * 1000
+    if result['settled']:
+        logger.info(f"Page settled after {waited_ms:.0f} ms ({label})")
+    else:
+        logger.warning(
+            f"Page not settled after {waited_ms:.0f} ms ({label}) - "
+            f"in-flight requests: {result['inflight']}, re-rendered: {result['rerendered']}"
+        )
+    return result['settled']
@@ -0,0 +1,199 @@
+# Test report module
+"""
+Durable results log and streamed HTML report
+
+Scenario results are appended to a JSONL log (reports/results/<run or worker>.jsonl) as
+soon as each scenario finishes, and the HTML report is rendered once at the end of the
+run. Rendering streams one row at a time to disk, so cost and memory stay flat however
+many scenarios ran.
+
+If a run is killed before the report is rendered, the log still holds every finished
+scenario; render what was logged with:
+    python -m utils.report
+"""
+import argparse
+import glob
+import html
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from utils.logger import setup_logging
+
+logger = logging.getLogger("test.report")
+
+REPORT_PATH = "reports/test_report.html"
+RESULTS_DIR = "reports/results"
+
+REPORT_HEADER = """
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <title>QA Automation Test Report</title>
+        <style>
+            body {{ font-family: Arial, sans-serif; margin: 20px; }}
+            .passed {{ color: green; }}
+            .failed {{ color: red; }}
+            .unknown {{ color: orange; }}
+            .flaky {{ color: darkorange; }}
+            table {{ border-collapse: collapse; width: 100%; }}
+            th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+            th {{ background-color: #f2f2f2; }}
+            img {{ max-width: 300px; max-height: 200px; }}
+        </style>
+    </head>
+    <body>
+        <h1>QA Automation Test Report</h1>
+        <p><strong>Feature:</strong> Filter functionality</p>
+        <p><strong>Total Tests:</strong> {total}</p>
+        <p><strong>Passed:</strong> <span class="passed">{passed}</span></p>
+        <p><strong>Failed:</strong> <span class="failed">{failed}</span></p>
+        <p><strong>Flaky (passed on retry):</strong> <span class="flaky">{flaky}</span></p>
+
+        <h2>Test Results</h2>
+        <table>
+            <tr>
+                <th>Test Name</th>
+                <th>Status</th>
+                <th>Error Message</th>
+                <th>Performance</th>
+                <th>Screenshot</th>
+            </tr>
+"""
+
+REPORT_ROW = """
+            <tr>
+                <td>{name}</td>
+                <td class="{status}">{status_label}</td>
+                <td>{error}</td>
+                <td>{performance}</td>
+                <td>{screenshot}</td>
+            </tr>
+"""
+
+REPORT_FOOTER = """
+        </table>
+    </body>
+    </html>
+"""
+
+
+class ResultsLog:
+    """Append-only JSONL log of scenario results, one line written and flushed per scenario"""
+
+    def __init__(self, name, results_dir=RESULTS_DIR):
+        os.makedirs(results_dir, exist_ok=True)
+        self.path = os.path.join(results_dir, f"{name}.jsonl")
+        self.count = 0
+        # Each run starts its own log, a crashed earlier run is not mixed into this one
+        self._file = open(self.path, "w")
+
+    def append(self, result):
+        self._file.write(json.dumps(result) + "\n")
+        # Flushed to the OS per scenario so a crash loses at most the scenario being written
+        self._file.flush()
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+def read_log(path):
+    """
+    Yield the results of one log file, one at a time
+    A truncated last line (the run died while writing it) is skipped
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            try:
+                yield json.loads(line)
+            except ValueError:
+                logger.warning(f"Skipping unreadable result at {path}:{line_number}")
+
+
+def read_results(results_dir=RESULTS_DIR):
+    """Yield every result logged in results_dir, e.g. the logs of all parallel workers"""
+    for path in sorted(glob.glob(os.path.join(results_dir, "*.jsonl"))):
+        yield from read_log(path)
+
+
+def _link(path, report_dir):
+    """Artifact path as seen from the report's folder"""
+    return html.escape(os.path.relpath(path, report_dir).replace(os.sep, "/"))
+
+
+def _render_row(result, report_dir):
+    performance = '<br>'.join(
+        html.escape(
+            f"{m['action']}: {m['duration_ms']} ms (interactive {m['interactive_ms']} ms, blocking {m['blocking_ms']} ms)"
+        )
+        for m in result.get('performance', [])
+    )
+    screenshot = result.get('screenshot')
+    screenshot_html = 'N/A'
+    if screenshot:
+        artifacts = result.get('artifacts') or {}
+        thumbnail = artifacts.get('thumbnail') or screenshot
+        screenshot_html = f'<a href="{_link(screenshot, report_dir)}"><img src="{_link(thumbnail, report_dir)}" alt="Screenshot"></a>'
+        if artifacts.get('dom'):
+            screenshot_html += f'<br><a href="{_link(artifacts["dom"], report_dir)}">DOM</a>'
+        if artifacts.get('console'):
+            screenshot_html += f' | <a href="{_link(artifacts["console"], report_dir)}">Console</a>'
+        if artifacts.get('clip'):
+            screenshot_html += f' | <a href="{_link(artifacts["clip"], report_dir)}">Clip</a>'
+    return REPORT_ROW.format(
+        name=html.escape(result['name']),
+        status=result['status'],
+        status_label=result['status'].upper(),
+        error=html.escape(result.get('error') or 'N/A'),
+        performance=performance or 'N/A',
+        screenshot=screenshot_html,
+    )
+
+
+def generate_html_report(results, report_path=REPORT_PATH):
+    """
+    Generate a simple HTML report with test results and screenshots
+    results can be any iterable, e.g. read_results(); it is consumed once
+    """
+    report_dir = os.path.dirname(report_path) or "."
+    os.makedirs(report_dir, exist_ok=True)
+    counts = {'total': 0, 'passed': 0, 'failed': 0, 'flaky': 0}
+
+    # Rows are streamed to a scratch file while counting, the summary header needs the totals
+    with tempfile.TemporaryFile("w+", dir=report_dir) as rows:
+        for result in results:
+            counts['total'] += 1
+            if result['status'] in counts:
+                counts[result['status']] += 1
+            rows.write(_render_row(result, report_dir))
+        rows.seek(0)
+
+        partial_path = report_path + ".part"
+        with open(partial_path, "w") as f:
+            f.write(REPORT_HEADER.format(**counts))
+            for chunk in iter(lambda: rows.read(64 * 1024), ""):
+                f.write(chunk)
+            f.write(REPORT_FOOTER)
+    # The previous report stays readable until the new one is complete
+    os.replace(partial_path, report_path)
+
+    logger.info(f"HTML test report generated: {report_path} ({counts['total']} results)")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render the HTML report from the logged scenario results")
+    parser.add_argument("--results-dir", default=RESULTS_DIR)
+    parser.add_argument("--report", default=REPORT_PATH)
+    args = parser.parse_args(argv)
+
+    setup_logging()
+    counts = generate_html_report(read_results(args.results_dir), args.report)
+    return 0 if counts['total'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+# Run history module
+"""
+Scenario outcomes and durations across runs, in a local SQLite database
+
+features/environment.py records every scenario (status: passed, failed or flaky; duration;
+failing step) under the run id; utils/parallel_runner.py reads the history to
+    - run recently failing and recently changed scenarios first
+    - weight shards by estimated duration instead of scenario count
+    - estimate how long the whole run will take
+
+Scenarios are keyed by "<feature file>::<scenario name>" (example rows of an outline share
+their outline's key), so the key survives edits that move lines. A scenario counts as
+changed while the current text of its steps was first seen within the last few runs.
+
+Queries only look at the most recent HISTORY_RUNS runs and use indexes on the run id, so
+they stay fast with months of history; prune() drops runs older than a given age.
+
+    python -m utils.run_history               # slowest and recently failing scenarios
+    python -m utils.run_history --prune-days 90
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import time
+
+from utils.config import HISTORY_CHANGED_RUNS, HISTORY_DB, HISTORY_RUNS
+
+logger = logging.getLogger("test.history")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    started REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_started ON runs (started);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    scenario_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL NOT NULL,
+    failing_step TEXT,
+    finished REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_run ON results (run_id, scenario_key);
+
+CREATE TABLE IF NOT EXISTS versions (
+    scenario_key TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    first_run_started REAL NOT NULL,
+    PRIMARY KEY (scenario_key, text_hash)
+);
+"""
+
+# Most recent runs considered by the queries below
+RECENT_RUNS = "SELECT id FROM runs ORDER BY started DESC LIMIT ?"
+
+
+def scenario_key(path, name):
+    """History key of a scenario; outline rows ("Name -- @1.1 Examples") map to their outline"""
+    return f"{os.path.normpath(path)}::{name.split(' -- @')[0]}"
+
+
+class RunHistory:
+    """Read/write access to the history database, safe to share between worker processes"""
+
+    def __init__(self, path=HISTORY_DB):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Parallel workers write to the same file: WAL lets them do so without blocking readers
+        self.db = sqlite3.connect(path, timeout=30)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def start_run(self, run_id, started=None):
+        """Register a run; workers of the same run share the id"""
+        with self.db:
+            self.db.execute("INSERT OR IGNORE INTO runs (id, started) VALUES (?, ?)", (run_id, started or time.time()))
+
+    def record(self, run_id, key, name, status, duration, failing_step=None):
+        """Store one scenario result, committed right away"""
+        with self.db:
+            self.db.execute(
+                "INSERT INTO results (run_id, scenario_key, name, status, duration, failing_step, finished) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, key, name, status, duration, failing_step, time.time()),
+            )
+
+    def register_versions(self, run_id, hashes):
+        """Remember the current step text hash of each scenario, {key: hash}"""
+        started = self.db.execute("SELECT started FROM runs WHERE id = ?", (run_id,)).fetchone()
+        started = started[0] if started else time.time()
+        with self.db:
+            self.db.executemany(
+                "INSERT OR IGNORE INTO versions (scenario_key, text_hash, first_run_started) VALUES (?, ?, ?)",
+                [(key, text_hash, started) for key, text_hash in hashes.items()],
+            )
+
+    def estimates(self, runs=HISTORY_RUNS):
+        """
+        Expected seconds per scenario key: the average over recent runs of the time the
+        scenario (all its example rows) took in that run
+        """
+        rows = self.db.execute(
+            f"SELECT scenario_key, AVG(total) FROM ("
+            f"  SELECT scenario_key, run_id, SUM(duration) AS total FROM results"
+            f"  WHERE run_id IN ({RECENT_RUNS}) GROUP BY scenario_key, run_id"
+            f") GROUP BY scenario_key",
+            (runs,),
+        )
+        return dict(rows.fetchall())
+
+    def recent_failures(self, runs=HISTORY_RUNS):
+        """{key: (failures, last failing step)} for scenarios that failed in recent runs"""
+        rows = self.db.execute(
+            f"SELECT scenario_key, COUNT(*), failing_step, MAX(finished) FROM results"
+            f" WHERE status = 'failed' AND run_id IN ({RECENT_RUNS}) GROUP BY scenario_key",
+            (runs,),
+        )
+        return {key: (count, step) for key, count, step, _ in rows.fetchall()}
+
+    def flake_rates(self, runs=HISTORY_RUNS):
+        """{key: (flaky runs, runs)} for scenarios that were flaky in recent runs"""
+        rows = self.db.execute(
+            f"SELECT scenario_key, SUM(status = 'flaky'), COUNT(*) FROM results"
+            f" WHERE run_id IN ({RECENT_RUNS}) GROUP BY scenario_key HAVING SUM(status = 'flaky') > 0",
+            (runs,),
+        )
+        return {key: (flaky, total) for key, flaky, total in rows.fetchall()}
+
+    def changed(self, hashes, runs=HISTORY_CHANGED_RUNS):
+        """Keys from {key: hash} whose current text is new or was first seen in the last runs"""
+        cutoff = self.db.execute(
+            "SELECT MIN(started) FROM (SELECT started FROM runs ORDER BY started DESC LIMIT ?)", (runs,)
+        ).fetchone()[0]
+        changed = set()
+        for key, text_hash in hashes.items():
+            row = self.db.execute(
+                "SELECT first_run_started FROM versions WHERE scenario_key = ? AND text_hash = ?", (key, text_hash)
+            ).fetchone()
+            if row is None or cutoff is None or row[0] >= cutoff:
+                changed.add(key)
+        return changed
+
+    def prune(self, days):
+        """Drop runs (and their results) older than days, returns the number of runs removed"""
+        cutoff = time.time() - days * 86400
+        with self.db:
+            old = "SELECT id FROM runs WHERE started < ?"
+            self.db.execute(f"DELETE FROM results WHERE run_id IN ({old})", (cutoff,))
+            removed = self.db.execute("DELETE FROM runs WHERE started < ?", (cutoff,)).rowcount
+        self.db.execute("VACUUM")
+        return removed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show or prune the scenario run history")
+    parser.add_argument("--db", default=HISTORY_DB)
+    parser.add_argument("--runs", type=int, default=HISTORY_RUNS, help="recent runs to consider")
+    parser.add_argument("--prune-days", type=int, default=None, help="drop runs older than this many days")
+    args = parser.parse_args(argv)
+
+    history = RunHistory(args.db)
+    if args.prune_days is not None:
+        print(f"Removed {history.prune(args.prune_days)} runs older than {args.prune_days} days")
+    estimates = history.estimates(args.runs)
+    failures = history.recent_failures(args.runs)
+    flakes = history.flake_rates(args.runs)
+    history.close()
+
+    print(f"Estimated serial run time: {sum(estimates.values()):.1f}s over {len(estimates)} scenarios")
+    for key, seconds in sorted(estimates.items(), key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {seconds:7.1f}s  {key}")
+    for key, (count, step) in sorted(failures.items(), key=lambda item: item[1][0], reverse=True):
+        print(f"  failed {count}x  {key}  ({step})")
+    for key, (flaky, total) in sorted(flakes.items(), key=lambda item: item[1][0] / item[1][1], reverse=True):
+        print(f"  flaky {flaky}/{total} ({flaky / total:.0%})  {key}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# Screencast module
+"""
+Keep the last few seconds of a browser tab in memory and save them only when a scenario fails
+
+ScreencastRecorder connects to the tab's DevTools websocket (the debugger address Chrome
+reports in its capabilities) and runs Page.startScreencast. Frames arrive as compressed
+JPEGs on a background thread and go into a ring buffer bounded by both age
+(SCREENCAST_SECONDS) and size (SCREENCAST_MAX_BYTES), so memory per browser stays
+capped however long the scenario runs and however many workers run in parallel.
+
+Nothing touches the disk unless clip() is called: after_scenario does that for failed
+scenarios only, and the frames are encoded to an animated GIF on the artifact pool.
+"""
+import base64
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+import urllib.request
+from collections import deque
+
+import websocket
+from PIL import Image
+
+from utils.config import SCREENCAST_MAX_BYTES, SCREENCAST_QUALITY, SCREENCAST_SECONDS, SCREENCAST_SIZE
+
+logger = logging.getLogger("test.screencast")
+
+
+class ScreencastRecorder:
+    """Ring buffer of screencast frames for the current tab of one driver"""
+
+    def __init__(self, driver, seconds=SCREENCAST_SECONDS, max_bytes=SCREENCAST_MAX_BYTES,
+                 quality=SCREENCAST_QUALITY, size=SCREENCAST_SIZE):
+        self.driver = driver
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.quality = quality
+        self.size = size
+        # (timestamp, jpeg bytes), oldest first
+        self._frames = deque()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._socket = None
+        self._thread = None
+        self._stopping = threading.Event()
+        self._next_id = 0
+
+    def _debugger_url(self):
+        address = self.driver.capabilities.get('goog:chromeOptions', {}).get('debuggerAddress')
+        if not address:
+            raise RuntimeError("Chrome did not report a debugger address")
+        with urllib.request.urlopen(f"http://{address}/json/list", timeout=5) as response:
+            targets = json.load(response)
+        # chromedriver window handles are DevTools target ids
+        handle = self.driver.current_window_handle
+        for target in targets:
+            if target.get('id') == handle:
+                return target['webSocketDebuggerUrl']
+        raise RuntimeError(f"No DevTools target for window {handle}")
+
+    def _send(self, method, params=None):
+        self._next_id += 1
+        self._socket.send(json.dumps({'id': self._next_id, 'method': method, 'params': params or {}}))
+
+    def start(self):
+        """Start recording; failures are logged and leave the recorder inactive"""
+        try:
+            self._socket = websocket.create_connection(self._debugger_url(), timeout=5, suppress_origin=True)
+        except Exception as e:
+            logger.warning(f"Screencast not available: {e}")
+            self._socket = None
+            return self
+        width, height = self.size
+        self._send("Page.startScreencast", {
+            'format': "jpeg", 'quality': self.quality, 'maxWidth': width, 'maxHeight': height,
+        })
+        self._socket.settimeout(0.5)
+        self._thread = threading.Thread(target=self._receive, name="screencast", daemon=True)
+        self._thread.start()
+        return self
+
+    def _receive(self):
+        while not self._stopping.is_set():
+            try:
+                message = json.loads(self._socket.recv())
+            except websocket.WebSocketTimeoutException:
+                continue
+            except Exception:
+                break
+            if message.get('method') != "Page.screencastFrame":
+                continue
+            params = message['params']
+            try:
+                self._send("Page.screencastFrameAck", {'sessionId': params['sessionId']})
+            except Exception:
+                break
+            self._add(params['metadata'].get('timestamp', time.time()), params['data'])
+        try:
+            self._send("Page.stopScreencast")
+            self._socket.close()
+        except Exception:
+            pass
+
+    def _add(self, timestamp, data):
+        frame = base64.b64decode(data)
+        with self._lock:
+            self._frames.append((timestamp, frame))
+            self._bytes += len(frame)
+            # Drop frames that are too old or over the byte budget, always keeping the newest
+            while len(self._frames) > 1 and (
+                self._bytes > self.max_bytes or timestamp - self._frames[0][0] > self.seconds
+            ):
+                self._bytes -= len(self._frames.popleft()[1])
+
+    def stop(self):
+        """Stop recording, the buffered frames stay available for clip()"""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    @property
+    def buffered_bytes(self):
+        return self._bytes
+
+    def clip(self):
+        """Buffered frames as a list of (timestamp, jpeg bytes), oldest first"""
+        with self._lock:
+            return list(self._frames)
+
+
+def clip_key(frames):
+    """Content hash of a clip, used as its artifact name"""
+    digest = hashlib.sha256()
+    for _, frame in frames:
+        digest.update(frame)
+    return digest.hexdigest()[:16]
+
+
+def encode_gif(frames):
+    """Encode (timestamp, jpeg bytes) frames as an animated GIF, keeping the recorded timing"""
+    images = [Image.open(io.BytesIO(frame)).convert("RGB") for _, frame in frames]
+    durations = [
+        max(20, int((frames[i + 1][0] - frames[i][0]) * 1000)) for i in range(len(frames) - 1)
+    ] + [1000]
+    buffer = io.BytesIO()
+    images[0].save(buffer, format="GIF", save_all=True, append_images=images[1:], duration=durations, loop=0)
+    return buffer.getvalue()
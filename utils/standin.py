@@ -0,0 +1,354 @@
+# Local stand-in for the Discover app module
+"""
+Record/replay stand-in for tmdb-discover.surge.sh and the TMDB API behind it
+
+record  - a local HTTP server proxies the app and its API calls to the real hosts and
+          stores every response in a gzip JSONL file (STANDIN_STORE)
+replay  - the same server answers from the store only, no network access is needed
+
+The browser loads the app from the local server. A script injected into the served HTML
+rewrites the app's fetch/XHR calls to the API hosts (STANDIN_API_HOSTS) and the <img>
+sources on the image hosts (STANDIN_IMAGE_HOSTS) into /__upstream/<host>/<path> on the
+local server, so API traffic and posters go through it as well. Latency and errors can
+be injected into the API responses to see how the suite behaves against a slow backend.
+
+Parallel record-mode workers share one store: on stop each worker merges the responses
+it recorded into the file under a lock file, so no worker's recordings are lost.
+
+Usage outside behave:
+    python -m utils.standin --mode record
+    python -m utils.standin --mode replay --port 8765 --latency-ms 300 --error-rate 0.05
+"""
+import argparse
+import base64
+import gzip
+import json
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from utils.config import (
+    APP_URL,
+    STANDIN_API_HOSTS,
+    STANDIN_ERROR_RATE,
+    STANDIN_IMAGE_HOSTS,
+    STANDIN_LATENCY_MS,
+    STANDIN_PORT,
+    STANDIN_STORE,
+)
+
+logger = logging.getLogger("standin")
+
+UPSTREAM_PREFIX = "/__upstream/"
+
+# Response headers worth replaying, everything else is dropped from the store
+KEPT_HEADERS = ("content-type", "cache-control")
+
+# Seconds to wait for another process's lock on the store, and age after which a lock file counts as abandoned
+STORE_LOCK_TIMEOUT = 60
+STORE_LOCK_STALE = 300
+
+REWRITE_JS = """
+(function (hosts, imageHosts) {
+    if (window.__qaStandin) { return; }
+    window.__qaStandin = true;
+    function rewrite(url, allowed) {
+        try {
+            var parsed = new URL(url, window.location.href);
+            if (allowed.indexOf(parsed.host) === -1) { return url; }
+            return window.location.origin + '__PREFIX__' + parsed.host + parsed.pathname + parsed.search;
+        } catch (e) { return url; }
+    }
+    if (window.fetch) {
+        var originalFetch = window.fetch;
+        window.fetch = function (input, init) {
+            if (typeof input === 'string') { input = rewrite(input, hosts); }
+            else if (input && input.url) { input = new Request(rewrite(input.url, hosts), input); }
+            return originalFetch.call(this, input, init);
+        };
+    }
+    var originalOpen = XMLHttpRequest.prototype.open;
+    XMLHttpRequest.prototype.open = function (method, url) {
+        var args = Array.prototype.slice.call(arguments);
+        args[1] = rewrite(url, hosts);
+        return originalOpen.apply(this, args);
+    };
+    if (imageHosts.length) {
+        // Posters are <img> elements, their src is set either as a property or as an attribute
+        var src = Object.getOwnPropertyDescriptor(HTMLImageElement.prototype, 'src');
+        Object.defineProperty(HTMLImageElement.prototype, 'src', {
+            configurable: true,
+            enumerable: src.enumerable,
+            get: src.get,
+            set: function (value) { src.set.call(this, rewrite(String(value), imageHosts)); }
+        });
+        var originalSetAttribute = Element.prototype.setAttribute;
+        Element.prototype.setAttribute = function (name, value) {
+            if (this instanceof HTMLImageElement && String(name).toLowerCase() === 'src') {
+                value = rewrite(String(value), imageHosts);
+            }
+            return originalSetAttribute.call(this, name, value);
+        };
+    }
+})(__HOSTS__, __IMAGE_HOSTS__);
+""".replace("__PREFIX__", UPSTREAM_PREFIX).replace("__HOSTS__", json.dumps(STANDIN_API_HOSTS)).replace(
+    "__IMAGE_HOSTS__", json.dumps(STANDIN_IMAGE_HOSTS)
+)
+
+
+def request_key(method, path):
+    """
+    Store key for a request, query parameters sorted so their order does not matter
+    The API key is left out, so a store recorded with one key replays with any other or none
+    """
+    parts = urlsplit(path)
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k != "api_key"]
+    query = urlencode(sorted(params))
+    return f"{method} {parts.path}?{query}" if query else f"{method} {parts.path}"
+
+
+def inject_rewrite(html):
+    """Add the API rewrite script to a page, ahead of the app's own scripts"""
+    script = f"<script>{REWRITE_JS}</script>".encode()
+    index = html.find(b"<head>")
+    if index == -1:
+        return script + html
+    index += len(b"<head>")
+    return html[:index] + script + html[index:]
+
+
+@contextmanager
+def _file_lock(path, timeout=STORE_LOCK_TIMEOUT, stale=STORE_LOCK_STALE):
+    """Exclusive lock between processes, held while the lock file created here exists"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(path) > stale:
+                    # Left behind by a process that died while holding it
+                    logger.warning(f"Removing stale lock {path}")
+                    os.remove(path)
+                    continue
+            except OSError:
+                # Released in the meantime
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Could not lock {path} within {timeout}s")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.remove(path)
+
+
+class ResponseStore:
+    """Recorded responses kept in memory and persisted as one gzip JSONL file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._responses = {}
+        # Keys recorded by this process, they replace what other processes saved for them
+        self._recorded = set()
+        self._lock = threading.Lock()
+
+    def _read(self):
+        entries = {}
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                entries[entry['key']] = entry
+        return entries
+
+    def load(self):
+        if not os.path.exists(self.path):
+            logger.warning(f"No recorded responses at {self.path}")
+            return self
+        self._responses.update(self._read())
+        logger.info(f"Loaded {len(self._responses)} recorded responses from {self.path}")
+        return self
+
+    def get(self, key):
+        return self._responses.get(key)
+
+    def put(self, key, status, headers, body):
+        entry = {
+            'key': key,
+            'status': status,
+            'headers': {k.lower(): v for k, v in headers.items() if k.lower() in KEPT_HEADERS},
+            'body': base64.b64encode(body).decode("ascii"),
+        }
+        with self._lock:
+            self._responses[key] = entry
+            self._recorded.add(key)
+
+    def save(self):
+        """
+        Merge the responses recorded by this process into the file
+        Other record-mode processes may have saved since this one loaded the store, so the
+        file is reread under a lock and only the keys recorded here are replaced
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with _file_lock(self.path + ".lock"):
+            entries = self._read() if os.path.exists(self.path) else {}
+            with self._lock:
+                entries.update({key: self._responses[key] for key in self._recorded})
+            # Readers (replay runs) never see a partial file
+            partial_path = f"{self.path}.{os.getpid()}.part"
+            with gzip.open(partial_path, "wt", encoding="utf-8") as f:
+                for entry in sorted(entries.values(), key=lambda e: e['key']):
+                    f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            os.replace(partial_path, self.path)
+        logger.info(f"Saved {len(self._recorded)} recorded responses to {self.path} ({len(entries)} in total)")
+
+    def __len__(self):
+        return len(self._responses)
+
+
+class StandinServer:
+    """Local HTTP server that records or replays the Discover app and its API"""
+
+    def __init__(self, mode, store_path=STANDIN_STORE, port=STANDIN_PORT, app_url=APP_URL,
+                 latency_ms=STANDIN_LATENCY_MS, error_rate=STANDIN_ERROR_RATE):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown stand-in mode '{mode}', expected 'record' or 'replay'")
+        self.mode = mode
+        self.store = ResponseStore(store_path)
+        self.app_origin = app_url.rstrip("/")
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._port = port
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/"
+
+    def upstream_url(self, url):
+        """Local URL that serves url (on one of the API hosts) through this server"""
+        return self.url.rstrip("/") + UPSTREAM_PREFIX + url.split("://", 1)[-1]
+
+    def start(self):
+        if self.mode == "replay" or os.path.exists(self.store.path):
+            # Recording extends an existing store rather than replacing it
+            self.store.load()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", self._port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin", daemon=True)
+        self._thread.start()
+        logger.info(f"Stand-in server ({self.mode}) listening on {self.url}")
+        return self
+
+    def stop(self):
+        if self._httpd is None:
+            return
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._httpd = None
+        if self.mode == "record":
+            self.store.save()
+        logger.info("Stand-in server stopped")
+
+    def _upstream_url(self, path):
+        if path.startswith(UPSTREAM_PREFIX):
+            return "https://" + path[len(UPSTREAM_PREFIX):]
+        return self.app_origin + path
+
+    def _fetch_upstream(self, method, path, headers, body):
+        """Status, headers and body from the real host, a 502 if it cannot be reached"""
+        url = self._upstream_url(path)
+        request = urllib.request.Request(url, data=body, method=method, headers=headers)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, dict(response.headers), response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, dict(e.headers), e.read()
+        except (urllib.error.URLError, OSError) as e:
+            logger.warning(f"Upstream {url} unreachable: {e}")
+            return 502, {'Content-Type': "text/plain"}, f"Upstream unreachable: {e}".encode()
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else None
+                key = request_key(self.command, self.path)
+                # Latency and errors are injected into API calls only, not into the app or its images
+                is_api = any(self.path.startswith(f"{UPSTREAM_PREFIX}{host}/") for host in STANDIN_API_HOSTS)
+
+                if is_api and server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                if is_api and server.error_rate and random.random() < server.error_rate:
+                    return self._respond(503, {'content-type': "application/json"}, b'{"injected_error": true}')
+
+                if server.mode == "record":
+                    headers = {k: v for k, v in self.headers.items() if k.lower() in ("accept", "content-type")}
+                    status, response_headers, response_body = server._fetch_upstream(
+                        self.command, self.path, headers, body
+                    )
+                    # Bad gateway answers are passed on but not recorded, a later run records the real one
+                    if status != 502:
+                        server.store.put(key, status, response_headers, response_body)
+                    kept = {k.lower(): v for k, v in response_headers.items() if k.lower() in KEPT_HEADERS}
+                    return self._respond(status, kept, response_body)
+
+                entry = server.store.get(key)
+                if entry is None:
+                    logger.warning(f"No recorded response for {key}")
+                    return self._respond(404, {'content-type': "text/plain"}, f"Not recorded: {key}".encode())
+                return self._respond(entry['status'], entry['headers'], base64.b64decode(entry['body']))
+
+            def _respond(self, status, headers, body):
+                if "text/html" in headers.get('content-type', ""):
+                    body = inject_rewrite(body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or replay the Discover app on a local server")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--port", type=int, default=STANDIN_PORT or 8765)
+    parser.add_argument("--store", default=STANDIN_STORE)
+    parser.add_argument("--latency-ms", type=int, default=STANDIN_LATENCY_MS)
+    parser.add_argument("--error-rate", type=float, default=STANDIN_ERROR_RATE)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s | %(levelname)s | %(name)s | %(message)s')
+    server = StandinServer(args.mode, args.store, args.port, latency_ms=args.latency_ms, error_rate=args.error_rate)
+    server.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Wait budget policy module
+"""
+Decide how long a scenario may block in explicit waits, and record where the time went
+
+Budgets come from WAIT_BUDGETS in utils/config.py:
+    default - seconds for any wait not covered below
+    tags    - per scenario tag (without @), applied to Then steps only so setup steps
+              still get enough time to load the page
+    steps   - per step text (substring match), wins over tag budgets
+
+DiscoverPage and LocatorRegistry read WaitPolicy.timeout for every wait and run the wait
+inside WaitPolicy.blocked(), which adds the time to the scenario's blocked total.
+Implicit waits are off in every browser profile so they cannot stack on top.
+"""
+import logging
+import time
+from contextlib import contextmanager
+
+from utils.config import WAIT_BUDGETS
+
+logger = logging.getLogger("test.waits")
+
+
+class WaitPolicy:
+    """Wait budget and wait-time bookkeeping for one scenario"""
+
+    def __init__(self, tags=(), budgets=WAIT_BUDGETS):
+        self.tags = set(tags)
+        self.budgets = budgets
+        self.step_type = None
+        self.step_name = None
+        self.started = time.perf_counter()
+        self.blocked_seconds = 0.0
+        self.blocked_by_label = {}
+
+    def enter_step(self, step_type, step_name):
+        """Called from before_step so budgets can depend on the current step"""
+        self.step_type = step_type
+        self.step_name = step_name
+
+    @property
+    def timeout(self):
+        """Budget in seconds for a wait started now"""
+        if self.step_name:
+            for fragment, seconds in self.budgets['steps'].items():
+                if fragment in self.step_name:
+                    return seconds
+        if self.step_type == "then":
+            tag_budgets = [seconds for tag, seconds in self.budgets['tags'].items() if tag in self.tags]
+            if tag_budgets:
+                return min(tag_budgets)
+        return self.budgets['default']
+
+    @contextmanager
+    def blocked(self, label):
+        """Count the time spent inside the block as waiting rather than working"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.blocked_seconds += elapsed
+            self.blocked_by_label[label] = self.blocked_by_label.get(label, 0.0) + elapsed
+
+    def summary(self):
+        """Blocked vs working time for the scenario so far, with the slowest wait labels"""
+        total = time.perf_counter() - self.started
+        slowest = sorted(self.blocked_by_label.items(), key=lambda item: item[1], reverse=True)[:5]
+        return {
+            'total_seconds': round(total, 3),
+            'blocked_seconds': round(self.blocked_seconds, 3),
+            'work_seconds': round(max(0.0, total - self.blocked_seconds), 3),
+            'slowest_waits': [(label, round(seconds, 3)) for label, seconds in slowest],
+        }